@@ -23,14 +23,23 @@ if "bpy" in locals():
         importlib.reload(export_canm)
     if "additive_editing" in locals():
         importlib.reload(additive_editing)
+    if "canm_reload" in locals():
+        importlib.reload(canm_reload)
+    if "mdb_tools" in locals():
+        importlib.reload(mdb_tools)
+    if "profiling" in locals():
+        importlib.reload(profiling)
 
 
 import bpy
-from . import additive_editing
+from . import additive_editing, canm_reload, mdb_tools, profiling
 from bpy.props import (
         StringProperty,
         IntProperty,
+        FloatProperty,
         BoolProperty,
+        EnumProperty,
+        CollectionProperty,
         )
 from bpy_extras.io_utils import (
         ImportHelper,
@@ -38,6 +47,45 @@ from bpy_extras.io_utils import (
         )
 
 
+# Interactive MDB import: how often the modal operator wakes up, and how long
+# each wake-up may spend building scene data before yielding back to the UI.
+INTERACTIVE_IMPORT_INTERVAL = 0.01
+INTERACTIVE_IMPORT_TIME_SLICE = 0.1
+
+
+class EDF_AddonPreferences(bpy.types.AddonPreferences):
+    bl_idname = __package__
+
+    option_profile: BoolProperty(
+        name="Profile Imports and Exports",
+        description=(
+            "Write cProfile and memory reports next to every imported or "
+            "exported MDB/CANM file. Slows operators down; enable only to "
+            "send a performance report"
+        ),
+        default=False,
+    )
+
+    def draw(self, context):
+        self.layout.prop(self, "option_profile")
+
+
+def profiling_enabled(context):
+    addon = context.preferences.addons.get(__package__)
+    preferences = getattr(addon, "preferences", None)
+    return profiling.profiling_requested(
+        getattr(preferences, "option_profile", False),
+    )
+
+
+def run_operator(context, name, filepath, run):
+    """Call ``run``, under cProfile and tracemalloc if profiling is enabled."""
+    if not profiling_enabled(context):
+        return run()
+    with profiling.profiled(name, filepath):
+        return run()
+
+
 class ImportMDB(bpy.types.Operator, ImportHelper):
     """Load a MDB file"""
     bl_idname = "import_scene.mdb"
@@ -59,11 +107,199 @@ class ImportMDB(bpy.types.Operator, ImportHelper):
         default=False,
     )
 
+    option_import_content: EnumProperty(
+        name="Import",
+        description="Which parts of the MDB to create",
+        items=(
+            ("ALL", "Everything", "Import the armature, materials and meshes"),
+            (
+                "ARMATURE",
+                "Armature Only",
+                "Import only the armature, for example to work on CANM "
+                "animations. Geometry is not decoded",
+            ),
+            (
+                "MATERIALS",
+                "Materials Only",
+                "Import only the materials. Geometry is not decoded",
+            ),
+        ),
+        default="ALL",
+    )
+
+    option_merge_meshes: BoolProperty(
+        name="Merge Meshes per Object",
+        description=(
+            "Import all meshes of one MDB object as a single Blender mesh "
+            "with one material slot per MDB mesh. Export splits it again"
+        ),
+        default=False,
+    )
+
+    option_share_meshes: BoolProperty(
+        name="Share Identical Meshes",
+        description=(
+            "Import meshes with identical geometry and material as linked "
+            "duplicates of one mesh data-block. Editing one edits them all"
+        ),
+        default=False,
+    )
+
+    option_weld_seams: BoolProperty(
+        name="Weld Seams",
+        description=(
+            "Merge vertices that share a position and skin weights. Normals "
+            "and UVs are kept per face corner, and export splits them again"
+        ),
+        default=False,
+    )
+
+    option_skin_attributes: BoolProperty(
+        name="Raw Skin Attributes",
+        description=(
+            "Store bone weights as mesh attributes instead of vertex groups. "
+            "Faster for meshes you will not re-weight; they stay in rest pose "
+            "until converted with Convert Skin to Vertex Groups"
+        ),
+        default=False,
+    )
+
+    option_texture_mode: EnumProperty(
+        name="Textures",
+        description="How texture images are loaded for imported materials",
+        items=(
+            (
+                "EAGER",
+                "Full Resolution",
+                "Load every texture at full resolution",
+            ),
+            (
+                "DEFERRED",
+                "Deferred",
+                "Use placeholder images and load textures later from the "
+                "EDF sidebar tab",
+            ),
+            (
+                "PROXY",
+                "Proxy",
+                "Use downscaled copies cached on disk and load full "
+                "resolution later from the EDF sidebar tab",
+            ),
+        ),
+        default="EAGER",
+    )
+
+    option_shader_preview: EnumProperty(
+        name="Shader Preview",
+        description=(
+            "How much of the Blender shader preview to build. Exported MDB "
+            "values are the same for every choice"
+        ),
+        items=(
+            ("FULL", "Full", "Build the complete material preview"),
+            (
+                "BASIC",
+                "Basic",
+                "Preview base colour and normal maps only",
+            ),
+            (
+                "NONE",
+                "None",
+                "Create the editable MDB inputs without any preview shading",
+            ),
+        ),
+        default="FULL",
+    )
+
+    option_interactive: BoolProperty(
+        name="Interactive Import",
+        description=(
+            "Build the scene in small time slices so Blender stays responsive "
+            "and shows progress. Press Esc to cancel and remove everything "
+            "imported so far"
+        ),
+        default=False,
+    )
+
+    _job = None
+    _timer = None
 
     def execute(self, context):
         from . import import_mdb
         keywords = self.as_keywords(ignore=())
-        return import_mdb.load(self, context, **keywords)
+        # A profile needs the whole import in one call, so it runs blocking.
+        if (
+            getattr(self, "option_interactive", False)
+            and context.window is not None
+            and not bpy.app.background
+            and not profiling_enabled(context)
+        ):
+            return self.start_interactive_import(context, import_mdb, keywords)
+        return run_operator(
+            context,
+            "MDB import",
+            keywords.get("filepath", ""),
+            lambda: import_mdb.load(self, context, **keywords),
+        )
+
+    def start_interactive_import(self, context, import_mdb, keywords):
+        job = import_mdb.begin_import(self, context, **keywords)
+        if job is None:
+            return {'CANCELLED'}
+        self._job = job
+        window_manager = context.window_manager
+        window_manager.progress_begin(0, job.total)
+        self._timer = window_manager.event_timer_add(
+            INTERACTIVE_IMPORT_INTERVAL,
+            window=context.window,
+        )
+        window_manager.modal_handler_add(self)
+        context.workspace.status_text_set("Importing MDB... (Esc to cancel)")
+        return {'RUNNING_MODAL'}
+
+    def stop_interactive_import(self, context):
+        window_manager = context.window_manager
+        window_manager.event_timer_remove(self._timer)
+        window_manager.progress_end()
+        context.workspace.status_text_set(None)
+        self._timer = None
+        self._job = None
+
+    def modal(self, context, event):
+        job = self._job
+        if event.type == 'ESC':
+            job.rollback()
+            self.stop_interactive_import(context)
+            self.report(
+                {'WARNING'},
+                "MDB import cancelled; partially imported data was removed",
+            )
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        try:
+            finished = job.run_for(INTERACTIVE_IMPORT_TIME_SLICE)
+        except Exception as error:
+            from . import import_mdb
+            job.rollback()
+            self.stop_interactive_import(context)
+            import_mdb.report_import_error(
+                self,
+                f"MDB import failed; partially imported data was removed: "
+                f"{error}",
+            )
+            return {'CANCELLED'}
+        context.window_manager.progress_update(job.completed)
+        context.workspace.status_text_set(
+            f"Importing MDB: {job.completed}/{job.total} steps "
+            "(Esc to cancel)"
+        )
+        if not finished:
+            return {'RUNNING_MODAL'}
+        job.finish()
+        job.recorder.report()
+        self.stop_interactive_import(context)
+        return {'FINISHED'}
 
     def draw(self, context):
         layout = self.layout
@@ -72,9 +308,33 @@ class ImportMDB(bpy.types.Operator, ImportHelper):
                 layout.prop(self, "option_override_version")
             if hasattr(self, "option_ignore_errors"):
                 layout.prop(self, "option_ignore_errors")
+            if hasattr(self, "option_import_content"):
+                layout.prop(self, "option_import_content")
+            if hasattr(self, "option_merge_meshes"):
+                layout.prop(self, "option_merge_meshes")
+            if hasattr(self, "option_share_meshes"):
+                layout.prop(self, "option_share_meshes")
+            if hasattr(self, "option_weld_seams"):
+                layout.prop(self, "option_weld_seams")
+            if hasattr(self, "option_skin_attributes"):
+                layout.prop(self, "option_skin_attributes")
+            if hasattr(self, "option_texture_mode"):
+                layout.prop(self, "option_texture_mode")
+            if hasattr(self, "option_shader_preview"):
+                layout.prop(self, "option_shader_preview")
+            if hasattr(self, "option_interactive"):
+                layout.prop(self, "option_interactive")
         else:
             layout.prop(self, "option_override_version")
             layout.prop(self, "option_ignore_errors")
+            layout.prop(self, "option_import_content")
+            layout.prop(self, "option_merge_meshes")
+            layout.prop(self, "option_share_meshes")
+            layout.prop(self, "option_weld_seams")
+            layout.prop(self, "option_skin_attributes")
+            layout.prop(self, "option_texture_mode")
+            layout.prop(self, "option_shader_preview")
+            layout.prop(self, "option_interactive")
 
     def invoke(self, context, event):
         context.window_manager.fileselect_add(self)
@@ -98,7 +358,12 @@ class ExportMDB_5(bpy.types.Operator, ExportHelper):
         keywords = self.as_keywords(ignore=())
         keywords['version'] = 5  # Set the version to 5
 
-        return export_mdb.save(self, context, **keywords)
+        return run_operator(
+            context,
+            "MDB export EDF5",
+            keywords.get("filepath", ""),
+            lambda: export_mdb.save(self, context, **keywords),
+        )
 
     def draw(self, context):
         pass
@@ -125,7 +390,12 @@ class ExportMDB_6(bpy.types.Operator, ExportHelper):
         keywords = self.as_keywords(ignore=())
         keywords['version'] = 6  # Set the version to 6
 
-        return export_mdb.save(self, context, **keywords)
+        return run_operator(
+            context,
+            "MDB export EDF6",
+            keywords.get("filepath", ""),
+            lambda: export_mdb.save(self, context, **keywords),
+        )
 
     def draw(self, context):
         pass
@@ -136,6 +406,29 @@ class ExportMDB_6(bpy.types.Operator, ExportHelper):
         return (context.active_object is not None) and (not context.active_object.mode == 'EDIT')
 
 
+class EDF_CanmClip(bpy.types.PropertyGroup):
+    """One animation of the CANM file shown in the import dialog"""
+    index: IntProperty(name="Index")
+    name: StringProperty(name="Name")
+    duration: FloatProperty(name="Duration")
+    keyframes: IntProperty(name="Keyframes")
+    loop: BoolProperty(name="Loop")
+    selected: BoolProperty(
+        name="Import",
+        description="Create an Action for this clip",
+        default=True,
+    )
+
+
+class EDF_UL_canm_clips(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "selected", text="")
+        row.label(text=item.name, icon="ACTION")
+        row.label(text=f"{item.keyframes} keys, {item.duration:.2f}s")
+        row.label(text="", icon="FILE_REFRESH" if item.loop else "BLANK1")
+
+
 class ImportCANM(bpy.types.Operator, ImportHelper):
     """Load a CANM file"""
     bl_idname = "import_scene.canm"
@@ -157,10 +450,73 @@ class ImportCANM(bpy.types.Operator, ImportHelper):
         default=False,
     )
 
+    option_thin_keyframes: BoolProperty(
+        name="Thin Keyframes",
+        description=(
+            "Only keep keyframes that linear interpolation cannot reproduce. "
+            "Constant and straight segments shrink to their end points; "
+            "export samples the same values"
+        ),
+        default=False,
+    )
+
+    # Filled from a header-only scan whenever the selected file changes
+    clips: CollectionProperty(type=EDF_CanmClip, options={'SKIP_SAVE'})
+    clip_index: IntProperty(options={'HIDDEN', 'SKIP_SAVE'})
+    scanned_filepath: StringProperty(options={'HIDDEN', 'SKIP_SAVE'})
+
     def execute(self, context):
         from . import import_canm
-        keywords = self.as_keywords(ignore=())
-        return import_canm.load(self, context, **keywords)
+        keywords = self.as_keywords(ignore=("clips", "clip_index", "scanned_filepath"))
+        return run_operator(
+            context,
+            "CANM import",
+            keywords.get("filepath", ""),
+            lambda: import_canm.load(self, context, **keywords),
+        )
+
+    def scan_clips(self):
+        from . import import_canm
+        from .canm_format import CanmFormatError
+        self.clips.clear()
+        self.scanned_filepath = self.filepath
+        try:
+            clips = import_canm.list_canm_clips(
+                self.filepath,
+                getattr(self, "option_override_version", 0),
+            )
+        except (OSError, CanmFormatError):
+            return
+        for clip in clips:
+            item = self.clips.add()
+            item.index = clip["index"]
+            item.name = clip["name"]
+            item.duration = clip["duration"]
+            item.keyframes = clip["keyframes"]
+            item.loop = clip["loop"]
+
+    def check(self, context):
+        changed = super().check(context)
+        if self.scanned_filepath != self.filepath:
+            self.scan_clips()
+            changed = True
+        return changed
+
+    def draw_clips(self, layout):
+        if not self.clips:
+            layout.label(text="Select a CANM file to list its clips.", icon="INFO")
+            return
+        selected = sum(clip.selected for clip in self.clips)
+        layout.label(text=f"Clips ({selected}/{len(self.clips)} selected)")
+        layout.template_list(
+            "EDF_UL_canm_clips",
+            "",
+            self,
+            "clips",
+            self,
+            "clip_index",
+            rows=6,
+        )
 
     def draw(self, context):
         layout = self.layout
@@ -169,9 +525,15 @@ class ImportCANM(bpy.types.Operator, ImportHelper):
                 layout.prop(self, "option_override_version")
             if hasattr(self, "option_ignore_errors"):
                 layout.prop(self, "option_ignore_errors")
+            if hasattr(self, "option_thin_keyframes"):
+                layout.prop(self, "option_thin_keyframes")
+            if hasattr(self, "clips"):
+                self.draw_clips(layout)
         else:
             layout.prop(self, "option_override_version")
             layout.prop(self, "option_ignore_errors")
+            layout.prop(self, "option_thin_keyframes")
+            self.draw_clips(layout)
     
     def invoke(self, context, event):
         context.window_manager.fileselect_add(self)
@@ -195,7 +557,12 @@ class ExportCANM_5(bpy.types.Operator, ExportHelper):
         keywords = self.as_keywords(ignore=())
         keywords['version'] = 5
 
-        return export_canm.save(self, context, **keywords)
+        return run_operator(
+            context,
+            "CANM export EDF5",
+            keywords.get("filepath", ""),
+            lambda: export_canm.save(self, context, **keywords),
+        )
 
     def draw(self, context):
         pass
@@ -222,7 +589,12 @@ class ExportCANM_6(bpy.types.Operator, ExportHelper):
 
         keywords = self.as_keywords(ignore=())
         keywords['version'] = 6
-        return export_canm.save(self, context, **keywords)
+        return run_operator(
+            context,
+            "CANM export EDF6",
+            keywords.get("filepath", ""),
+            lambda: export_canm.save(self, context, **keywords),
+        )
 
     def draw(self, context):
         pass
@@ -339,15 +711,20 @@ def menu_func_export(self, context):
 
 
 classes = (
+    EDF_AddonPreferences,
     ImportMDB,
     ExportMDB_5,
     ExportMDB_6,
+    EDF_CanmClip,
+    EDF_UL_canm_clips,
     ImportCANM,
     ExportCANM_5,
     ExportCANM_6,
     EDF_OT_add_canm_action_properties,
     EDF_PT_canm_action_properties,
     *additive_editing.CLASSES,
+    *canm_reload.CLASSES,
+    *mdb_tools.CLASSES,
 )
 
 
@@ -360,6 +737,7 @@ def register():
 
 
 def unregister():
+    canm_reload.stop_watching()
     bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
     bpy.types.TOPBAR_MT_file_export.remove(menu_func_export)
 
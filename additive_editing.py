@@ -10,6 +10,8 @@ import mathutils
 
 from bpy.props import EnumProperty, IntProperty, StringProperty
 
+from .curve_writer import write_sampled_curves
+
 
 PREVIEW_FLAG = "edf_additive_edit_preview"
 SOURCE_NAME = "edf_additive_source_action"
@@ -237,13 +239,8 @@ def create_curves(action, pose_bone, property_name, component_count):
 
 
 def replace_curve_samples(curves, samples):
-    for curve, values in zip(curves, zip(*samples)):
-        while curve.keyframe_points:
-            curve.keyframe_points.remove(curve.keyframe_points[-1])
-        for frame, value in enumerate(values, 1):
-            point = curve.keyframe_points.insert(float(frame), float(value))
-            point.interpolation = "LINEAR"
-        curve.update()
+    """Replace every curve's keys with linear samples from frame 1."""
+    write_sampled_curves(curves, samples)
 
 
 def quaternion_values(quaternion, previous):
@@ -0,0 +1,33 @@
+"""Load the add-on's bpy-free modules outside Blender.
+
+The add-on package ``__init__`` registers Blender classes, so the codec modules
+are loaded into a stand-in package instead. ``mathutils`` is replaced by
+``mathutils_shim`` when the real module is not installed.
+"""
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+
+ADDON_ROOT = Path(__file__).resolve().parents[1]
+PACKAGE_NAME = "_mdb_benchmark_addon"
+
+
+def install_mathutils_shim():
+    try:
+        import mathutils  # noqa: F401
+    except ImportError:
+        import mathutils_shim
+        sys.modules["mathutils"] = mathutils_shim
+
+
+def load_module(name):
+    """Import ``name`` (for example ``"mdb_parser"``) from the add-on."""
+    install_mathutils_shim()
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [str(ADDON_ROOT)]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
@@ -0,0 +1,415 @@
+"""Time the import and export operators end to end inside Blender.
+
+Run headless from the repository root::
+
+    blender --background --factory-startup \\
+        --python benchmarks/blender_benchmark.py -- --json results.json
+    blender --background --factory-startup \\
+        --python benchmarks/blender_benchmark.py -- \\
+        --mdb model.mdb --canm model.canm --write-baseline blender.json
+    blender --background --factory-startup \\
+        --python benchmarks/blender_benchmark.py -- \\
+        --mdb model.mdb --canm model.canm --baseline blender.json
+
+Every repetition starts from an empty scene and runs MDB import, MDB export as
+EDF5 and EDF6, CANM import, CANM export, and an additive editing start and save
+on the first two imported Actions. Without ``--mdb`` a synthetic model and
+animation from ``synthetic.py`` are used; ``--mdb`` without ``--canm`` skips
+the animation stages. Each stage reports the median of ``--repeat`` runs and
+the process peak resident set size once it finished. Peak RSS is a high-water
+mark, so it only grows from one stage to the next.
+
+With ``--baseline`` the run fails (exit status 1) when a stage median is more
+than ``--threshold`` slower than the stored value, or the overall peak RSS
+grew by more than the same fraction. Baselines are machine and Blender version
+specific, so none is committed; record one with ``--write-baseline`` where it
+will be compared.
+"""
+
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import bpy
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARK_ROOT = Path(__file__).resolve().parent
+ADDON_ROOT = BENCHMARK_ROOT.parent
+PACKAGE_NAME = "_edf_blender_benchmark"
+
+sys.path.insert(0, str(BENCHMARK_ROOT))
+
+from synthetic import (  # noqa: E402
+    SyntheticAnimationConfig,
+    SyntheticConfig,
+    synthetic_canm_bytes,
+    synthetic_mdb_bytes,
+)
+
+STAGES = (
+    "import_mdb",
+    "export_mdb_edf5",
+    "export_mdb_edf6",
+    "import_canm",
+    "export_canm",
+    "additive_start",
+    "additive_save",
+)
+MEGABYTE = 1024 * 1024
+
+
+def load_addon():
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME,
+        ADDON_ROOT / "__init__.py",
+        submodule_search_locations=[str(ADDON_ROOT)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+class Operator:
+    option_ignore_errors = False
+    option_override_version = 0
+
+    def report(self, levels, message):
+        if levels & {"ERROR", "WARNING"}:
+            print(f"{','.join(sorted(levels))}: {message}")
+
+
+def peak_rss_megabytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    if sys.platform == "darwin":
+        return peak / MEGABYTE
+    return peak / 1024
+
+
+def finished(result, stage):
+    if result != {"FINISHED"}:
+        raise RuntimeError(f"{stage} returned {result}")
+
+
+def reset_scene():
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def imported_armature():
+    for obj in bpy.data.objects:
+        if obj.type == "ARMATURE":
+            return obj
+    raise RuntimeError("The MDB import created no armature")
+
+
+class Run:
+    """One pass over every stage, recording the wall time of each."""
+
+    def __init__(self, modules, mdb_path, canm_path, output):
+        self.modules = modules
+        self.mdb_path = mdb_path
+        self.canm_path = canm_path
+        self.output = output
+        self.operator = Operator()
+        self.seconds = {}
+        self.peak_rss = {}
+
+    def stage(self, name, run):
+        started = time.perf_counter()
+        run()
+        self.seconds[name] = time.perf_counter() - started
+        self.peak_rss[name] = peak_rss_megabytes()
+
+    def import_mdb(self):
+        finished(
+            self.modules.import_mdb.load(
+                self.operator,
+                bpy.context,
+                filepath=str(self.mdb_path),
+            ),
+            "MDB import",
+        )
+        bpy.context.view_layer.objects.active = imported_armature()
+
+    def export_mdb(self, version):
+        finished(
+            self.modules.export_mdb.save(
+                self.operator,
+                bpy.context,
+                filepath=str(self.output / f"benchmark_edf{version}.mdb"),
+                version=version,
+            ),
+            f"MDB export EDF{version}",
+        )
+
+    def import_canm(self):
+        finished(
+            self.modules.import_canm.load(
+                self.operator,
+                bpy.context,
+                filepath=str(self.canm_path),
+            ),
+            "CANM import",
+        )
+
+    def export_canm(self):
+        finished(
+            self.modules.export_canm.save(
+                self.operator,
+                bpy.context,
+                filepath=str(self.output / "benchmark.canm"),
+                version=5,
+            ),
+            "CANM export",
+        )
+
+    def additive_actions(self):
+        actions = [
+            action
+            for action in bpy.data.actions
+            if self.modules.additive_editing.canm_action(action)
+        ]
+        if len(actions) < 2:
+            return None
+        return actions[0], actions[1]
+
+    def additive_start(self, additive, base):
+        additive_editing = self.modules.additive_editing
+        armature_obj = imported_armature()
+        if armature_obj.animation_data is None:
+            armature_obj.animation_data_create()
+        previous_action = armature_obj.animation_data.action
+        preview = additive_editing.build_preview_action(
+            armature_obj,
+            additive,
+            base,
+            "ACTION",
+            1,
+        )
+        additive_editing.capture_session(armature_obj, preview, previous_action)
+
+    def additive_save(self):
+        additive_editing = self.modules.additive_editing
+        armature_obj = imported_armature()
+        preview, additive, base = additive_editing.session_actions(armature_obj)
+        additive_editing.save_preview_to_additive(
+            armature_obj,
+            preview,
+            additive,
+            base,
+            preview[additive_editing.BASE_MODE],
+            int(preview[additive_editing.BASE_FRAME]),
+        )
+        additive_editing.restore_session(armature_obj, remove_preview=True)
+
+    def run(self):
+        reset_scene()
+        self.stage("import_mdb", self.import_mdb)
+        self.stage("export_mdb_edf5", lambda: self.export_mdb(5))
+        self.stage("export_mdb_edf6", lambda: self.export_mdb(6))
+        if self.canm_path is None:
+            return self
+        self.stage("import_canm", self.import_canm)
+        self.stage("export_canm", self.export_canm)
+        pair = self.additive_actions()
+        if pair is None:
+            print("Skipping additive editing: fewer than two CANM Actions.")
+            return self
+        self.stage("additive_start", lambda: self.additive_start(*pair))
+        self.stage("additive_save", self.additive_save)
+        return self
+
+
+def summarize(runs):
+    results = {}
+    for name in STAGES:
+        timings = [run.seconds[name] for run in runs if name in run.seconds]
+        if not timings:
+            continue
+        peaks = [run.peak_rss[name] for run in runs if name in run.peak_rss]
+        results[name] = {
+            "seconds": statistics.median(timings),
+            "min_seconds": min(timings),
+            "max_seconds": max(timings),
+            "peak_rss_mb": None if None in peaks else max(peaks),
+        }
+    return results
+
+
+def compare_with_baseline(report, baseline, threshold):
+    """Return the stages that got slower, and a peak RSS that grew."""
+    regressions = []
+    for name, result in report["results"].items():
+        expected = baseline.get("results", {}).get(name)
+        if expected is None:
+            continue
+        ceiling = expected["seconds"] * (1.0 + threshold)
+        if result["seconds"] > ceiling:
+            regressions.append(
+                f"{name}: {result['seconds'] * 1000:.1f} ms is above "
+                f"{ceiling * 1000:.1f} ms "
+                f"(baseline {expected['seconds'] * 1000:.1f} ms)"
+            )
+    peak = report.get("peak_rss_mb")
+    expected_peak = baseline.get("peak_rss_mb")
+    if peak is not None and expected_peak is not None:
+        ceiling = expected_peak * (1.0 + threshold)
+        if peak > ceiling:
+            regressions.append(
+                f"peak RSS: {peak:.1f} MB is above {ceiling:.1f} MB "
+                f"(baseline {expected_peak:.1f} MB)"
+            )
+    return regressions
+
+
+def parse_arguments(argv):
+    model = SyntheticConfig()
+    animation = SyntheticAnimationConfig()
+    parser = argparse.ArgumentParser(
+        prog="blender --background --python benchmarks/blender_benchmark.py --",
+        description=__doc__.split("\n\n")[0],
+    )
+    parser.add_argument("--mdb", type=Path, help="Benchmark this model.")
+    parser.add_argument(
+        "--canm",
+        type=Path,
+        help="Benchmark this animation; it must match --mdb.",
+    )
+    parser.add_argument("--objects", type=int, default=model.objects)
+    parser.add_argument(
+        "--meshes-per-object",
+        type=int,
+        default=model.meshes_per_object,
+    )
+    parser.add_argument(
+        "--vertices-per-mesh",
+        type=int,
+        default=model.vertices_per_mesh,
+    )
+    parser.add_argument("--bones", type=int, default=model.bones)
+    parser.add_argument("--animations", type=int, default=animation.animations)
+    parser.add_argument("--keyframes", type=int, default=animation.keyframes)
+    parser.add_argument(
+        "--animated-bones",
+        type=int,
+        default=animation.animated_bones,
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Compare against this results file.")
+    parser.add_argument(
+        "--write-baseline",
+        help="Store the results as a baseline at this path.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Allowed fractional slowdown before failing (default 0.15).",
+    )
+    arguments = parser.parse_args(argv)
+    if arguments.canm is not None and arguments.mdb is None:
+        parser.error("--canm needs the matching --mdb")
+    if arguments.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return arguments
+
+
+def synthetic_assets(arguments, output):
+    model = SyntheticConfig(
+        objects=arguments.objects,
+        meshes_per_object=arguments.meshes_per_object,
+        vertices_per_mesh=arguments.vertices_per_mesh,
+        bones=arguments.bones,
+        seed=arguments.seed,
+    )
+    animation = SyntheticAnimationConfig(
+        bones=arguments.bones,
+        animations=arguments.animations,
+        keyframes=arguments.keyframes,
+        animated_bones=arguments.animated_bones,
+        seed=arguments.seed,
+    )
+    mdb_path = output / "synthetic.mdb"
+    canm_path = output / "synthetic.canm"
+    mdb_path.write_bytes(synthetic_mdb_bytes(model))
+    canm_path.write_bytes(synthetic_canm_bytes(animation))
+    config = {"model": model.as_dict(), "animation": animation.as_dict()}
+    return mdb_path, canm_path, config
+
+
+def main(argv):
+    arguments = parse_arguments(argv)
+    modules = load_addon()
+    with tempfile.TemporaryDirectory(prefix="edf_benchmark_") as directory:
+        output = Path(directory)
+        if arguments.mdb is None:
+            mdb_path, canm_path, config = synthetic_assets(arguments, output)
+        else:
+            mdb_path = arguments.mdb.resolve()
+            canm_path = arguments.canm.resolve() if arguments.canm else None
+            config = {
+                "mdb": mdb_path.name,
+                "canm": canm_path.name if canm_path else None,
+            }
+        runs = [
+            Run(modules, mdb_path, canm_path, output).run()
+            for _ in range(arguments.repeat)
+        ]
+    reset_scene()
+
+    report = {
+        "benchmark": "blender",
+        "blender": bpy.app.version_string,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "repeat": arguments.repeat,
+        "peak_rss_mb": peak_rss_megabytes(),
+        "results": summarize(runs),
+    }
+    for name, result in report["results"].items():
+        peak = result["peak_rss_mb"]
+        print(
+            f"BENCHMARK: {name:>16}: {result['seconds'] * 1000:9.1f} ms"
+            + (f"  peak RSS {peak:8.1f} MB" if peak is not None else "")
+        )
+
+    for path in (arguments.json, arguments.write_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline, encoding="utf-8") as stream:
+            baseline = json.load(stream)
+        if baseline.get("config") != report["config"]:
+            print("WARNING: baseline was recorded with a different configuration.")
+        if baseline.get("blender") != report["blender"]:
+            print("WARNING: baseline was recorded with a different Blender.")
+        regressions = compare_with_baseline(report, baseline, arguments.threshold)
+        if regressions:
+            for regression in regressions:
+                print(f"REGRESSION: {regression}")
+            return 1
+        print(f"No regression beyond {arguments.threshold:.0%} of the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    separator = sys.argv.index("--") + 1 if "--" in sys.argv else len(sys.argv)
+    sys.exit(main(sys.argv[separator:]))
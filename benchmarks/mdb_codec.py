@@ -0,0 +1,220 @@
+"""Benchmark the bpy-free MDB parser and writer under plain CPython.
+
+Run from the repository root::
+
+    python benchmarks/mdb_codec.py --vertices-per-mesh 4000 --json results.json
+    python benchmarks/mdb_codec.py --repeat 9 --baseline benchmarks/baseline.json
+    python benchmarks/mdb_codec.py --repeat 9 --write-baseline local.json
+
+Each benchmark reports the median of ``--repeat`` runs. With ``--baseline``
+the run fails (exit status 1) when a throughput drops more than
+``--threshold`` below the stored value. Baselines are machine specific:
+``benchmarks/baseline.json`` is a reference run of the default configuration
+on the machine recorded in it, so record your own before comparing elsewhere.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from addon import load_module
+from synthetic import (
+    SyntheticConfig,
+    synthetic_export_data,
+    synthetic_mdb_bytes,
+    vertex_count,
+)
+
+
+MDB_PARSER = load_module("mdb_parser")
+MDB_WRITER = load_module("mdb_writer")
+
+MEGABYTE = 1024 * 1024
+
+
+def time_runs(run, repeat, prepare=None):
+    timings = []
+    for _ in range(repeat):
+        argument = prepare() if prepare is not None else None
+        started = time.perf_counter()
+        run(argument)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def throughput(timings, byte_count, vertices):
+    seconds = statistics.median(timings)
+    return {
+        "seconds": seconds,
+        "min_seconds": min(timings),
+        "mb_per_second": byte_count / MEGABYTE / seconds,
+        "vertices_per_second": vertices / seconds,
+    }
+
+
+def parse_bytes(encoded):
+    mdb = MDB_PARSER.parse_mdb(io.BytesIO(encoded))
+    return sum(
+        len(mesh["vertices"])
+        for mdb_object in mdb["objects"]
+        for mesh in mdb_object["meshes"]
+    )
+
+
+def write_data(data):
+    stream = io.BytesIO()
+    MDB_WRITER.write_mdb(stream, data)
+    return stream.getvalue()
+
+
+def run_benchmarks(config, repeat):
+    encoded = synthetic_mdb_bytes(config)
+    vertices = vertex_count(config)
+    parsed_vertices = parse_bytes(encoded)
+    if parsed_vertices != vertices:
+        raise RuntimeError(
+            f"Parsed {parsed_vertices} vertices, expected {vertices}."
+        )
+
+    parse_timings = time_runs(lambda _: parse_bytes(encoded), repeat)
+    write_timings = time_runs(
+        write_data,
+        repeat,
+        prepare=lambda: synthetic_export_data(config),
+    )
+    round_trip_timings = time_runs(
+        lambda data: parse_bytes(write_data(data)),
+        repeat,
+        prepare=lambda: synthetic_export_data(config),
+    )
+    return {
+        "parse": throughput(parse_timings, len(encoded), vertices),
+        "write": throughput(write_timings, len(encoded), vertices),
+        "round_trip": throughput(round_trip_timings, len(encoded), vertices),
+    }
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """Return the benchmarks whose throughput fell below the baseline."""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get("results", {}).get(name)
+        if expected is None:
+            continue
+        floor = expected["mb_per_second"] * (1.0 - threshold)
+        if result["mb_per_second"] < floor:
+            regressions.append(
+                f"{name}: {result['mb_per_second']:.2f} MB/s is below "
+                f"{floor:.2f} MB/s (baseline {expected['mb_per_second']:.2f})"
+            )
+    return regressions
+
+
+def parse_arguments(argv):
+    defaults = SyntheticConfig()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--objects", type=int, default=defaults.objects)
+    parser.add_argument(
+        "--meshes-per-object",
+        type=int,
+        default=defaults.meshes_per_object,
+    )
+    parser.add_argument(
+        "--vertices-per-mesh",
+        type=int,
+        default=defaults.vertices_per_mesh,
+        help="At most 65,536; MDB indices are 16-bit.",
+    )
+    parser.add_argument("--bones", type=int, default=defaults.bones)
+    parser.add_argument("--materials", type=int, default=defaults.materials)
+    parser.add_argument("--uv-channels", type=int, default=defaults.uv_channels)
+    parser.add_argument(
+        "--game-version",
+        type=int,
+        choices=(5, 6),
+        default=defaults.game_version,
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Compare against this results file.")
+    parser.add_argument(
+        "--write-baseline",
+        help="Store the results as a baseline at this path.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Allowed fractional throughput drop before failing (default 0.15).",
+    )
+    arguments = parser.parse_args(argv)
+    if not 3 <= arguments.vertices_per_mesh <= 0x10000:
+        parser.error("--vertices-per-mesh must be between 3 and 65,536")
+    if arguments.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return arguments
+
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    config = SyntheticConfig(
+        objects=arguments.objects,
+        meshes_per_object=arguments.meshes_per_object,
+        vertices_per_mesh=arguments.vertices_per_mesh,
+        bones=arguments.bones,
+        materials=arguments.materials,
+        uv_channels=arguments.uv_channels,
+        game_version=arguments.game_version,
+        seed=arguments.seed,
+    )
+    report = {
+        "benchmark": "mdb_codec",
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "config": config.as_dict(),
+        "repeat": arguments.repeat,
+        "results": run_benchmarks(config, arguments.repeat),
+    }
+    for name, result in report["results"].items():
+        print(
+            f"{name:>10}: {result['seconds'] * 1000:9.1f} ms  "
+            f"{result['mb_per_second']:8.2f} MB/s  "
+            f"{result['vertices_per_second']:12.0f} vertices/s"
+        )
+
+    for path in (arguments.json, arguments.write_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline, encoding="utf-8") as stream:
+            baseline = json.load(stream)
+        if baseline.get("config") != report["config"]:
+            print("WARNING: baseline was recorded with a different configuration.")
+        regressions = compare_with_baseline(
+            report["results"],
+            baseline,
+            arguments.threshold,
+        )
+        if regressions:
+            for regression in regressions:
+                print(f"REGRESSION: {regression}")
+            return 1
+        print(f"No regression beyond {arguments.threshold:.0%} of the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,477 @@
+"""Deterministic synthetic MDB models and CANM animations.
+
+The MDB records have the shape ``export_mdb`` hands to ``mdb_writer``: skinned
+meshes with the exporter's vertex layout, a bone chain, and materials with
+parameters and texture bindings. The CANM records have the shape
+``export_canm`` hands to ``canm_writer``: one shared static channel plus an
+animated position, rotation and scale channel per animated bone. Bone names
+match between the two, so a generated CANM plays on the generated MDB.
+
+Values come from a seeded generator, so the same configuration always produces
+the same bytes. Run this file to write a pair of fixtures::
+
+    python benchmarks/synthetic.py OUTPUT_DIR --bones 1200 --keyframes 300
+"""
+
+import argparse
+import io
+import math
+import random
+import sys
+import types
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from addon import load_module
+
+
+CANM_FORMAT = load_module("canm_format")
+CANM_WRITER = load_module("canm_writer")
+MDB_FORMAT = load_module("mdb_format")
+MDB_WRITER = load_module("mdb_writer")
+
+# CANM bone records reference channels through unsigned 16-bit indices, with
+# 0xFFFF meaning "no channel".
+MAX_CANM_CHANNELS = 0xFFFF
+MAX_WEIGHTED_BONES = 256
+
+IDENTITY = [1.0 if row == column else 0.0 for row in range(4) for column in range(4)]
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    objects: int = 8
+    meshes_per_object: int = 4
+    vertices_per_mesh: int = 2000
+    bones: int = 64
+    materials: int = 8
+    uv_channels: int = 2
+    game_version: int = 5
+    seed: int = 1
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def layout(name, vertex_type, channel=0):
+    return {
+        "name": name,
+        "type": vertex_type,
+        "size": MDB_FORMAT.VERTEX_TYPE_SIZES[vertex_type],
+        "channel": channel,
+        "data": [],
+    }
+
+
+def synthetic_mesh(rng, config, mesh_index):
+    vertex_count = config.vertices_per_mesh
+    layouts = [
+        layout("BLENDINDICES", MDB_FORMAT.VERTEX_TYPE_UBYTE4),
+        layout("BLENDWEIGHT", MDB_FORMAT.VERTEX_TYPE_FLOAT4),
+        layout("binormal", MDB_FORMAT.VERTEX_TYPE_HALF4),
+        layout("normal", MDB_FORMAT.VERTEX_TYPE_HALF4),
+        layout("position", MDB_FORMAT.VERTEX_TYPE_HALF4),
+        layout("tangent", MDB_FORMAT.VERTEX_TYPE_HALF4),
+    ]
+    texcoord_name = "TEXCOORD" if config.game_version == 6 else "texcoord"
+    layouts.extend(
+        layout(texcoord_name, MDB_FORMAT.VERTEX_TYPE_FLOAT2, channel)
+        for channel in range(config.uv_channels)
+    )
+    offset = 0
+    for entry in layouts:
+        entry["offset"] = offset
+        offset += entry["size"]
+
+    bone_limit = min(config.bones, MAX_WEIGHTED_BONES)
+    for _ in range(vertex_count):
+        weights = [rng.random() for _ in range(4)]
+        total = sum(weights)
+        for entry in layouts:
+            name = entry["name"].lower()
+            if name == "blendindices":
+                values = [rng.randrange(bone_limit) for _ in range(4)]
+            elif name == "blendweight":
+                values = [weight / total for weight in weights]
+            elif name == "texcoord":
+                values = [rng.random(), rng.random()]
+            else:
+                values = [rng.uniform(-1.0, 1.0) for _ in range(3)] + [1.0]
+            entry["data"].append(values)
+
+    indices = []
+    for first in range(0, vertex_count - 2):
+        indices.extend((first, first + 1, first + 2))
+    return {
+        "is_skinned": 1,
+        "bone_influence_count": 4,
+        "material_index": mesh_index % max(1, config.materials),
+        "vertex_count": vertex_count,
+        "mesh_index": mesh_index,
+        "vertex_layouts": layouts,
+        "vertex_stride": offset,
+        "layout_count": len(layouts),
+        "index_count": len(indices),
+        "indices": indices,
+    }
+
+
+def synthetic_bone(index, name_index, bone_count):
+    return {
+        "index": index,
+        "parent": index - 1,
+        "next_sibling": -1,
+        "first_child": index + 1 if index + 1 < bone_count else -1,
+        "name_index": name_index,
+        "child_count": 1 if index + 1 < bone_count else 0,
+        "participation_metadata": 3,
+        "semantic_role": 0,
+        "normalized_bone_flag": 0,
+        "local_matrix": list(IDENTITY),
+        "inverse_bind_matrix": list(IDENTITY),
+        "bounds_half_size": [1.0, 1.0, 1.0, 1.0],
+        "bounds_center": [0.0, 0.0, 0.0, 1.0],
+    }
+
+
+def synthetic_material(index, name_index, texture_count):
+    return {
+        "index": index,
+        "mat_name_index": name_index,
+        "draw_priority": 0,
+        "render_queue_class": 0,
+        "render_participation_flags": 0,
+        "shader_name": "SyntheticShader",
+        "parameters": [
+            {
+                "name": f"param{parameter}",
+                "values": [float(parameter)] * 6,
+                "type": 3,
+                "size": 4,
+            }
+            for parameter in range(8)
+        ],
+        "parameter_count": 8,
+        "textures": [
+            {
+                "texture_index": texture_index,
+                "type": slot,
+                "sampler_flags": 0,
+                "filter": 0,
+                "address_u": 0,
+                "address_v": 0,
+                "address_w": 0,
+                "max_anisotropy": 0,
+                "min_lod": 0.0,
+                "max_lod": 0.0,
+                "lod_bias": 0.0,
+            }
+            for texture_index, slot in enumerate(
+                ("albedo", "normal")[:texture_count],
+            )
+        ],
+        "texture_count": min(2, texture_count),
+    }
+
+
+def bone_name(index):
+    return f"bone{index:04d}"
+
+
+def synthetic_export_data(config):
+    """Build fresh writer input. ``write_mdb`` annotates it, so use it once."""
+    rng = random.Random(config.seed)
+    names = [bone_name(index) for index in range(config.bones)]
+    bones = [
+        synthetic_bone(index, index, config.bones)
+        for index in range(config.bones)
+    ]
+    textures = [
+        {"index": 0, "name": "albedo", "filename": "synthetic_albedo.dds"},
+        {"index": 1, "name": "normal", "filename": "synthetic_normal.dds"},
+    ]
+    materials = []
+    for index in range(config.materials):
+        names.append(f"material{index:03d}")
+        materials.append(synthetic_material(index, len(names) - 1, len(textures)))
+    objects = []
+    for index in range(config.objects):
+        names.append(f"object{index:03d}")
+        mesh_data = [
+            synthetic_mesh(rng, config, mesh_index)
+            for mesh_index in range(config.meshes_per_object)
+        ]
+        objects.append({
+            "index": index,
+            "name_index": len(names) - 1,
+            "mesh_count": len(mesh_data),
+            "mesh_data": mesh_data,
+        })
+    return types.SimpleNamespace(
+        game_version=config.game_version,
+        file_version=(
+            MDB_FORMAT.EDF5_VERSION
+            if config.game_version == 5
+            else MDB_FORMAT.EDF6_VERSION
+        ),
+        names=names,
+        bones=bones,
+        textures=textures,
+        materials=materials,
+        objects=objects,
+        ascii_strings=[],
+        utf16_strings=[],
+    )
+
+
+def synthetic_mdb_bytes(config):
+    stream = io.BytesIO()
+    MDB_WRITER.write_mdb(stream, synthetic_export_data(config))
+    return stream.getvalue()
+
+
+def vertex_count(config):
+    return config.objects * config.meshes_per_object * config.vertices_per_mesh
+
+
+@dataclass(frozen=True)
+class SyntheticAnimationConfig:
+    bones: int = 64
+    animations: int = 8
+    keyframes: int = 60
+    animated_bones: int = 32
+    game_version: int = 5
+    seed: int = 1
+
+    def as_dict(self):
+        return asdict(self)
+
+    @property
+    def channel_count(self):
+        animated = min(self.animated_bones, self.bones)
+        static = 2 if self.game_version == 6 else 1
+        return static + self.animations * animated * 3
+
+
+def quantized_axis(values):
+    base = min(values)
+    difference = max(values) - base
+    if difference == 0:
+        return base, 0.0, [0] * len(values)
+    return (
+        base,
+        difference / 0xFFFF,
+        [int((value - base) * 0xFFFF / difference) for value in values],
+    )
+
+
+def vector_channel(rng, config, scale):
+    values = [
+        [rng.uniform(-scale, scale) for _ in range(config.keyframes)]
+        for _ in range(3)
+    ]
+    channel = {"has_frames": True, "keyframes": config.keyframes}
+    for axis, axis_values in zip("xyz", values):
+        base, speed, offsets = quantized_axis(axis_values)
+        channel[f"base_{axis}"] = base
+        channel[f"speed_{axis}"] = speed
+        channel[f"offsets_{axis}"] = offsets
+    if config.game_version == 6:
+        channel.update({"type": 1, "base_w": 1.0, "speed_w": 0.0})
+    return channel
+
+
+def quaternion_channel(rng, config):
+    frames = []
+    for _ in range(config.keyframes):
+        components = [rng.gauss(0.0, 1.0) for _ in range(4)]
+        length = math.sqrt(sum(component * component for component in components))
+        frames.append(tuple(component / length for component in components))
+    return {
+        "has_frames": True,
+        "type": 3,
+        "keyframes": config.keyframes,
+        "frames": frames,
+        "base_x": frames[0][0],
+        "base_y": frames[0][1],
+        "base_z": frames[0][2],
+        "base_w": frames[0][3],
+        "speed_x": 0.0,
+        "speed_y": 0.0,
+        "speed_z": 0.0,
+        "speed_w": 0.0,
+    }
+
+
+def static_channels(game_version):
+    channel = {
+        "has_frames": False,
+        "keyframes": 1,
+        "base_x": 0.0,
+        "base_y": 0.0,
+        "base_z": 0.0,
+        "speed_x": 0.0,
+        "speed_y": 0.0,
+        "speed_z": 0.0,
+        "offsets_x": [],
+        "offsets_y": [],
+        "offsets_z": [],
+    }
+    if game_version == 5:
+        return [channel]
+    channel.update({"type": 0, "base_w": 1.0, "speed_w": 0.0})
+    rotation = dict(channel, type=2)
+    return [channel, rotation]
+
+
+def synthetic_animation_data(config):
+    """Build fresh ``(bone_names, animations, channels)`` writer input."""
+    if config.channel_count > MAX_CANM_CHANNELS:
+        raise ValueError(
+            f"{config.channel_count} channels exceed the CANM limit of "
+            f"{MAX_CANM_CHANNELS}; lower the animations or animated bones"
+        )
+    if config.game_version == 5 and config.keyframes > 0xFFFF:
+        raise ValueError("EDF5 channels support at most 65,535 keyframes")
+    rng = random.Random(config.seed)
+    bone_names = [bone_name(index) for index in range(config.bones)]
+    channels = static_channels(config.game_version)
+    static_rotation = len(channels) - 1
+    animated = min(config.animated_bones, config.bones)
+    animations = []
+    for animation_index in range(config.animations):
+        bone_data = []
+        for index in range(config.bones):
+            if index >= animated:
+                bone_data.append({
+                    "index": index,
+                    "channel_index_pos": 0,
+                    "channel_index_rot": static_rotation,
+                    "channel_index_scale": -1,
+                })
+                continue
+            position = len(channels)
+            channels.append(vector_channel(rng, config, 1.0))
+            if config.game_version == 6:
+                channels.append(quaternion_channel(rng, config))
+            else:
+                channels.append(vector_channel(rng, config, math.pi))
+            channels.append(vector_channel(rng, config, 0.1))
+            bone_data.append({
+                "index": index,
+                "channel_index_pos": position,
+                "channel_index_rot": position + 1,
+                "channel_index_scale": position + 2,
+            })
+        duration = float(max(1, config.keyframes - 1))
+        animations.append({
+            "name": f"animation{animation_index:03d}",
+            "loop": animation_index % 2 == 0,
+            "duration": duration,
+            "between_keyframes": duration / max(1, config.keyframes - 1),
+            "keyframes": config.keyframes,
+            "bone_data": bone_data,
+        })
+    return bone_names, animations, channels
+
+
+def synthetic_canm_bytes(config):
+    bone_names, animations, channels = synthetic_animation_data(config)
+    file_version = (
+        CANM_FORMAT.CANM5_VERSION
+        if config.game_version == 5
+        else CANM_FORMAT.CANM6_VERSION
+    )
+    stream = io.BytesIO()
+    CANM_WRITER.write_canm(stream, file_version, bone_names, animations, channels)
+    return stream.getvalue()
+
+
+def parse_arguments(argv):
+    model = SyntheticConfig()
+    animation = SyntheticAnimationConfig()
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic MDB model and a matching CANM file.",
+    )
+    parser.add_argument("output", type=Path, help="Folder to write into.")
+    parser.add_argument("--name", default="synthetic")
+    parser.add_argument("--game-version", type=int, choices=(5, 6), default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--bones",
+        type=int,
+        default=model.bones,
+        help="Total bones; only the first 256 carry mesh weights.",
+    )
+    parser.add_argument("--objects", type=int, default=model.objects)
+    parser.add_argument(
+        "--meshes-per-object",
+        type=int,
+        default=model.meshes_per_object,
+    )
+    parser.add_argument(
+        "--vertices-per-mesh",
+        type=int,
+        default=model.vertices_per_mesh,
+        help="At most 65,536; MDB indices are 16-bit.",
+    )
+    parser.add_argument("--uv-channels", type=int, default=model.uv_channels)
+    parser.add_argument("--materials", type=int, default=model.materials)
+    parser.add_argument("--animations", type=int, default=animation.animations)
+    parser.add_argument("--keyframes", type=int, default=animation.keyframes)
+    parser.add_argument(
+        "--animated-bones",
+        type=int,
+        default=animation.animated_bones,
+        help="Bones with their own channels in every animation.",
+    )
+    parser.add_argument("--no-canm", action="store_true")
+    arguments = parser.parse_args(argv)
+    if not 3 <= arguments.vertices_per_mesh <= 0x10000:
+        parser.error("--vertices-per-mesh must be between 3 and 65,536")
+    if not 1 <= arguments.uv_channels <= 4:
+        parser.error("--uv-channels must be between 1 and 4")
+    if arguments.keyframes < 2:
+        parser.error("--keyframes must be at least 2")
+    return arguments
+
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    model = SyntheticConfig(
+        objects=arguments.objects,
+        meshes_per_object=arguments.meshes_per_object,
+        vertices_per_mesh=arguments.vertices_per_mesh,
+        bones=arguments.bones,
+        materials=arguments.materials,
+        uv_channels=arguments.uv_channels,
+        game_version=arguments.game_version,
+        seed=arguments.seed,
+    )
+    arguments.output.mkdir(parents=True, exist_ok=True)
+    mdb_path = arguments.output / f"{arguments.name}.mdb"
+    mdb_path.write_bytes(synthetic_mdb_bytes(model))
+    print(f"Wrote {mdb_path} ({vertex_count(model)} vertices)")
+    if arguments.no_canm:
+        return 0
+    animation = SyntheticAnimationConfig(
+        bones=arguments.bones,
+        animations=arguments.animations,
+        keyframes=arguments.keyframes,
+        animated_bones=arguments.animated_bones,
+        game_version=arguments.game_version,
+        seed=arguments.seed,
+    )
+    try:
+        encoded = synthetic_canm_bytes(animation)
+    except ValueError as error:
+        print(f"ERROR: {error}")
+        return 1
+    canm_path = arguments.output / f"{arguments.name}.canm"
+    canm_path.write_bytes(encoded)
+    print(f"Wrote {canm_path} ({animation.channel_count} channels)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
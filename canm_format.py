@@ -0,0 +1,31 @@
+"""Shared constants for the CANM animation format.
+
+This module deliberately has no Blender dependency. Keep Action construction
+in ``import_canm``/``export_canm`` and put binary-format facts here.
+"""
+
+
+MAGIC = b'CANM'
+HEADER_SIZE = 0x20
+CANM5_VERSION = 512
+CANM6_VERSION = 768
+SUPPORTED_VERSIONS = (CANM5_VERSION, CANM6_VERSION)
+
+ANIMATION_RECORD_SIZE = 0x1C
+BONE_DATA_RECORD_SIZE = 0x08
+CHANNEL5_RECORD_SIZE = 0x20
+CHANNEL6_RECORD_SIZE = 0x30
+BONE_NAME_RECORD_SIZE = 0x04
+
+# Bone records reference channels through unsigned 16-bit indices.
+NO_CHANNEL = 0xFFFF
+
+# EDF6 channel types. EDF5 channels are always vectors.
+CHANNEL_STATIC_VECTOR = 0
+CHANNEL_VECTOR = 1
+CHANNEL_STATIC_QUATERNION = 2
+CHANNEL_QUATERNION = 3
+
+
+class CanmFormatError(ValueError):
+    """Raised when a CANM stream is truncated or structurally invalid."""
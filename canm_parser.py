@@ -0,0 +1,510 @@
+"""Binary CANM parser.
+
+The animation, bone and channel tables are read as NumPy structured arrays and
+keyframe blocks are returned as read-only views of the file bytes: ``(N, 3)``
+unsigned 16-bit offsets for vector channels and ``(N, 4)`` float32 ``xyzw``
+quaternions for EDF6 rotation channels. The parser produces plain
+dictionaries and has no ``bpy`` dependency; Action construction belongs in
+``import_canm``.
+"""
+
+import hashlib
+
+import numpy as np
+
+from .canm_format import (
+    ANIMATION_RECORD_SIZE,
+    BONE_DATA_RECORD_SIZE,
+    BONE_NAME_RECORD_SIZE,
+    CANM6_VERSION,
+    CHANNEL5_RECORD_SIZE,
+    CHANNEL6_RECORD_SIZE,
+    CHANNEL_QUATERNION,
+    CHANNEL_VECTOR,
+    HEADER_SIZE,
+    MAGIC,
+    NO_CHANNEL,
+    SUPPORTED_VERSIONS,
+    CanmFormatError,
+)
+
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('version', '<u4'),
+    ('animation_count', '<u4'),
+    ('animation_offset', '<u4'),
+    ('channel_count', '<u4'),
+    ('channel_offset', '<u4'),
+    ('bone_count', '<u4'),
+    ('bone_offset', '<u4'),
+])
+ANIMATION_DTYPE = np.dtype([
+    ('loop', '<u4'),
+    ('name_offset', '<i4'),
+    ('duration', '<f4'),
+    ('frame_duration', '<f4'),
+    ('keyframes', '<u4'),
+    ('bone_data_count', '<u4'),
+    ('bone_data_offset', '<u4'),
+])
+CHANNEL5_DTYPE = np.dtype([
+    ('keyframe', '<u2'),
+    ('keyframe_count', '<u2'),
+    ('base', '<f4', (3,)),
+    ('speed', '<f4', (3,)),
+    ('keyframe_offset', '<i4'),
+])
+CHANNEL6_DTYPE = np.dtype([
+    ('base', '<f4', (4,)),
+    ('speed', '<f4', (4,)),
+    ('keyframe_offset', '<i4'),
+    ('type', '<i4'),
+    ('keyframe_count', '<i4'),
+    ('reserved', '<i4'),
+])
+# Decoded bone records. Channel indices of 0xFFFF become -1.
+BONE_DATA_DTYPE = np.dtype([
+    ('bone_id', '<i4'),
+    ('point_trans_id', '<i4'),
+    ('point_rot_id', '<i4'),
+    ('point_scale_id', '<i4'),
+])
+VECTOR_KEYFRAME_DTYPE = np.dtype('<u2')
+QUATERNION_KEYFRAME_DTYPE = np.dtype('<f4')
+
+for dtype, size in (
+    (HEADER_DTYPE, HEADER_SIZE),
+    (ANIMATION_DTYPE, ANIMATION_RECORD_SIZE),
+    (CHANNEL5_DTYPE, CHANNEL5_RECORD_SIZE),
+    (CHANNEL6_DTYPE, CHANNEL6_RECORD_SIZE),
+):
+    assert dtype.itemsize == size, (dtype, size)
+
+AXES3 = ('x', 'y', 'z')
+AXES4 = ('x', 'y', 'z', 'w')
+
+
+def read_table(data, offset, count, dtype, description):
+    """View ``count`` records of ``dtype`` at ``offset`` without copying."""
+    dtype = np.dtype(dtype)
+    end = offset + count * dtype.itemsize
+    if offset < 0 or end > len(data):
+        raise CanmFormatError(
+            f'CANM {description} at 0x{offset:X} ({count} records) runs past '
+            f'the end of the {len(data)}-byte file'
+        )
+    return np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+
+
+def read_wide_string(data, offset, description):
+    if not 0 <= offset < len(data):
+        raise CanmFormatError(
+            f'CANM {description} offset 0x{offset:X} is outside the file'
+        )
+    end = data.find(b'\0\0', offset)
+    while end != -1 and (end - offset) % 2:
+        end = data.find(b'\0\0', end + 1)
+    if end == -1:
+        raise CanmFormatError(f'CANM {description} is not terminated')
+    return bytes(data[offset:end]).decode('utf-16-le')
+
+
+def empty_keyframes(width):
+    dtype = QUATERNION_KEYFRAME_DTYPE if width == 4 else VECTOR_KEYFRAME_DTYPE
+    return np.empty((0, width), dtype=dtype)
+
+
+def read_keyframes(data, offset, count, width, dtype, description):
+    values = read_table(data, offset, count * width, dtype, description)
+    return values.reshape(count, width)
+
+
+def channel_keys(axes):
+    return tuple(f'base_{axis}' for axis in axes) + tuple(
+        f'speed_{axis}' for axis in axes
+    )
+
+
+CHANNEL5_KEYS = channel_keys(AXES3)
+CHANNEL6_KEYS = channel_keys(AXES4)
+
+
+def keyframe_starts(rows, indices, offset, record_size):
+    """Absolute keyframe offsets; the stored ones are record-relative."""
+    records = offset + record_size * np.asarray(indices, dtype=np.int64)
+    return (records + rows['keyframe_offset']).tolist()
+
+
+def channel_rows(table, selected):
+    """Indices and records of the channels to decode."""
+    if selected is None:
+        return range(len(table)), table
+    indices = np.flatnonzero(selected)
+    return indices.tolist(), table[indices]
+
+
+def parse_channels5(data, count, offset, selected=None):
+    """Parse EDF5's 0x20-byte channels; every channel is a vector.
+
+    With a boolean ``selected`` mask only those channels are decoded and the
+    others are ``None``, so channel indices stay valid.
+    """
+    table = read_table(data, offset, count, CHANNEL5_DTYPE, 'channel table')
+    indices, rows = channel_rows(table, selected)
+    channels = [None] * count
+    for index, values, flag, keyframe_count, keyframe_start in zip(
+        indices,
+        np.concatenate((rows['base'], rows['speed']), axis=1).tolist(),
+        rows['keyframe'].tolist(),
+        rows['keyframe_count'].tolist(),
+        keyframe_starts(rows, indices, offset, CHANNEL5_RECORD_SIZE),
+    ):
+        channel = dict(zip(CHANNEL5_KEYS, values))
+        channel['type'] = CHANNEL_VECTOR
+        channel['keyframe'] = flag == 1
+        if channel['keyframe']:
+            channel['keyframes'] = read_keyframes(
+                data,
+                keyframe_start,
+                keyframe_count,
+                3,
+                VECTOR_KEYFRAME_DTYPE,
+                f'channel {index} keyframes',
+            )
+        else:
+            channel['keyframes'] = empty_keyframes(3)
+        channels[index] = channel
+    return channels
+
+
+def parse_channels6(data, count, offset, selected=None):
+    """Parse EDF6's 0x30-byte channels, like ``parse_channels5``."""
+    table = read_table(data, offset, count, CHANNEL6_DTYPE, 'channel table')
+    indices, rows = channel_rows(table, selected)
+    channels = [None] * count
+    for index, values, channel_type, keyframe_count, keyframe_start in zip(
+        indices,
+        np.concatenate((rows['base'], rows['speed']), axis=1).tolist(),
+        rows['type'].tolist(),
+        rows['keyframe_count'].tolist(),
+        keyframe_starts(rows, indices, offset, CHANNEL6_RECORD_SIZE),
+    ):
+        channel = dict(zip(CHANNEL6_KEYS, values))
+        channel['type'] = channel_type
+        if keyframe_count > 1 and channel_type == CHANNEL_VECTOR:
+            channel['keyframes'] = read_keyframes(
+                data,
+                keyframe_start,
+                keyframe_count,
+                3,
+                VECTOR_KEYFRAME_DTYPE,
+                f'channel {index} keyframes',
+            )
+        elif keyframe_count > 1 and channel_type == CHANNEL_QUATERNION:
+            channel['keyframes'] = read_keyframes(
+                data,
+                keyframe_start,
+                keyframe_count,
+                4,
+                QUATERNION_KEYFRAME_DTYPE,
+                f'channel {index} keyframes',
+            )
+        else:
+            if keyframe_count > 1:
+                print(
+                    f'Warning: CANM6 channel {index} has unexpected type '
+                    f'{channel_type} with {keyframe_count} keyframes.'
+                )
+            channel['keyframes'] = empty_keyframes(
+                4 if channel_type == CHANNEL_QUATERNION else 3
+            )
+        channels[index] = channel
+    return channels
+
+
+def parse_bone_data(data, count, offset):
+    fields = BONE_DATA_RECORD_SIZE // 2
+    raw = read_table(
+        data,
+        offset,
+        count * fields,
+        '<u2',
+        'bone data',
+    ).reshape(count, fields)
+    bone_data = np.empty(count, dtype=BONE_DATA_DTYPE)
+    for column, name in enumerate(BONE_DATA_DTYPE.names):
+        values = raw[:, column].astype(np.int32)
+        if column:
+            values[values == NO_CHANNEL] = -1
+        bone_data[name] = values
+    return bone_data
+
+
+def clip_record(index, record, table_offset, name):
+    """Describe one animation table entry without its bone data."""
+    (
+        loop,
+        _name_offset,
+        duration,
+        frame_duration,
+        keyframes,
+        bone_data_count,
+        bone_data_offset,
+    ) = record
+    return {
+        'index': index,
+        'name': name,
+        'loop': loop == 1,
+        'duration': duration,
+        'frame_duration': frame_duration,
+        'keyframes': keyframes,
+        'bone_count': bone_data_count,
+        'bone_data_offset': (
+            table_offset + index * ANIMATION_RECORD_SIZE + bone_data_offset
+        ),
+    }
+
+
+def parse_clips(data, count, offset):
+    table = read_table(data, offset, count, ANIMATION_DTYPE, 'animation table')
+    return [
+        clip_record(
+            index,
+            record,
+            offset,
+            read_wide_string(
+                data,
+                offset + index * ANIMATION_RECORD_SIZE + record[1],
+                f'animation {index} name',
+            ),
+        )
+        for index, record in enumerate(table.tolist())
+    ]
+
+
+def select_clips(clips, selection):
+    """Keep the clips named by index or name in ``selection``, in file order."""
+    if selection is None:
+        return clips
+    indices = {item for item in selection if isinstance(item, int)}
+    names = {item for item in selection if not isinstance(item, int)}
+    unknown = (
+        {index for index in indices if not 0 <= index < len(clips)}
+        | names - {clip['name'] for clip in clips}
+    )
+    if unknown:
+        raise KeyError(
+            'CANM has no animation '
+            + ', '.join(repr(item) for item in sorted(unknown, key=str))
+        )
+    return [
+        clip for clip in clips
+        if clip['index'] in indices or clip['name'] in names
+    ]
+
+
+def parse_animations(data, count, offset, selection=None):
+    animations = select_clips(parse_clips(data, count, offset), selection)
+    for animation in animations:
+        animation['bone_data'] = parse_bone_data(
+            data,
+            animation['bone_count'],
+            animation['bone_data_offset'],
+        )
+    return animations
+
+
+def referenced_channels(animations, channel_count):
+    selected = np.zeros(channel_count, dtype=bool)
+    for animation in animations:
+        bone_data = animation['bone_data']
+        for field in BONE_DATA_DTYPE.names[1:]:
+            indices = bone_data[field]
+            indices = indices[indices >= 0]
+            if len(indices) and indices.max() >= channel_count:
+                raise CanmFormatError(
+                    f'CANM animation {animation["name"]!r} references channel '
+                    f'{int(indices.max())} of {channel_count}'
+                )
+            selected[indices] = True
+    return selected
+
+
+def parse_bone_names(data, count, offset):
+    offsets = read_table(data, offset, count, '<i4', 'bone name table')
+    return [
+        read_wide_string(
+            data,
+            offset + index * BONE_NAME_RECORD_SIZE + name_offset,
+            f'bone {index} name',
+        )
+        for index, name_offset in enumerate(offsets.tolist())
+    ]
+
+
+def parse_header(data, override_version=0):
+    header = read_table(data, 0, 1, HEADER_DTYPE, 'header')[0]
+    if header['magic'] != MAGIC:
+        raise CanmFormatError(
+            f'Expected CANM magic {MAGIC!r}, found {bytes(header["magic"])!r}'
+        )
+    version = override_version or int(header['version'])
+    if version not in SUPPORTED_VERSIONS:
+        raise CanmFormatError(
+            f'Unsupported CANM version 0x{version:X}; expected 0x200 (EDF5) '
+            'or 0x300 (EDF6)'
+        )
+    return version, header
+
+
+def parse_canm_bytes(data, override_version=0, animations=None):
+    """Parse a CANM file held in a bytes-like object.
+
+    ``override_version`` forces 512 (EDF5) or 768 (EDF6) channel records
+    instead of the version stored in the header. ``animations`` limits the
+    result to the clips with these indices or names; only the channels they
+    reference are decoded and the other ``anm_points`` entries are ``None``.
+    Keyframe arrays share memory with ``data``.
+    """
+    version, header = parse_header(data, override_version)
+    parse_channels = (
+        parse_channels6 if version == CANM6_VERSION else parse_channels5
+    )
+    channel_count = int(header['channel_count'])
+    parsed_animations = parse_animations(
+        data,
+        int(header['animation_count']),
+        int(header['animation_offset']),
+        animations,
+    )
+    # Validates every channel index, even when all channels are decoded.
+    selected = referenced_channels(parsed_animations, channel_count)
+    return {
+        'version': version,
+        'animations': parsed_animations,
+        'anm_points': parse_channels(
+            data,
+            channel_count,
+            int(header['channel_offset']),
+            None if animations is None else selected,
+        ),
+        'bone_names': parse_bone_names(
+            data,
+            int(header['bone_count']),
+            int(header['bone_offset']),
+        ),
+    }
+
+
+def parse_canm(stream, override_version=0, animations=None):
+    stream.seek(0)
+    return parse_canm_bytes(stream.read(), override_version, animations)
+
+
+def read_stream_wide_string(stream, offset, description, chunk_size=256):
+    stream.seek(offset)
+    data = bytearray()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            raise CanmFormatError(f'CANM {description} is not terminated')
+        data.extend(chunk)
+        end = data.find(b'\0\0')
+        while end != -1 and end % 2:
+            end = data.find(b'\0\0', end + 1)
+        if end != -1:
+            return bytes(data[:end]).decode('utf-16-le')
+
+
+def scan_canm(stream, override_version=0):
+    """Read only the header and the animation table of a CANM stream.
+
+    Returns the version, the channel and bone counts, and one record per clip
+    with its index, name, loop flag, duration, frame duration, keyframe count
+    and animated bone count. No bone data or channels are read.
+    """
+    stream.seek(0)
+    version, header = parse_header(stream.read(HEADER_SIZE), override_version)
+    count = int(header['animation_count'])
+    offset = int(header['animation_offset'])
+    stream.seek(offset)
+    table = read_table(
+        stream.read(count * ANIMATION_RECORD_SIZE),
+        0,
+        count,
+        ANIMATION_DTYPE,
+        'animation table',
+    )
+    clips = [
+        clip_record(
+            index,
+            record,
+            offset,
+            read_stream_wide_string(
+                stream,
+                offset + index * ANIMATION_RECORD_SIZE + record[1],
+                f'animation {index} name',
+            ),
+        )
+        for index, record in enumerate(table.tolist())
+    ]
+    return {
+        'version': version,
+        'channel_count': int(header['channel_count']),
+        'bone_count': int(header['bone_count']),
+        'animations': clips,
+    }
+
+
+def channel_digest(channel):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(sorted(
+        (key, value) for key, value in channel.items() if key != 'keyframes'
+    )).encode())
+    keyframes = np.ascontiguousarray(channel['keyframes'])
+    digest.update(f'{keyframes.dtype.str}{keyframes.shape}'.encode())
+    digest.update(keyframes.tobytes())
+    return digest.digest()
+
+
+def animation_digests(canm):
+    """Content hashes of the parsed animations, in order.
+
+    A hash covers the clip's playback fields and, per animated bone name, the
+    decoded channels it references, but not channel indices or file offsets.
+    Re-exporting an unchanged clip therefore keeps its hash even when other
+    clips moved its channels around.
+    """
+    channels = {}
+    digests = []
+    for animation in canm['animations']:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((
+            animation['loop'],
+            animation['duration'],
+            animation['frame_duration'],
+            animation['keyframes'],
+        )).encode())
+        bones = []
+        for bone_anim in animation['bone_data'].tolist():
+            bone_id = bone_anim[0]
+            bone_names = canm['bone_names']
+            name = bone_names[bone_id] if bone_id < len(bone_names) else bone_id
+            parts = [str(name).encode('utf-8')]
+            for channel_index in bone_anim[1:]:
+                if channel_index < 0:
+                    parts.append(b'-')
+                    continue
+                if channel_index not in channels:
+                    channels[channel_index] = channel_digest(
+                        canm['anm_points'][channel_index]
+                    )
+                parts.append(channels[channel_index])
+            bones.append(parts)
+        for parts in sorted(bones):
+            for part in parts:
+                digest.update(len(part).to_bytes(4, 'little'))
+                digest.update(part)
+        digests.append(digest.hexdigest())
+    return digests
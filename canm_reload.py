@@ -0,0 +1,438 @@
+"""Update imported CANM Actions in place when their file changes on disk.
+
+Import tags every Action with its source file, clip name and a hash of the
+channels the clip references. Updating parses the file again, rebuilds only
+the clips whose hash changed inside their existing NLA tracks, adds new
+clips on new tracks and flags clips that are gone instead of deleting them.
+Watching polls the file's modification time with ``bpy.app.timers`` and
+applies the same update whenever it changes. The watched armature is found
+again by its ``edf_canm_source`` tag, so renaming it keeps the watch.
+"""
+
+import os
+
+import bpy
+
+from bpy.props import BoolProperty, IntProperty, StringProperty
+
+from .canm_format import CanmFormatError
+from .canm_parser import animation_digests, parse_canm
+from .canm_sampling import ChannelCache
+from .import_canm import (
+    CLIP_PROPERTY,
+    DIGEST_PROPERTY,
+    REMOVED_PROPERTY,
+    SOURCE_PROPERTY,
+    create_action_with_animation,
+    map_pose_bones,
+    source_key,
+    store_missing_bones,
+    tag_action,
+)
+from .instrumentation import Recorder
+
+
+WATCH_INTERVAL = 1.0
+
+# Watched source path -> armature object name, last seen mtime and options.
+watched_files = {}
+# Source path -> last watch problem, shown in the EDF sidebar tab.
+watch_messages = {}
+
+
+def imported_clips(armature_object, filepath):
+    """Map clip names imported from ``filepath`` to ``(track, action)``.
+
+    CANM Actions imported before sources were recorded are matched by track
+    name; they have no hash, so the first update rebuilds them.
+    """
+    key = source_key(filepath)
+    clips = {}
+    untagged = {}
+    animation_data = armature_object.animation_data
+    if animation_data is None:
+        return clips
+    for track in animation_data.nla_tracks:
+        for strip in track.strips:
+            action = strip.action
+            if action is None:
+                continue
+            if action.get(SOURCE_PROPERTY) == key:
+                clips.setdefault(
+                    action.get(CLIP_PROPERTY, action.name),
+                    (track, action),
+                )
+            elif SOURCE_PROPERTY not in action and 'keyframes' in action:
+                untagged.setdefault(track.name, (track, action))
+    for name, clip in untagged.items():
+        clips.setdefault(name, clip)
+    return clips
+
+
+def replace_track_action(armature_object, track, old_action):
+    """Empty ``track`` and free ``old_action``'s name for its replacement.
+
+    Returns whether ``old_action`` is the armature's active Action.
+    """
+    for strip in list(track.strips):
+        track.strips.remove(strip)
+    old_action.name = f'{old_action.name}.replaced'
+    animation_data = armature_object.animation_data
+    return animation_data.action == old_action
+
+
+def update_from_file(
+    filepath,
+    armature_object,
+    override_version=0,
+    thin_keyframes=False,
+    recorder=None,
+):
+    """Bring the Actions imported from ``filepath`` up to date.
+
+    Returns a mapping of ``changed``, ``added``, ``removed`` and
+    ``unchanged`` clip names. Changed clips keep their NLA track and its
+    position; removed clips keep their Action and are flagged with
+    ``edf_canm_removed``. Raises ``OSError`` or ``CanmFormatError``.
+    """
+    if recorder is None:
+        recorder = Recorder('CANM update', filepath)
+    with recorder.span('parse'), open(filepath, 'rb') as f:
+        canm = parse_canm(f, override_version)
+    with recorder.span('hash'):
+        digests = animation_digests(canm)
+    existing = imported_clips(armature_object, filepath)
+    result = {'changed': [], 'added': [], 'removed': [], 'unchanged': []}
+
+    rebuild = []
+    for animation, digest in zip(canm['animations'], digests):
+        name = animation['name']
+        current = existing.get(name)
+        if current is None:
+            result['added'].append(name)
+            rebuild.append((animation, digest, None))
+        elif current[1].get(DIGEST_PROPERTY) != digest:
+            result['changed'].append(name)
+            rebuild.append((animation, digest, current))
+        else:
+            result['unchanged'].append(name)
+            if REMOVED_PROPERTY in current[1]:
+                del current[1][REMOVED_PROPERTY]
+    names = {animation['name'] for animation in canm['animations']}
+    key = source_key(filepath)
+    for name, (_track, action) in existing.items():
+        if name not in names and action.get(SOURCE_PROPERTY) == key:
+            result['removed'].append(name)
+            action[REMOVED_PROPERTY] = True
+
+    if rebuild:
+        if armature_object.animation_data is None:
+            armature_object.animation_data_create()
+        mapped_pose_bones = map_pose_bones(canm, armature_object)
+        cache = ChannelCache(
+            canm,
+            animations=[animation for animation, _, _ in rebuild],
+            bone_ids=[bone_index for bone_index, _ in mapped_pose_bones],
+        )
+        for animation, digest, current in rebuild:
+            track = None
+            was_active = False
+            if current is not None:
+                track, old_action = current
+                was_active = replace_track_action(
+                    armature_object,
+                    track,
+                    old_action,
+                )
+            with recorder.span('actions'):
+                action = create_action_with_animation(
+                    armature_object,
+                    animation,
+                    canm,
+                    mapped_pose_bones,
+                    cache,
+                    thin_keyframes,
+                    recorder,
+                    track,
+                )
+            tag_action(action, filepath, animation, digest)
+            if current is not None:
+                if was_active:
+                    armature_object.animation_data.action = action
+                if old_action.users == 0:
+                    bpy.data.actions.remove(old_action)
+        recorder.count('decoded_channels', cache.misses)
+        recorder.count('reused_channels', cache.hits)
+    for name in ('changed', 'added', 'removed'):
+        recorder.count(name, len(result[name]))
+    armature_object[SOURCE_PROPERTY] = source_key(filepath)
+    store_missing_bones(canm, armature_object)
+    return result
+
+
+def summarize(result):
+    return ', '.join(
+        f'{len(result[name])} {name}'
+        for name in ('changed', 'added', 'removed', 'unchanged')
+    )
+
+
+def file_mtime(filepath):
+    try:
+        return os.stat(filepath).st_mtime_ns
+    except OSError:
+        return None
+
+
+def find_watched_armature(filepath, watch):
+    """Return the armature tagged with ``filepath``, or ``None``.
+
+    The armature's name only breaks ties, for example with a duplicate that
+    copied the tag, so a renamed armature is still found.
+    """
+    armatures = [
+        obj for obj in bpy.data.objects
+        if obj.type == 'ARMATURE' and obj.get(SOURCE_PROPERTY) == filepath
+    ]
+    for armature_object in armatures:
+        if armature_object.name == watch['armature']:
+            return armature_object
+    return armatures[0] if armatures else None
+
+
+def report_watch(filepath, message):
+    """Show ``message`` for ``filepath`` in the EDF sidebar tab."""
+    print(message)
+    watch_messages[filepath] = message
+    window_manager = bpy.context.window_manager
+    if window_manager is None:
+        return
+    for window in window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def poll_watched_files():
+    for filepath, watch in list(watched_files.items()):
+        armature_object = find_watched_armature(filepath, watch)
+        if armature_object is None:
+            del watched_files[filepath]
+            report_watch(
+                filepath,
+                f'Stopped watching {filepath}: no armature is tagged with it',
+            )
+            continue
+        watch['armature'] = armature_object.name
+        mtime = file_mtime(filepath)
+        if mtime is None or mtime == watch['mtime']:
+            continue
+        watch['mtime'] = mtime
+        try:
+            with Recorder('CANM update', filepath) as recorder:
+                result = update_from_file(
+                    filepath,
+                    armature_object,
+                    watch['override_version'],
+                    watch['thin_keyframes'],
+                    recorder,
+                )
+        except (OSError, CanmFormatError) as error:
+            # Usually a file that is still being written; the next write
+            # changes the mtime again.
+            report_watch(filepath, f'CANM update: {error}')
+            continue
+        watch_messages.pop(filepath, None)
+        # Timers run outside operators, so give each update its own undo
+        # step instead of merging it into the user's next edit.
+        bpy.ops.ed.undo_push(message='CANM update')
+        if result['changed'] or result['added'] or result['removed']:
+            print(f'CANM update of {filepath}: {summarize(result)}')
+    return WATCH_INTERVAL if watched_files else None
+
+
+def watch_file(filepath, armature_object, override_version=0, thin_keyframes=False):
+    key = source_key(filepath)
+    # The tag is how the watch finds the armature again after a rename.
+    armature_object[SOURCE_PROPERTY] = key
+    watch_messages.pop(key, None)
+    watched_files[key] = {
+        'armature': armature_object.name,
+        'mtime': file_mtime(filepath),
+        'override_version': override_version,
+        'thin_keyframes': thin_keyframes,
+    }
+    if not bpy.app.timers.is_registered(poll_watched_files):
+        bpy.app.timers.register(
+            poll_watched_files,
+            first_interval=WATCH_INTERVAL,
+            persistent=True,
+        )
+
+
+def unwatch_file(filepath):
+    watched_files.pop(source_key(filepath), None)
+    watch_messages.pop(source_key(filepath), None)
+
+
+def stop_watching():
+    watched_files.clear()
+    watch_messages.clear()
+    if bpy.app.timers.is_registered(poll_watched_files):
+        bpy.app.timers.unregister(poll_watched_files)
+
+
+def active_armature(context):
+    obj = context.active_object
+    if obj is not None and obj.type == "ARMATURE":
+        return obj
+    return None
+
+
+def is_watched(filepath):
+    return bool(filepath) and source_key(filepath) in watched_files
+
+
+class CanmSourceOperator:
+    filepath: StringProperty(name="CANM File", subtype="FILE_PATH")
+
+    option_override_version: IntProperty(
+        name="Override Version Int",
+        description="Ignores the file version Int, instead uses this if non 0. 512 == EDF5, 768 == EDF6",
+        default=0,
+    )
+
+    option_thin_keyframes: BoolProperty(
+        name="Thin Keyframes",
+        description=(
+            "Only keep keyframes that linear interpolation cannot reproduce "
+            "in the rebuilt Actions"
+        ),
+        default=False,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = active_armature(context)
+        return obj is not None and obj.mode != "EDIT"
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = active_armature(context).get(SOURCE_PROPERTY, "")
+        return context.window_manager.invoke_props_dialog(self, width=520)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "filepath")
+        layout.prop(self, "option_override_version")
+        layout.prop(self, "option_thin_keyframes")
+
+
+class EDF_OT_update_canm_from_file(CanmSourceOperator, bpy.types.Operator):
+    """Rebuild the CANM Actions of the active armature whose clips changed on disk"""
+
+    bl_idname = "edf.update_canm_from_file"
+    bl_label = "Update CANM from File"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        obj = active_armature(context)
+        filepath = bpy.path.abspath(self.filepath)
+        try:
+            with Recorder('CANM update', filepath) as recorder:
+                result = update_from_file(
+                    filepath,
+                    obj,
+                    self.option_override_version,
+                    self.option_thin_keyframes,
+                    recorder,
+                )
+        except (OSError, CanmFormatError) as error:
+            self.report({"ERROR"}, f"CANM update: {error}")
+            return {"CANCELLED"}
+        level = "WARNING" if result["removed"] else "INFO"
+        self.report({level}, f"CANM update: {summarize(result)}")
+        return {"FINISHED"}
+
+
+class EDF_OT_watch_canm_file(CanmSourceOperator, bpy.types.Operator):
+    """Update the active armature's CANM Actions whenever the file is saved"""
+
+    bl_idname = "edf.watch_canm_file"
+    bl_label = "Watch CANM File"
+    bl_options = {"REGISTER"}
+
+    def invoke(self, context, event):
+        filepath = active_armature(context).get(SOURCE_PROPERTY, "")
+        if is_watched(filepath):
+            return self.execute(context)
+        return super().invoke(context, event)
+
+    def execute(self, context):
+        obj = active_armature(context)
+        filepath = bpy.path.abspath(
+            self.filepath or obj.get(SOURCE_PROPERTY, "")
+        )
+        if is_watched(filepath):
+            unwatch_file(filepath)
+            self.report({"INFO"}, f"Stopped watching {filepath}")
+            return {"FINISHED"}
+        if file_mtime(filepath) is None:
+            self.report({"ERROR"}, f"CANM update: cannot read {filepath!r}")
+            return {"CANCELLED"}
+        watch_file(
+            filepath,
+            obj,
+            self.option_override_version,
+            self.option_thin_keyframes,
+        )
+        self.report({"INFO"}, f"Watching {filepath}")
+        return {"FINISHED"}
+
+
+class EDF_PT_canm_reload(bpy.types.Panel):
+    bl_label = "EDF CANM File"
+    bl_idname = "EDF_PT_canm_reload"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "EDF"
+
+    def draw(self, context):
+        layout = self.layout
+        obj = active_armature(context)
+        filepath = obj.get(SOURCE_PROPERTY, "") if obj is not None else ""
+        for source, message in watch_messages.items():
+            if source == filepath or source not in watched_files:
+                layout.label(text=message, icon="ERROR")
+        if obj is None:
+            layout.label(text="Select an armature with CANM Actions.", icon="INFO")
+            return
+        if filepath:
+            layout.label(text=os.path.basename(filepath), icon="FILE")
+        layout.operator(
+            EDF_OT_update_canm_from_file.bl_idname,
+            icon="FILE_REFRESH",
+        )
+        watching = is_watched(filepath)
+        layout.operator(
+            EDF_OT_watch_canm_file.bl_idname,
+            text="Stop Watching" if watching else "Watch CANM File",
+            icon="PAUSE" if watching else "PLAY",
+        )
+        removed = sorted(
+            action.name for action in bpy.data.actions
+            if action.get(REMOVED_PROPERTY)
+            and action.get(SOURCE_PROPERTY) == filepath
+        )
+        if removed:
+            layout.label(
+                text=f"Removed from file: {', '.join(removed)}",
+                icon="ERROR",
+            )
+
+
+CLASSES = (
+    EDF_OT_update_canm_from_file,
+    EDF_OT_watch_canm_file,
+    EDF_PT_canm_reload,
+)
@@ -0,0 +1,292 @@
+"""Batched evaluation of CANM channels in pose-bone basis space.
+
+``import_canm.get_bone_matrix_of_frame`` builds one matrix per bone and frame.
+The functions here evaluate a bone's whole frame range at once with NumPy:
+positions and scales are dequantized as ``base + offsets * speed``, EDF5 Euler
+angles and EDF6 quaternions are converted in bulk, and the inverse rest
+transform is applied with batched quaternion algebra. Quaternions are
+``(w, x, y, z)`` rows, like ``mathutils.Quaternion``.
+
+The rest transform must be rigid (unit scale); callers fall back to per-frame
+matrices otherwise. This module does not import bpy.
+"""
+
+import numpy as np
+
+from .canm_format import CHANNEL_QUATERNION, CHANNEL_STATIC_QUATERNION
+
+
+TRANSFORM_PROPERTIES = ('location', 'rotation_quaternion', 'scale')
+
+
+def channel_vectors(channel):
+    """Return ``(N, 3)`` dequantized values; a static channel has one row."""
+    base = np.array(
+        [channel['base_x'], channel['base_y'], channel['base_z']],
+        dtype=np.float64,
+    )
+    keyframes = channel['keyframes']
+    if not len(keyframes):
+        return base[np.newaxis]
+    speed = np.array(
+        [channel['speed_x'], channel['speed_y'], channel['speed_z']],
+        dtype=np.float64,
+    )
+    offsets = np.asarray(keyframes, dtype=np.float64)[:, :3]
+    return base + offsets * speed
+
+
+def euler_xyz_to_quaternions(angles):
+    """Convert ``(N, 3)`` XYZ Euler angles (``Rz @ Ry @ Rx``) to quaternions."""
+    half = np.asarray(angles, dtype=np.float64) * 0.5
+    cos = np.cos(half)
+    sin = np.sin(half)
+    cx, cy, cz = cos.T
+    sx, sy, sz = sin.T
+    return np.stack((
+        cx * cy * cz + sx * sy * sz,
+        sx * cy * cz - cx * sy * sz,
+        cx * sy * cz + sx * cy * sz,
+        cx * cy * sz - sx * sy * cz,
+    ), axis=1)
+
+
+def channel_quaternions(channel):
+    """Return ``(N, 4)`` rotations of a rotation channel."""
+    if channel['type'] in (CHANNEL_STATIC_QUATERNION, CHANNEL_QUATERNION):
+        keyframes = channel['keyframes']
+        if len(keyframes):
+            xyzw = np.asarray(keyframes, dtype=np.float64)
+        else:
+            xyzw = np.array([[
+                channel['base_x'],
+                channel['base_y'],
+                channel['base_z'],
+                channel['base_w'],
+            ]], dtype=np.float64)
+        return xyzw[:, [3, 0, 1, 2]]
+    return euler_xyz_to_quaternions(channel_vectors(channel))
+
+
+def quaternion_multiply(first, second):
+    """Hamilton product of broadcastable ``(..., 4)`` quaternion arrays."""
+    w1, x1, y1, z1 = np.moveaxis(np.asarray(first, dtype=np.float64), -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(np.asarray(second, dtype=np.float64), -1, 0)
+    return np.stack((
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+    ), axis=-1)
+
+
+def rotate_vectors(quaternion, vectors):
+    """Rotate ``(N, 3)`` vectors by one unit quaternion."""
+    w = quaternion[0]
+    axis = np.asarray(quaternion[1:], dtype=np.float64)
+    vectors = np.asarray(vectors, dtype=np.float64)
+    twice_cross = 2.0 * np.cross(axis, vectors)
+    return vectors + w * twice_cross + np.cross(axis, twice_cross)
+
+
+def normalize_quaternions(quaternions):
+    lengths = np.linalg.norm(quaternions, axis=1, keepdims=True)
+    lengths[lengths == 0.0] = 1.0
+    return quaternions / lengths
+
+
+def hemisphere_continuous(quaternions):
+    """Flip signs so consecutive rotations never differ by more than 180°.
+
+    Like ``Matrix.to_quaternion``, each input is first given a non-negative
+    ``w``. A row is then negated when its dot product with the already
+    adjusted previous row is negative, which is a running product of the
+    signs of the raw dot products.
+    """
+    quaternions = np.where(
+        quaternions[:, :1] < 0.0,
+        -quaternions,
+        quaternions,
+    )
+    if len(quaternions) < 2:
+        return quaternions
+    dots = np.einsum('ij,ij->i', quaternions[1:], quaternions[:-1])
+    signs = np.cumprod(np.where(dots < 0.0, -1.0, 1.0))
+    quaternions[1:] *= signs[:, np.newaxis]
+    return quaternions
+
+
+def bone_channel(canm, channel_index):
+    if channel_index == -1:
+        return None
+    return canm['anm_points'][channel_index]
+
+
+CHANNEL_FIELDS = ('point_trans_id', 'point_rot_id', 'point_scale_id')
+
+
+class ChannelCache:
+    """Basis-space samples of channels shared by several bone records.
+
+    The exporter deduplicates channels, so one channel is often referenced by
+    many animations. Results are keyed by channel index and inverse rest
+    transform and kept only while further references remain; a channel used
+    once is never stored. ``hits`` and ``misses`` count the lookups.
+    """
+
+    def __init__(self, canm, animations=None, bone_ids=None):
+        self.remaining = np.zeros(len(canm['anm_points']), dtype=np.int64)
+        for animation in canm['animations'] if animations is None else animations:
+            bone_data = animation['bone_data']
+            if bone_ids is not None:
+                bone_data = bone_data[np.isin(bone_data['bone_id'], bone_ids)]
+            for field in CHANNEL_FIELDS:
+                indices = bone_data[field]
+                self.remaining += np.bincount(
+                    indices[indices >= 0],
+                    minlength=len(self.remaining),
+                )
+        self.samples = {}
+        self.keys_by_channel = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, channel_index, rest_key, compute):
+        key = (kind, channel_index, rest_key)
+        values = self.samples.get(key)
+        if values is None:
+            values = compute()
+            self.misses += 1
+            if self.remaining[channel_index] > 1:
+                self.samples[key] = values
+                self.keys_by_channel.setdefault(channel_index, []).append(key)
+        else:
+            self.hits += 1
+        self.consume(channel_index)
+        return values
+
+    def consume(self, channel_index):
+        self.remaining[channel_index] -= 1
+        if self.remaining[channel_index] <= 0:
+            for stale in self.keys_by_channel.pop(channel_index, ()):
+                del self.samples[stale]
+
+    def release(self, bone_anim):
+        """Drop the references of a bone record sampled without the cache."""
+        for field in CHANNEL_FIELDS:
+            channel_index = int(bone_anim[field])
+            if channel_index >= 0:
+                self.consume(channel_index)
+
+
+def basis_locations(channel, rest_location, rest_rotation):
+    return (
+        rotate_vectors(rest_rotation, channel_vectors(channel))
+        + np.asarray(rest_location, dtype=np.float64)
+    )
+
+
+def basis_rotations(channel, rest_rotation):
+    return hemisphere_continuous(
+        quaternion_multiply(
+            rest_rotation,
+            normalize_quaternions(channel_quaternions(channel)),
+        )
+    )
+
+
+def sample_bone(
+    canm,
+    bone_anim,
+    rest_location,
+    rest_rotation,
+    frame_count,
+    cache=None,
+):
+    """Evaluate up to ``frame_count`` frames of one bone in basis space.
+
+    ``rest_location`` and ``rest_rotation`` (``w, x, y, z``) describe the
+    inverse local rest transform. Returns a mapping from transform property
+    to an ``(N, components)`` array for frames ``1..N``, or ``None`` when the
+    bone has no channel for it. Matches ``get_bone_matrix_of_frame``: a
+    channel without keyframes only provides the first frame. Pass a
+    ``ChannelCache`` to reuse results between animations; the returned
+    arrays are then shared and must not be modified.
+    """
+    rest_rotation = np.asarray(rest_rotation, dtype=np.float64)
+    rest_key = tuple(rest_location) + tuple(rest_rotation.tolist())
+    computations = {
+        'location': (
+            'point_trans_id',
+            lambda channel: basis_locations(
+                channel,
+                rest_location,
+                rest_rotation,
+            ),
+            rest_key,
+        ),
+        'rotation_quaternion': (
+            'point_rot_id',
+            lambda channel: basis_rotations(channel, rest_rotation),
+            rest_key,
+        ),
+        'scale': ('point_scale_id', channel_vectors, None),
+    }
+    samples = dict.fromkeys(TRANSFORM_PROPERTIES)
+    for property_name, (field, compute, key) in computations.items():
+        channel_index = int(bone_anim[field])
+        channel = bone_channel(canm, channel_index)
+        if channel is None:
+            continue
+        if cache is None:
+            values = compute(channel)
+        else:
+            values = cache.get(
+                property_name,
+                channel_index,
+                key,
+                lambda: compute(channel),
+            )
+        # Continuity runs forward from the first frame, so a prefix of the
+        # full result equals the result for the prefix.
+        samples[property_name] = values[:frame_count]
+    return samples
+
+
+def positive_scales(samples):
+    """Whether the scale rows decompose back to themselves."""
+    scale = samples['scale']
+    return scale is None or bool(np.all(scale > 0.0))
+
+
+def linear_keyframe_indices(values):
+    """Indices of the samples to keep as linear keyframes.
+
+    ``values`` holds one sample per frame. The first and last samples are
+    always kept. Every dropped sample is reproduced by linear interpolation
+    between the kept samples around it to within float32 epsilon, relative
+    to its magnitude when that exceeds one. Evaluating the thinned curve at
+    the sampled frames therefore gives the written values back.
+    """
+    values = np.asarray(values, dtype=np.float32).astype(np.float64)
+    count = len(values)
+    if count < 3:
+        return np.arange(count)
+    tolerance = np.finfo(np.float32).eps * np.maximum(np.abs(values), 1.0)
+    keep = np.ones(count, dtype=bool)
+    # A sample is redundant between its neighbours when it lies on their
+    # chord; the chord misses it by half the second difference.
+    keep[1:-1] = (
+        np.abs(values[:-2] - 2.0 * values[1:-1] + values[2:])
+        > 2.0 * tolerance[1:-1]
+    )
+    # Small deviations can add up along a run of dropped samples, so check
+    # against the chords between the samples actually kept.
+    frames = np.arange(count)
+    while True:
+        kept = np.flatnonzero(keep)
+        error = np.abs(np.interp(frames, kept, values[kept]) - values)
+        missed = error > tolerance
+        if not missed.any():
+            return kept
+        keep |= missed
@@ -0,0 +1,220 @@
+"""Binary CANM serializer.
+
+Input records are plain dictionaries assembled by ``export_canm``: animations
+with their per-bone channel indices, and the deduplicated channel list. This
+module contains no Blender dependency.
+"""
+
+from struct import pack
+
+from .canm_format import CANM6_VERSION
+
+
+def encode_channel_index(index):
+    if index == -1:
+        return 0xFFFF
+    if not 0 <= index < 0xFFFF:
+        raise ValueError(
+            f'CANM channel index {index} is outside the usable '
+            'unsigned 16-bit range 0..65534'
+        )
+    return index
+
+
+def validate_channel_count(channels):
+    if len(channels) > 0xFFFF:
+        raise ValueError(
+            f'CANM contains {len(channels)} unique channels; the format '
+            'can reference at most 65,535'
+        )
+
+
+def write_header(file, file_version, bone_names, animations, channels):
+    file.write(b'CANM')
+    file.write(pack('I', file_version))
+    # Animation Data
+    file.write(pack('I', len(animations)))
+    file.write(pack('I', 0))
+    # Animation Channels
+    file.write(pack('I', len(channels)))
+    file.write(pack('I', 0))
+    # Bone names
+    file.write(pack('I', len(bone_names)))
+    file.write(pack('I', 0))
+
+
+def write_channels(file, channels):
+    # Write Animation Channel Data
+    for chan in channels:
+        chan['base_pos'] = file.tell()
+        if chan['has_frames'] == True:
+            file.write(pack('h', 0x01))
+        else:
+            file.write(pack('h', 0x00))
+        file.write(pack('H', chan['keyframes']))
+        file.write(pack('f', chan['base_x']))
+        file.write(pack('f', chan['base_y']))
+        file.write(pack('f', chan['base_z']))
+        file.write(pack('f', chan['speed_x']))
+        file.write(pack('f', chan['speed_y']))
+        file.write(pack('f', chan['speed_z']))
+        chan['frames_pos'] = file.tell()
+        file.write(pack('I', 0))
+    # Write the keyframe data for any animations that have them
+    for chan in channels:
+        if chan['has_frames'] == False:
+            continue
+        # Replace frame_pos with correct value
+        rewrite_offset(file, chan['frames_pos'], file.tell(), chan['base_pos'])
+        # Write all keyframes
+        for i in range(chan['keyframes']):
+            file.write(pack('H', chan['offsets_x'][i]))
+            file.write(pack('H', chan['offsets_y'][i]))
+            file.write(pack('H', chan['offsets_z'][i]))
+    # Padding to nearest 4
+    padding_needed = (4 - (file.tell() % 4)) % 4
+    file.write(b'\0' * padding_needed)
+
+
+def write_channels6(file, channels):
+    """Write EDF6 0x30-byte channels and their grouped keyframe blocks."""
+    for channel in channels:
+        channel['base_pos'] = file.tell()
+        file.write(pack('f', channel['base_x']))
+        file.write(pack('f', channel['base_y']))
+        file.write(pack('f', channel['base_z']))
+        file.write(pack('f', channel['base_w']))
+        file.write(pack('f', channel['speed_x']))
+        file.write(pack('f', channel['speed_y']))
+        file.write(pack('f', channel['speed_z']))
+        file.write(pack('f', channel['speed_w']))
+        channel['frames_pos'] = file.tell()
+        file.write(pack('I', 0))
+        file.write(pack('i', channel['type']))
+        file.write(pack('i', channel['keyframes']))
+        file.write(pack('i', 0))
+
+    for channel in channels:
+        if channel['keyframes'] <= 1 or channel['type'] != 1:
+            continue
+        rewrite_offset(
+            file,
+            channel['frames_pos'],
+            file.tell(),
+            channel['base_pos'],
+        )
+        for index in range(channel['keyframes']):
+            file.write(pack('H', channel['offsets_x'][index]))
+            file.write(pack('H', channel['offsets_y'][index]))
+            file.write(pack('H', channel['offsets_z'][index]))
+
+    # EDF6 begins the absolute quaternion block at a 16-byte aligned
+    # absolute file offset.
+    padding_needed = (16 - (file.tell() % 16)) % 16
+    file.write(b'\0' * padding_needed)
+    for channel in channels:
+        if channel['keyframes'] <= 1 or channel['type'] != 3:
+            continue
+        rewrite_offset(
+            file,
+            channel['frames_pos'],
+            file.tell(),
+            channel['base_pos'],
+        )
+        for quaternion in channel['frames']:
+            file.write(pack('4f', *quaternion))
+
+
+# Seeks to the target, writes a file offset relative to the given base, returns to original position
+def rewrite_offset(file, rewrite_target, current_position, target_base_offset):
+    file.seek(rewrite_target)
+    offset = current_position - target_base_offset
+    file.write(pack('I', offset))
+    file.seek(current_position)
+
+
+def write_animations(file, animations):
+    # Animation data table
+    for anim in animations:
+        anim['base_pos'] = file.tell()
+        file.write(pack('I', anim['loop']))
+        anim['name_pos'] = file.tell()
+        file.write(pack('I', 0))
+        file.write(pack('f', anim['duration']))
+        file.write(pack('f', anim['between_keyframes']))
+        file.write(pack('I', anim['keyframes']))
+        file.write(pack('I', len(anim['bone_data'])))
+        anim['bone_data_pos'] = file.tell()
+        file.write(pack('I', 0))
+    # Bone data table
+    for anim in animations:
+        # Replace bone_data_pos with correct value
+        rewrite_offset(file, anim['bone_data_pos'], file.tell(), anim['base_pos'])
+        for bone in anim['bone_data']:
+            file.write(pack('h', bone['index']))
+            file.write(pack('H', encode_channel_index(bone['channel_index_pos'])))
+            file.write(pack('H', encode_channel_index(bone['channel_index_rot'])))
+            file.write(pack('H', encode_channel_index(bone['channel_index_scale'])))
+
+
+def write_all_strings(file, bone_names, animations):
+    base_positions = []
+    # Create string table for bones
+    for string in bone_names:
+        base_positions.append(file.tell())
+        file.write(bytes([0x00, 0x00, 0x00, 0x00]))
+    # Create fill list with offsets
+    name_list = []
+    for index, string in enumerate(bone_names):
+        name_obj = {}
+        name_obj['string'] = string
+        name_obj['base'] = base_positions[index]
+        name_obj['replace'] = base_positions[index]
+        name_list.append(name_obj)
+    for anim in animations:
+        name_obj = {}
+        name_obj['string'] = anim['name']
+        name_obj['base'] = anim['base_pos']
+        name_obj['replace'] = anim['name_pos']
+        name_list.append(name_obj)
+
+    # Sort the list
+    sorted_list = sorted(name_list, key=lambda x: x['string'])
+
+    def write_str_obj(file, obj):
+        # Replace name_pos with correct value
+        rewrite_offset(file, obj['replace'], file.tell(), obj['base'])
+        # Write string
+        file.write(obj['string'].encode('UTF-16LE'))
+        file.write(bytes([0x00, 0x00]))  # Terminate string
+
+    # Write to file, scene root first
+    for obj in sorted_list:
+        if obj['string'] != 'Scene_Root':
+            continue
+        write_str_obj(file, obj)
+    for obj in sorted_list:
+        if obj['string'] == 'Scene_Root':
+            continue
+        write_str_obj(file, obj)
+
+
+def write_canm(file, file_version, bone_names, animations, channels):
+    """Write a complete CANM file. ``channels`` must already be validated."""
+    # Header
+    write_header(file, file_version, bone_names, animations, channels)
+    # Write header Channel Offset
+    rewrite_offset(file, 0x14, file.tell(), 0x00)
+    # Write all Channels
+    if file_version == CANM6_VERSION:
+        write_channels6(file, channels)
+    else:
+        write_channels(file, channels)
+    # Write header Animations Offset
+    rewrite_offset(file, 0x0C, file.tell(), 0x00)
+    # Write all Animations
+    write_animations(file, animations)
+    # Write header Bone Name Offset
+    rewrite_offset(file, 0x1C, file.tell(), 0x00)
+    # Write All strings
+    write_all_strings(file, bone_names, animations)
@@ -0,0 +1,107 @@
+"""Bulk keyframe writing for sampled transform F-curves.
+
+CANM import and the additive editor both turn one value per frame into
+keyframes. Writing them through ``keyframe_points.insert`` or per-point
+properties costs a Python round trip per key; here every curve is resized
+once and its coordinates, interpolation and handles are set from contiguous
+float32 buffers with ``foreach_set``, followed by a single ``update()``.
+Keys are linear with vector handles unless another interpolation is asked
+for.
+"""
+
+import bpy
+import numpy as np
+
+
+def keyframe_enum_value(property_name, item):
+    """RNA value of a ``Keyframe`` enum item, for ``foreach_set``."""
+    return bpy.types.Keyframe.bl_rna.properties[property_name].enum_items[
+        item
+    ].value
+
+
+def resize_keyframes(curve, count):
+    """Give ``curve`` exactly ``count`` keyframe points.
+
+    Surviving points are overwritten by the caller, so which ones are kept
+    does not matter.
+    """
+    points = curve.keyframe_points
+    if len(points) > count and hasattr(points, 'clear'):
+        points.clear()
+    while len(points) > count:
+        points.remove(points[-1], fast=True)
+    if len(points) < count:
+        points.add(count - len(points))
+
+
+def linear_handles(coordinates):
+    """Vector handles a third of the way towards the neighbouring keys.
+
+    Linear and constant keys ignore handles, but switching a curve to Bezier
+    in the Graph Editor then starts from straight segments. ``update()``
+    computes the same positions for vector handles.
+    """
+    previous = np.concatenate((
+        2.0 * coordinates[:1] - coordinates[1:2],
+        coordinates[:-1],
+    )) if len(coordinates) > 1 else coordinates
+    following = np.concatenate((
+        coordinates[1:],
+        2.0 * coordinates[-1:] - coordinates[-2:-1],
+    )) if len(coordinates) > 1 else coordinates
+    left = coordinates + (previous - coordinates) / 3.0
+    right = coordinates + (following - coordinates) / 3.0
+    return left, right
+
+
+def write_curve_samples(
+    curve,
+    values,
+    first_frame=1,
+    interpolation='LINEAR',
+    frames=None,
+):
+    """Replace the keys of ``curve`` with one key per value.
+
+    The ``i``-th value lands on frame ``first_frame + i``, or on
+    ``first_frame + frames[i]`` when increasing frame offsets are given.
+    """
+    values = np.asarray(values, dtype=np.float32).reshape(-1)
+    count = len(values)
+    resize_keyframes(curve, count)
+    if not count:
+        curve.update()
+        return
+    if frames is None:
+        frames = np.arange(count)
+    coordinates = np.empty((count, 2), dtype=np.float32)
+    coordinates[:, 0] = first_frame + np.asarray(frames)
+    coordinates[:, 1] = values
+    left, right = linear_handles(coordinates)
+    points = curve.keyframe_points
+    points.foreach_set('co', coordinates.ravel())
+    points.foreach_set('handle_left', left.ravel())
+    points.foreach_set('handle_right', right.ravel())
+    for property_name, item in (
+        ('interpolation', interpolation),
+        ('handle_left_type', 'VECTOR'),
+        ('handle_right_type', 'VECTOR'),
+    ):
+        points.foreach_set(
+            property_name,
+            np.full(count, keyframe_enum_value(property_name, item), np.int32),
+        )
+    curve.update()
+
+
+def write_sampled_curves(curves, samples, first_frame=1, interpolation='LINEAR'):
+    """Write ``(N, len(curves))`` samples, one column per component curve."""
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1, len(curves))
+    for component_index, curve in enumerate(curves):
+        write_curve_samples(
+            curve,
+            samples[:, component_index],
+            first_frame,
+            interpolation,
+        )
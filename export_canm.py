@@ -6,10 +6,16 @@ import hashlib
 import itertools
 import math
 import mathutils
+import numpy as np
+import os
 
 from struct import pack, unpack
 
 from .action_compat import action_fcurves
+from .canm_format import CANM5_VERSION, CANM6_VERSION
+from .canm_writer import validate_channel_count, write_canm
+from .curve_writer import keyframe_enum_value
+from .instrumentation import Recorder
 
 
 # Approximate sharing is permitted only when every decoded sample remains
@@ -17,6 +23,8 @@ from .action_compat import action_fcurves
 VECTOR_MERGE_TOLERANCE = 2e-5
 ROTATION_MERGE_TOLERANCE_RADIANS = math.radians(0.005)
 ADDITIVE_PREVIEW_FLAG = "edf_additive_edit_preview"
+# FCurve.evaluate returns a key's own value within this many frames of it.
+KEY_SNAP_THRESHOLD = 0.01
 
 
 def get_bone_names(missing_bones):
@@ -160,25 +168,6 @@ def calculate_frame_interval(duration, keyframe_count):
     return duration / (keyframe_count - 1)
 
 
-def encode_channel_index(index):
-    if index == -1:
-        return 0xFFFF
-    if not 0 <= index < 0xFFFF:
-        raise ValueError(
-            f'CANM channel index {index} is outside the usable '
-            'unsigned 16-bit range 0..65534'
-        )
-    return index
-
-
-def validate_channel_count(channels):
-    if len(channels) > 0xFFFF:
-        raise ValueError(
-            f'CANM contains {len(channels)} unique channels; the format '
-            'can reference at most 65,535'
-        )
-
-
 def report_export(operator, level, message):
     if hasattr(operator, 'report'):
         operator.report({level}, message)
@@ -487,6 +476,82 @@ class ChannelDeduplicator:
         return index
 
 
+def sample_keyframed_curve(curve, frames):
+    """Evaluate a linear or constant F-curve at ``frames`` in bulk.
+
+    Reproduces ``FCurve.evaluate`` in float32: constant extrapolation, a
+    key's own value near it, and ``begin + change * time / duration`` on
+    linear segments. Returns ``None`` for curves this does not cover
+    (modifiers, other interpolation or extrapolation, unsorted keys).
+    """
+    points = curve.keyframe_points
+    count = len(points)
+    if curve.modifiers or curve.extrapolation != 'CONSTANT' or not count:
+        return None
+    linear = keyframe_enum_value('interpolation', 'LINEAR')
+    constant = keyframe_enum_value('interpolation', 'CONSTANT')
+    interpolation = np.empty(count, dtype=np.int32)
+    points.foreach_get('interpolation', interpolation)
+    # The last key starts no segment, so its interpolation is irrelevant.
+    if not np.all(np.isin(interpolation[:-1], (linear, constant))):
+        return None
+    coordinates = np.empty(count * 2, dtype=np.float32)
+    points.foreach_get('co', coordinates)
+    x = coordinates[0::2]
+    y = coordinates[1::2]
+    if np.any(np.diff(x) <= 0.0):
+        return None
+
+    frames = np.asarray(frames, dtype=np.float32)
+    values = np.where(frames <= x[0], y[0], y[-1])
+    inside = (frames > x[0]) & (frames < x[-1])
+    if np.any(inside):
+        time = frames[inside]
+        segment = np.searchsorted(x, time, side='right') - 1
+        begin = y[segment]
+        end = y[segment + 1]
+        interpolated = np.where(
+            interpolation[segment] == linear,
+            (end - begin) * (time - x[segment])
+            / (x[segment + 1] - x[segment]) + begin,
+            begin,
+        )
+        interpolated = np.where(
+            np.abs(x[segment + 1] - time) < KEY_SNAP_THRESHOLD,
+            end,
+            interpolated,
+        )
+        interpolated = np.where(
+            np.abs(time - x[segment]) < KEY_SNAP_THRESHOLD,
+            begin,
+            interpolated,
+        )
+        values[inside] = interpolated
+    return values
+
+
+def sample_transform_curves(curves, keyframes, has_frames):
+    """Return ``keyframes`` rows of component values for frames 1..N.
+
+    Static channels are evaluated once at frame 1. Curves the bulk path does
+    not cover fall back to ``FCurve.evaluate`` per frame.
+    """
+    frames = np.arange(1, keyframes + 1 if has_frames else 2)
+    columns = []
+    for curve in curves:
+        values = sample_keyframed_curve(curve, frames)
+        if values is None:
+            values = np.array(
+                [curve.evaluate(frame) for frame in frames.tolist()],
+                dtype=np.float32,
+            )
+        columns.append(values)
+    samples = np.stack(columns, axis=1)
+    if not has_frames:
+        samples = np.repeat(samples, keyframes, axis=0)
+    return samples.tolist()
+
+
 # Generate a matrix for every frame of the animation to read out later
 def get_matrix_channel_from_curves(animation, bone, version):
     matrix_channels = {}
@@ -514,6 +579,17 @@ def get_matrix_channel_from_curves(animation, bone, version):
         scl_has_frames = curves_have_animation(scl_curves)
         matrix_channels['scale_frames'] = scl_has_frames
 
+    # Sample every curve over the whole clip at once
+    pos_samples = None
+    rot_samples = None
+    scl_samples = None
+    if pos_curves is not None:
+        pos_samples = sample_transform_curves(pos_curves, keyframes, pos_has_frames)
+    if rot_curves is not None:
+        rot_samples = sample_transform_curves(rot_curves, keyframes, rot_has_frames)
+    if scl_curves is not None:
+        scl_samples = sample_transform_curves(scl_curves, keyframes, scl_has_frames)
+
     # Create actual matrix per frame
     last_euler = None
     last_quaternion = None
@@ -521,38 +597,12 @@ def get_matrix_channel_from_curves(animation, bone, version):
         pos = mathutils.Vector((0.0, 0.0, 0.0))
         rot = mathutils.Quaternion()
         scl = mathutils.Vector((1.0, 1.0, 1.0))
-        if pos_curves is not None:
-            if not pos_has_frames:
-                x = pos_curves[0].evaluate(1)
-                y = pos_curves[1].evaluate(1)
-                z = pos_curves[2].evaluate(1)
-            else:
-                x = pos_curves[0].evaluate(i+1)
-                y = pos_curves[1].evaluate(i+1)
-                z = pos_curves[2].evaluate(i+1)
-            pos = mathutils.Vector((x, y, z))
-        if rot_curves is not None:
-            if not rot_has_frames:
-                w = rot_curves[0].evaluate(1)
-                x = rot_curves[1].evaluate(1)
-                y = rot_curves[2].evaluate(1)
-                z = rot_curves[3].evaluate(1)
-            else:
-                w = rot_curves[0].evaluate(i+1)
-                x = rot_curves[1].evaluate(i+1)
-                y = rot_curves[2].evaluate(i+1)
-                z = rot_curves[3].evaluate(i+1)
-            rot = mathutils.Quaternion((w, x, y, z))
-        if scl_curves is not None:
-            if not scl_has_frames:
-                x = scl_curves[0].evaluate(1)
-                y = scl_curves[1].evaluate(1)
-                z = scl_curves[2].evaluate(1)
-            else:
-                x = scl_curves[0].evaluate(i+1)
-                y = scl_curves[1].evaluate(i+1)
-                z = scl_curves[2].evaluate(i+1)
-            scl = mathutils.Vector((x, y, z))
+        if pos_samples is not None:
+            pos = mathutils.Vector(pos_samples[i])
+        if rot_samples is not None:
+            rot = mathutils.Quaternion(rot_samples[i])
+        if scl_samples is not None:
+            scl = mathutils.Vector(scl_samples[i])
         sampled_values = tuple(pos) + tuple(rot) + tuple(scl)
         if not all(math.isfinite(value) for value in sampled_values):
             raise ValueError(
@@ -779,179 +829,16 @@ def get_channels(animations, version):
     return deduplicator.channels
 
 
-def write_header(file, file_version, bone_names, animations, channels):
-    file.write(b'CANM')
-    file.write(pack('I', file_version))
-    # Animation Data
-    file.write(pack('I', len(animations)))
-    file.write(pack('I', 0))
-    # Animation Channels
-    file.write(pack('I', len(channels)))
-    file.write(pack('I', 0))
-    # Bone names
-    file.write(pack('I', len(bone_names)))
-    file.write(pack('I', 0))
-
-
-def write_channels(file, channels):
-    # Write Animation Channel Data
-    for chan in channels:
-        chan['base_pos'] = file.tell()
-        if chan['has_frames'] == True:
-            file.write(pack('h', 0x01))
-        else:
-            file.write(pack('h', 0x00))
-        file.write(pack('H', chan['keyframes']))
-        file.write(pack('f', chan['base_x']))
-        file.write(pack('f', chan['base_y']))
-        file.write(pack('f', chan['base_z']))
-        file.write(pack('f', chan['speed_x']))
-        file.write(pack('f', chan['speed_y']))
-        file.write(pack('f', chan['speed_z']))
-        chan['frames_pos'] = file.tell()
-        file.write(pack('I', 0))
-    # Write the keyframe data for any animations that have them
-    for chan in channels:
-        if chan['has_frames'] == False:
-            continue
-        # Replace frame_pos with correct value
-        rewrite_offset(file, chan['frames_pos'], file.tell(), chan['base_pos'])
-        # Write all keyframes
-        for i in range(chan['keyframes']):
-            file.write(pack('H', chan['offsets_x'][i]))
-            file.write(pack('H', chan['offsets_y'][i]))
-            file.write(pack('H', chan['offsets_z'][i]))
-    # Padding to nearest 4
-    padding_needed = (4 - (file.tell() % 4)) % 4
-    file.write(b'\0' * padding_needed)
-
-
-def write_channels6(file, channels):
-    """Write EDF6 0x30-byte channels and their grouped keyframe blocks."""
-    for channel in channels:
-        channel['base_pos'] = file.tell()
-        file.write(pack('f', channel['base_x']))
-        file.write(pack('f', channel['base_y']))
-        file.write(pack('f', channel['base_z']))
-        file.write(pack('f', channel['base_w']))
-        file.write(pack('f', channel['speed_x']))
-        file.write(pack('f', channel['speed_y']))
-        file.write(pack('f', channel['speed_z']))
-        file.write(pack('f', channel['speed_w']))
-        channel['frames_pos'] = file.tell()
-        file.write(pack('I', 0))
-        file.write(pack('i', channel['type']))
-        file.write(pack('i', channel['keyframes']))
-        file.write(pack('i', 0))
-
-    for channel in channels:
-        if channel['keyframes'] <= 1 or channel['type'] != 1:
-            continue
-        rewrite_offset(
-            file,
-            channel['frames_pos'],
-            file.tell(),
-            channel['base_pos'],
-        )
-        for index in range(channel['keyframes']):
-            file.write(pack('H', channel['offsets_x'][index]))
-            file.write(pack('H', channel['offsets_y'][index]))
-            file.write(pack('H', channel['offsets_z'][index]))
-
-    # EDF6 begins the absolute quaternion block at a 16-byte aligned
-    # absolute file offset.
-    padding_needed = (16 - (file.tell() % 16)) % 16
-    file.write(b'\0' * padding_needed)
-    for channel in channels:
-        if channel['keyframes'] <= 1 or channel['type'] != 3:
-            continue
-        rewrite_offset(
-            file,
-            channel['frames_pos'],
-            file.tell(),
-            channel['base_pos'],
+def save(operator, context, filepath="", version=0, **kwargs):
+    assert version in (5, 6)
+    with Recorder(f'CANM export EDF{version}', filepath) as recorder:
+        return recorder.finish(
+            export_file(operator, filepath, version, recorder),
         )
-        for quaternion in channel['frames']:
-            file.write(pack('4f', *quaternion))
-
-
-# Seeks to the target, writes a file offset relative to the given base, returns to original position
-def rewrite_offset(file, rewrite_target, current_position, target_base_offset):
-    file.seek(rewrite_target)
-    offset = current_position - target_base_offset
-    file.write(pack('I', offset))
-    file.seek(current_position)
-
-
-def write_animations(file, animations):
-    # Animation data table
-    for anim in animations:
-        anim['base_pos'] = file.tell()
-        file.write(pack('I', anim['loop']))
-        anim['name_pos'] = file.tell()
-        file.write(pack('I', 0))
-        file.write(pack('f', anim['duration']))
-        file.write(pack('f', anim['between_keyframes']))
-        file.write(pack('I', anim['keyframes']))
-        file.write(pack('I', len(anim['bone_data'])))
-        anim['bone_data_pos'] = file.tell()
-        file.write(pack('I', 0))
-    # Bone data table
-    for anim in animations:
-        # Replace bone_data_pos with correct value
-        rewrite_offset(file, anim['bone_data_pos'], file.tell(), anim['base_pos'])
-        for bone in anim['bone_data']:
-            file.write(pack('h', bone['index']))
-            file.write(pack('H', encode_channel_index(bone['channel_index_pos'])))
-            file.write(pack('H', encode_channel_index(bone['channel_index_rot'])))
-            file.write(pack('H', encode_channel_index(bone['channel_index_scale'])))
-
-
-def write_all_strings(file, bone_names, animations):
-    base_positions = []
-    # Create string table for bones
-    for string in bone_names:
-        base_positions.append(file.tell())
-        file.write(bytes([0x00, 0x00, 0x00, 0x00]))
-    # Create fill list with offsets
-    name_list = []
-    for index, string in enumerate(bone_names):
-        name_obj = {}
-        name_obj['string'] = string
-        name_obj['base'] = base_positions[index]
-        name_obj['replace'] = base_positions[index]
-        name_list.append(name_obj)
-    for anim in animations:
-        name_obj = {}
-        name_obj['string'] = anim['name']
-        name_obj['base'] = anim['base_pos']
-        name_obj['replace'] = anim['name_pos']
-        name_list.append(name_obj)
-
-    # Sort the list
-    sorted_list = sorted(name_list, key=lambda x: x['string'])
-
-    def write_str_obj(file, obj):
-        # Replace name_pos with correct value
-        rewrite_offset(file, obj['replace'], file.tell(), obj['base'])
-        # Write string
-        file.write(obj['string'].encode('UTF-16LE'))
-        file.write(bytes([0x00, 0x00]))  # Terminate string
-
-    # Write to file, scene root first
-    for obj in sorted_list:
-        if obj['string'] != 'Scene_Root':
-            continue
-        write_str_obj(file, obj)
-    for obj in sorted_list:
-        if obj['string'] == 'Scene_Root':
-            continue
-        write_str_obj(file, obj)
 
 
-def save(operator, context, filepath="", version=0, **kwargs):
-    assert version in (5, 6)
-    file_version = 512 if version == 5 else 768
+def export_file(operator, filepath, version, recorder):
+    file_version = CANM5_VERSION if version == 5 else CANM6_VERSION
     # Get the armature
     armature = bpy.data.armatures[0]
     if not armature:
@@ -980,9 +867,12 @@ def save(operator, context, filepath="", version=0, **kwargs):
     try:
         # Gather and validate all file parts before opening the destination.
         missing_bones = armature_object.get('missing_bones')
-        bone_names = get_bone_names(missing_bones)
-        pose_bones = get_pose_bones(bone_names, armature_object)
-        animations = get_animations(bone_names, pose_bones)
+        with recorder.span('gathering'):
+            bone_names = get_bone_names(missing_bones)
+            pose_bones = get_pose_bones(bone_names, armature_object)
+            animations = get_animations(bone_names, pose_bones)
+            recorder.count('bones', len(bone_names))
+            recorder.count('animations', len(animations))
         if version == 5:
             oversized = [
                 animation['name']
@@ -994,7 +884,9 @@ def save(operator, context, filepath="", version=0, **kwargs):
                     'EDF5 channels support at most 65,535 samples; '
                     'over-limit action(s): ' + ', '.join(oversized[:8])
                 )
-        channels = get_channels(animations, version)
+        with recorder.span('channels'):
+            channels = get_channels(animations, version)
+            recorder.count('channels', len(channels))
         validate_channel_count(channels)
     except (KeyError, OverflowError, TypeError, ValueError) as error:
         report_export(
@@ -1003,22 +895,7 @@ def save(operator, context, filepath="", version=0, **kwargs):
             f'CANM export cancelled: {error}',
         )
         return {'CANCELLED'}
-    with open(filepath, 'wb') as file:
-        # Header
-        write_header(file, file_version, bone_names, animations, channels)
-        # Write header Channel Offset
-        rewrite_offset(file, 0x14, file.tell(), 0x00)
-        # Write all Channels
-        if version == 6:
-            write_channels6(file, channels)
-        else:
-            write_channels(file, channels)
-        # Write header Animations Offset
-        rewrite_offset(file, 0x0C, file.tell(), 0x00)
-        # Write all Animations
-        write_animations(file, animations)
-        # Write header Bone Name Offset
-        rewrite_offset(file, 0x1C, file.tell(), 0x00)
-        # Write All strings
-        write_all_strings(file, bone_names, animations)
+    with recorder.span('serialization'), open(filepath, 'wb') as file:
+        write_canm(file, file_version, bone_names, animations, channels)
+        recorder.count('bytes', file.seek(0, os.SEEK_END))
     return {'FINISHED'}
@@ -4,16 +4,25 @@
 import bpy
 import json
 import mathutils
+import numpy as np
 import os
 from dataclasses import dataclass, field
 
+from .instrumentation import Recorder
 from .mdb_format import (
     BONE_METADATA_PROPERTIES,
     EDF5_VERSION,
     EDF6_VERSION,
     MATERIAL_METADATA_PROPERTIES,
+    MERGED_MESHES_PROPERTY,
+    MERGED_UV_CHANNELS_PROPERTY,
+    MESH_INDEX_ATTRIBUTE,
+    SKIN_BONES_PROPERTY,
+    SKIN_INDICES_ATTRIBUTE,
+    SKIN_WEIGHTS_ATTRIBUTE,
     SOURCE_ID_PROPERTY,
     TEXTURE_METADATA_PROPERTIES,
+    TEXTURE_TABLE_PROPERTY,
     VERTEX_TYPE_FLOAT2,
     VERTEX_TYPE_FLOAT3,
     VERTEX_TYPE_FLOAT4,
@@ -34,6 +43,7 @@ from .mdb_writer import (
     write_utf16_strings,
     write_vertex_data,
 )
+from .texture_resolver import is_stand_in_image
 
 # Original model is Y UP, but blender is Z UP by default, we convert that here.
 bone_up_Y = mathutils.Matrix(((1.0, 0.0, 0.0, 0.0),
@@ -156,6 +166,12 @@ def find_material_slot_issues(source_id):
     issues = []
     for mesh_object in iter_exported_mesh_objects(source_id):
         materials = mesh_object.data.materials
+        if mesh_object.get(MERGED_MESHES_PROPERTY):
+            # Merged meshes export one MDB mesh per slot. An empty slot holds
+            # an MDB mesh without a material and exports as material -1.
+            if len(materials) == 0:
+                issues.append(f"mesh '{mesh_object.name}': no material assigned")
+            continue
         if len(materials) == 0:
             issues.append(f"mesh '{mesh_object.name}': no material assigned")
         elif len(materials) > 1:
@@ -183,6 +199,12 @@ def bone_name_to_index(armature):
     }
 
 
+def influence_order(influence):
+    """Sort key for ``(weight, bone)``: heaviest first, ties by lower bone."""
+    weight, bone = influence
+    return -weight, bone
+
+
 def strongest_vertex_influences(vertex):
     return sorted(
         (
@@ -190,10 +212,65 @@ def strongest_vertex_influences(vertex):
             for assignment in vertex.groups
             if assignment.weight > 0.0
         ),
-        reverse=True,
+        key=influence_order,
     )[:4]
 
 
+def read_skin_attributes(mesh):
+    """Return the raw skin of a skin-attribute import, or ``None``.
+
+    The result is ``(bone_names, indices, weights)`` with one row of four
+    influences per vertex; indices refer to ``bone_names``.
+    """
+    bone_names = mesh.get(SKIN_BONES_PROPERTY)
+    indices_attribute = mesh.attributes.get(SKIN_INDICES_ATTRIBUTE)
+    weights_attribute = mesh.attributes.get(SKIN_WEIGHTS_ATTRIBUTE)
+    if bone_names is None or indices_attribute is None or weights_attribute is None:
+        return None
+    count = len(mesh.vertices)
+    packed = np.empty(count, dtype=np.int32)
+    indices_attribute.data.foreach_get('value', packed)
+    weights = np.empty(count * 4, dtype=np.float32)
+    weights_attribute.data.foreach_get('color', weights)
+    return (
+        json.loads(bone_names),
+        packed.view(np.uint8).reshape(count, 4),
+        weights.reshape(count, 4),
+    )
+
+
+def vertex_bone_influences(mesh_object, vertex, skin=None):
+    """The up to four strongest ``(weight, bone name)`` pairs of ``vertex``."""
+    if skin is None:
+        return [
+            (weight, mesh_object.vertex_groups[group_index].name)
+            for weight, group_index in strongest_vertex_influences(vertex)
+        ]
+    bone_names, indices, weights = skin
+    return [
+        (weight, bone_names[index])
+        for weight, index in sorted(
+            (
+                (float(weight), int(index))
+                for weight, index in zip(weights[vertex.index], indices[vertex.index])
+                if weight > 0.0
+            ),
+            key=influence_order,
+        )
+    ]
+
+
+def weighted_bone_names(mesh_object, skin=None):
+    if skin is not None:
+        bone_names, indices, weights = skin
+        return {bone_names[index] for index in np.unique(indices[weights > 0.0])}
+    return {
+        bone_name
+        for vertex in mesh_object.data.vertices
+        for _, bone_name in vertex_bone_influences(mesh_object, vertex)
+    }
+
+
 def find_bone_weight_issues(source_id, armature):
     if armature is None:
         return []
@@ -202,15 +279,14 @@ def find_bone_weight_issues(source_id, armature):
     for mesh_object in iter_exported_mesh_objects(source_id):
         unknown_groups = set()
         unaddressable_bones = set()
-        for vertex in mesh_object.data.vertices:
-            for _, group_index in strongest_vertex_influences(vertex):
-                group_name = mesh_object.vertex_groups[group_index].name
-                if group_name not in bone_indices:
-                    unknown_groups.add(group_name)
-                elif bone_indices[group_name] > 0xFF:
-                    unaddressable_bones.add(
-                        (group_name, bone_indices[group_name]),
-                    )
+        skin = read_skin_attributes(mesh_object.data)
+        for group_name in weighted_bone_names(mesh_object, skin):
+            if group_name not in bone_indices:
+                unknown_groups.add(group_name)
+            elif bone_indices[group_name] > 0xFF:
+                unaddressable_bones.add(
+                    (group_name, bone_indices[group_name]),
+                )
         if unknown_groups:
             issues.append(
                 f"mesh '{mesh_object.name}': weighted groups do not match MDB "
@@ -285,18 +361,33 @@ def get_bone_data(names, armature):
     return bones
 
 
-def get_textures(source_id):
-    textures = []
+def find_texture_table(source_id):
+    """Return the imported texture table, including unused entries.
+
+    Current imports store it once on the armature object. Older imports
+    stored a copy on every material, so fall back to the longest of those.
+    Returns ``None`` when neither exists.
+    """
+    for obj in bpy.data.objects:
+        if obj.type == 'ARMATURE' and source_id_of(obj) == source_id:
+            encoded_table = obj.get(TEXTURE_TABLE_PROPERTY)
+            if encoded_table is not None:
+                return json.loads(encoded_table)
 
-    # Imported materials retain the original table, including unused entries.
+    textures = None
     for material in bpy.data.materials:
         if source_id_of(material) != source_id:
             continue
-        encoded_table = material.get('mdb_texture_table')
-        if encoded_table:
+        encoded_table = material.get(TEXTURE_TABLE_PROPERTY)
+        if encoded_table is not None:
             table = json.loads(encoded_table)
-            if len(table) > len(textures):
+            if textures is None or len(table) > len(textures):
                 textures = table
+    return textures
+
+
+def get_textures(source_id):
+    textures = find_texture_table(source_id) or []
 
     # Used binding nodes expose editable copies of their table entries.
     for material in bpy.data.materials:
@@ -406,7 +497,9 @@ def get_export_texture_filename(image_node):
     # MDB table entry; the remaining properties preserve EDF-only metadata.
     texture_filename = image_node['mdb_texture_filename']
     image = getattr(image_node, 'image', None)
-    if image is not None:
+    # Deferred placeholders and downscaled proxies stand in for the imported
+    # texture and must not rename it.
+    if image is not None and not is_stand_in_image(image):
         image_path = getattr(image, 'filepath_raw', '') or getattr(
             image,
             'filepath',
@@ -452,32 +545,89 @@ def get_objects(
             'name': object_name,
             'name_index': names.index(object_name),
         }
-        # Get all meshes
+        # Get all meshes; a merged mesh contributes one MDB mesh per slot.
         mesh_objects = [child for child in obj.children if child.type == 'MESH']
-        object_data['mesh_count'] = len(mesh_objects)
         object_data['mesh_data'] = []
-        for index, mesh_object in enumerate(mesh_objects):
-            object_data['mesh_data'].append(
-                get_mesh_data(
-                    index,
-                    mesh_object,
-                    materials,
-                    game_version,
-                    bone_indices,
+        for mesh_object in mesh_objects:
+            mesh_object.data.calc_tangents()
+            if mesh_object.get(MERGED_MESHES_PROPERTY):
+                submeshes = iter_merged_submeshes(mesh_object.data)
+            else:
+                submeshes = ((0, None, None),)
+            for material_slot, polygons, uv_channels in submeshes:
+                object_data['mesh_data'].append(
+                    get_mesh_data(
+                        len(object_data['mesh_data']),
+                        mesh_object,
+                        materials,
+                        game_version,
+                        bone_indices,
+                        material_slot,
+                        polygons,
+                        uv_channels,
+                    )
                 )
-            )
+        object_data['mesh_count'] = len(object_data['mesh_data'])
 
         obj_index += 1
         objects.append(object_data)
     return objects
 
 
-def split_vertices(mesh):
-    """Return one exported vertex for every distinct per-loop vertex payload."""
+def iter_merged_submeshes(mesh):
+    """Yield ``(slot, polygons, uv_channels)`` in original MDB mesh order.
+
+    Slots without polygons are skipped; they would only write empty MDB
+    mesh records.
+    """
+    polygons_by_slot = [[] for _ in mesh.materials]
+    for polygon in mesh.polygons:
+        slot = min(polygon.material_index, len(polygons_by_slot) - 1)
+        polygons_by_slot[slot].append(polygon)
+
+    mesh_indices = None
+    attribute = mesh.attributes.get(MESH_INDEX_ATTRIBUTE)
+    if attribute is not None and attribute.domain == 'FACE':
+        mesh_indices = [0] * len(mesh.polygons)
+        attribute.data.foreach_get('value', mesh_indices)
+
+    def original_order(slot):
+        if mesh_indices is None:
+            return slot
+        return min(
+            (mesh_indices[polygon.index] for polygon in polygons_by_slot[slot]),
+            default=slot,
+        )
+
+    uv_channels = list(mesh.get(MERGED_UV_CHANNELS_PROPERTY, ()))
+    for slot in sorted(range(len(polygons_by_slot)), key=original_order):
+        if not polygons_by_slot[slot]:
+            continue
+        yield (
+            slot,
+            polygons_by_slot[slot],
+            uv_channels[slot] if slot < len(uv_channels) else None,
+        )
+
+
+def split_vertices(mesh, polygons=None):
+    """Return one exported vertex for every distinct per-loop vertex payload.
+
+    ``polygons`` restricts the split to a subset of faces, such as one
+    material slot of a merged mesh.
+    """
     unique_vertices = {}
     vertex_loop_pairs = []
     indices = []
-    for loop in mesh.loops:
+    if polygons is None:
+        loops = mesh.loops
+    else:
+        loops = [
+            mesh.loops[loop_index]
+            for polygon in polygons
+            for loop_index in polygon.loop_indices
+        ]
+    for loop in loops:
         uv_key = tuple(
             tuple(uv_layer.data[loop.index].uv)
             for uv_layer in mesh.uv_layers
@@ -505,27 +655,52 @@ def get_mesh_data(
     materials,
     game_version,
     bone_indices,
+    material_slot=0,
+    polygons=None,
+    uv_channels=None,
 ):
+    """Build one MDB mesh record from a mesh object or one of its slots.
+
+    Tangents must already be calculated. ``polygons`` and ``uv_channels``
+    restrict the record to one slot of a merged mesh.
+    """
     mesh = mesh_object.data
     material_index = -1
     # Get the material used for this mesh
     for mat in materials:
-        if mesh.materials[0] == mat['blender_material']:
+        if mesh.materials[material_slot] == mat['blender_material']:
             material_index = mat['index']
             break
-    bone_weights = min(
-        4,
-        max(
-            (
-                sum(group.weight > 0.0 for group in vertex.groups)
-                for vertex in mesh.vertices
+    if polygons is None:
+        vertices = mesh.vertices
+    else:
+        vertices = [
+            mesh.vertices[vertex_index]
+            for vertex_index in sorted({
+                vertex_index
+                for polygon in polygons
+                for vertex_index in polygon.vertices
+            })
+        ]
+    skin = read_skin_attributes(mesh)
+    if skin is not None:
+        rows = [vertex.index for vertex in vertices]
+        bone_weights = int(
+            (skin[2][rows] > 0.0).sum(axis=1).max(initial=0),
+        )
+    else:
+        bone_weights = min(
+            4,
+            max(
+                (
+                    sum(group.weight > 0.0 for group in vertex.groups)
+                    for vertex in vertices
+                ),
+                default=0,
             ),
-            default=0,
-        ),
-    )
+        )
     is_skinned = bone_weights > 0
-    mesh.calc_tangents()
-    vertex_loop_pairs, indices = split_vertices(mesh)
+    vertex_loop_pairs, indices = split_vertices(mesh, polygons)
     mesh_data = {
         'is_skinned': int(is_skinned),
         'bone_influence_count': bone_weights,
@@ -538,6 +713,8 @@ def get_mesh_data(
             vertex_loop_pairs,
             game_version,
             bone_indices,
+            uv_channels,
+            skin,
         ),
         'index_count': len(indices),
         'indices': indices,
@@ -557,8 +734,13 @@ def get_vertex_layouts(
     vertex_loop_pairs,
     game_version,
     bone_indices,
+    uv_channels=None,
+    skin=None,
 ):
     mesh = mesh_object.data
+    uv_count = len(mesh.uv_layers)
+    if uv_channels is not None:
+        uv_count = min(uv_count, uv_channels)
     vertex_layouts = []
     # Due to the nature of this data, it makes sense to just generate it as i saw in example files
     # We cannot be certain for each of these if they exist or not until proven otherwise in practice
@@ -613,7 +795,7 @@ def get_vertex_layouts(
     vertex_layouts.append(tangent_data)
     # We store a UV array seperately just for easy access when looping over indices.
     uv_data = []
-    for channel, uv in enumerate(mesh.uv_layers):
+    for channel in range(uv_count):
         texcoord_data = {
             'name': 'texcoord',
             'type': VERTEX_TYPE_FLOAT2,
@@ -630,7 +812,6 @@ def get_vertex_layouts(
             data['name'] = data['name'].upper()
     
     # Populate each exported vertex from its source vertex and face corner.
-    uv_count = len(mesh.uv_layers)
     for vert, loop in vertex_loop_pairs:
         position_data['data'].append([vert.co[0], vert.co[2], -vert.co[1], 1.0])  # Correct orientation from import!
         normal_data['data'].append([loop.normal[0], loop.normal[2], -loop.normal[1], 1.0])
@@ -643,11 +824,12 @@ def get_vertex_layouts(
         # Skinned mesh
         if is_skinned:
             influences = [
-                (
-                    weight,
-                    bone_indices[mesh_object.vertex_groups[group_index].name],
+                (weight, bone_indices[bone_name])
+                for weight, bone_name in vertex_bone_influences(
+                    mesh_object,
+                    vert,
+                    skin,
                 )
-                for weight, group_index in strongest_vertex_influences(vert)
             ]
             weight_total = sum(weight for weight, _ in influences)
             weights = [
@@ -797,6 +979,10 @@ def find_incomplete_mdb_metadata(source_id, armature):
             missing.append(f"bone '{bone.name}': {', '.join(absent)}")
 
     assigned_materials = set(iter_assigned_materials(source_id))
+    # A model without materials has no texture table to lose. With materials,
+    # rebuilding the table from texture nodes could drop or move entries.
+    if assigned_materials and find_texture_table(source_id) is None:
+        missing.append(f'texture table: {TEXTURE_TABLE_PROPERTY}')
     for material in assigned_materials:
         if source_id_of(material) != source_id:
             missing.append(
@@ -878,19 +1064,33 @@ def find_index_limit_issues(objects):
     return issues
 
 
-def build_export_data(game_version, source_id, armature):
-    names = get_unique_names(source_id, armature)
-    bones = get_bone_data(names, armature)
-    textures = get_textures(source_id)
-    materials = get_materials(names, source_id)
-    objects = get_objects(
-        names,
-        materials,
-        game_version,
-        source_id,
-        bone_name_to_index(armature),
-    )
-    recompute_bone_bounding_boxes(bones, objects)
+def build_export_data(game_version, source_id, armature, recorder=None):
+    recorder = recorder or Recorder('MDB export')
+    with recorder.span('gathering'):
+        names = get_unique_names(source_id, armature)
+        bones = get_bone_data(names, armature)
+        textures = get_textures(source_id)
+        materials = get_materials(names, source_id)
+        objects = get_objects(
+            names,
+            materials,
+            game_version,
+            source_id,
+            bone_name_to_index(armature),
+        )
+        recorder.count('bones', len(bones))
+        recorder.count('materials', len(materials))
+        recorder.count('loops', sum(
+            len(mesh_object.data.loops)
+            for mesh_object in iter_exported_mesh_objects(source_id)
+        ))
+        recorder.count('vertices', sum(
+            mesh['vertex_count']
+            for object_data in objects
+            for mesh in object_data['mesh_data']
+        ))
+    with recorder.span('bounds'):
+        recompute_bone_bounding_boxes(bones, objects)
     objects = sort_objects_by_name_order(objects, bones)
     file_version = EDF5_VERSION if game_version == 5 else EDF6_VERSION
     return ExportData(
@@ -906,58 +1106,66 @@ def build_export_data(game_version, source_id, armature):
 
 def save(operator, context, filepath="", version=0, **kwargs):
     del kwargs
+    with Recorder(f'MDB export EDF{version}', filepath) as recorder:
+        return recorder.finish(
+            export_file(operator, context, filepath, version, recorder),
+        )
+
+
+def export_file(operator, context, filepath, version, recorder):
     if version not in (5, 6):
         report_export(operator, 'ERROR', f'Unsupported export version {version}.')
         return {'CANCELLED'}
-    source_id, source_error = get_export_source_id(context)
-    if source_error:
-        report_export(operator, 'ERROR', source_error)
-        return {'CANCELLED'}
-    armature = get_source_armature(source_id)
-    non_triangular = find_non_triangulated_meshes(source_id)
-    if non_triangular:
-        message = (
-            'MDB export requires triangulated meshes. Export cancelled for: '
-            + ', '.join(non_triangular)
-        )
-        report_export(operator, 'ERROR', message)
-        return {'CANCELLED'}
-    material_issues = find_material_slot_issues(source_id)
-    if material_issues:
-        report_export(
-            operator,
-            'ERROR',
-            'Each MDB mesh requires exactly one material. Export cancelled: '
-            + '; '.join(material_issues[:8]),
-        )
-        return {'CANCELLED'}
-    incomplete_metadata = find_incomplete_mdb_metadata(source_id, armature)
-    if incomplete_metadata:
-        report_export(
-            operator,
-            'ERROR',
-            'This scene lacks current lossless MDB metadata. Re-import the '
-            'source MDB with this add-on version. Missing: '
-            + '; '.join(incomplete_metadata[:8]),
-        )
-        return {'CANCELLED'}
-    bone_weight_issues = find_bone_weight_issues(source_id, armature)
-    if bone_weight_issues:
-        report_export(
-            operator,
-            'ERROR',
-            'MDB skinning metadata is invalid. Export cancelled: '
-            + '; '.join(bone_weight_issues[:8]),
-        )
-        return {'CANCELLED'}
-    if find_overweight_vertices(source_id):
-        report_export(
-            operator,
-            'WARNING',
-            'Vertices with more than four bone influences will use their four '
-            'strongest influences, normalized to a total weight of 1.',
-        )
-    data = build_export_data(version, source_id, armature)
+    with recorder.span('preflight'):
+        source_id, source_error = get_export_source_id(context)
+        if source_error:
+            report_export(operator, 'ERROR', source_error)
+            return {'CANCELLED'}
+        armature = get_source_armature(source_id)
+        non_triangular = find_non_triangulated_meshes(source_id)
+        if non_triangular:
+            message = (
+                'MDB export requires triangulated meshes. Export cancelled for: '
+                + ', '.join(non_triangular)
+            )
+            report_export(operator, 'ERROR', message)
+            return {'CANCELLED'}
+        material_issues = find_material_slot_issues(source_id)
+        if material_issues:
+            report_export(
+                operator,
+                'ERROR',
+                'Each MDB mesh requires exactly one material. Export cancelled: '
+                + '; '.join(material_issues[:8]),
+            )
+            return {'CANCELLED'}
+        incomplete_metadata = find_incomplete_mdb_metadata(source_id, armature)
+        if incomplete_metadata:
+            report_export(
+                operator,
+                'ERROR',
+                'This scene lacks current lossless MDB metadata. Re-import the '
+                'source MDB with this add-on version. Missing: '
+                + '; '.join(incomplete_metadata[:8]),
+            )
+            return {'CANCELLED'}
+        bone_weight_issues = find_bone_weight_issues(source_id, armature)
+        if bone_weight_issues:
+            report_export(
+                operator,
+                'ERROR',
+                'MDB skinning metadata is invalid. Export cancelled: '
+                + '; '.join(bone_weight_issues[:8]),
+            )
+            return {'CANCELLED'}
+        if find_overweight_vertices(source_id):
+            report_export(
+                operator,
+                'WARNING',
+                'Vertices with more than four bone influences will use their four '
+                'strongest influences, normalized to a total weight of 1.',
+            )
+    data = build_export_data(version, source_id, armature, recorder)
     index_limit_issues = find_index_limit_issues(data.objects)
     if index_limit_issues:
         report_export(
@@ -968,6 +1176,7 @@ def save(operator, context, filepath="", version=0, **kwargs):
         )
         return {'CANCELLED'}
 
-    with open(filepath, 'wb') as file:
+    with recorder.span('serialization'), open(filepath, 'wb') as file:
         write_mdb(file, data)
+        recorder.count('bytes', file.seek(0, os.SEEK_END))
     return {'FINISHED'}
@@ -1,240 +1,36 @@
 # CANM Animation importer for blender
 # Author: Smileynator
 
+import os
+
 import bpy
 import mathutils
+import numpy as np
 
 from .action_compat import initialize_action_fcurves, new_fcurve
+from .canm_format import CanmFormatError
+from .canm_parser import animation_digests, parse_canm, scan_canm
+from .canm_sampling import (
+    TRANSFORM_PROPERTIES,
+    ChannelCache,
+    linear_keyframe_indices,
+    positive_scales,
+    sample_bone,
+)
+from .curve_writer import write_curve_samples, write_sampled_curves
+from .instrumentation import Recorder
 
 from mathutils import Vector
-from struct import unpack
-
-# Read helper functions
-def read_ushort(file):
-    return unpack('<H', file.read(2))[0]
-
-def read_short(file):
-    return unpack('<h', file.read(2))[0]
-
-def read_int(file):
-    return unpack('<i', file.read(4))[0]
-
-
-def read_uint(file):
-    return unpack('<I', file.read(4))[0]
-
-
-def read_float(file):
-    return unpack('<f', file.read(4))[0]
-
-def read_wide_str(file):
-    data = bytearray()
-    while True:
-        char = file.read(2)
-        if char == b'\0\0':
-            break
-        data.extend(char)
-    return data.decode('utf-16')
-
-
-def parse_bone_data(f, bone_data_count, bone_data_offset):
-    bone_data = []
-    f.seek(bone_data_offset)
-    for i in range(bone_data_count):
-        data = {}
-        base = f.tell()
-        data['bone_id'] = read_ushort(f)
-        data['point_trans_id'] = read_short(f)
-        data['point_rot_id'] = read_short(f)
-        data['point_scale_id'] = read_short(f)
-        next = f.tell()
-        assert next - base == 0x08
-        
-        bone_data.append(data)
-    return bone_data
-
-
-def parse_anm_data(f, anm_data_count, anm_data_offset):
-    anm_data = []
-    f.seek(anm_data_offset)
-    for i in range(anm_data_count):
-        data = {}
-        base = f.tell()
-        data['loop'] = True if read_uint(f) == 1 else False
-        name = read_int(f)
-        data['duration'] = read_float(f)
-        data['frame_duration'] = read_float(f)
-        data['keyframes'] = read_uint(f)
-        bone_data_count = read_uint(f)
-        bone_data_offset = read_uint(f)
-        next = f.tell()
-        assert next - base == 0x1C
-
-        f.seek(base+name)
-        data['name'] = read_wide_str(f)
-        data['bone_data'] = parse_bone_data(f, bone_data_count, base+bone_data_offset)
-
-        f.seek(next)
-        anm_data.append(data)
-    return anm_data
-
-
-def parse_keyframes(f, keyframe_count, keyframe_offset):
-    keyframes = []
-    f.seek(keyframe_offset)
-    for i in range(keyframe_count):
-        data = {}
-        base = f.tell()
-        data['x'] = float(read_ushort(f))
-        data['y'] = float(read_ushort(f))
-        data['z'] = float(read_ushort(f))
-        next = f.tell()
-        assert next - base == 0x06
-        keyframes.append(data)
-    return keyframes
-
-
-def parse_keyframes_quat(f, keyframe_count, keyframe_offset):
-    keyframes = []
-    f.seek(keyframe_offset)
-    for i in range(keyframe_count):
-        data = {}
-        base = f.tell()
-        data['x'] = read_float(f)
-        data['y'] = read_float(f)
-        data['z'] = read_float(f)
-        data['w'] = read_float(f)
-        next = f.tell()
-        assert next - base == 0x10
-        keyframes.append(data)
-    return keyframes
-
-
-def parse_anm_point(f, anm_point_count, anm_point_offset):
-    anim_points = []
-    f.seek(anm_point_offset)
-    for i in range(anm_point_count):
-        point = {}
-        base = f.tell()
-        point['keyframe'] = read_ushort(f) == 1
-        keyframe_count = read_ushort(f)
-        point['base_x'] = read_float(f)
-        point['base_y'] = read_float(f)
-        point['base_z'] = read_float(f)
-        point['speed_x'] = read_float(f)
-        point['speed_y'] = read_float(f)
-        point['speed_z'] = read_float(f)
-        keyframe_offset = read_int(f)
-        next = f.tell()
-        assert next - base == 0x20
-
-        point['type'] = 1
-        point['keyframes'] = []
-        if point['keyframe']:
-            point['keyframes'] = parse_keyframes(f, keyframe_count, base+keyframe_offset)
-
-        f.seek(next)
-        anim_points.append(point)
-    return anim_points
-
-
-def parse_anm_point6(f, anm_point_count, anm_point_offset):
-    """Parse EDF6's 0x30-byte animation channels."""
-    anim_points = []
-    f.seek(anm_point_offset)
-    for i in range(anm_point_count):
-        point = {}
-        base = f.tell()
-        point['base_x'] = read_float(f)
-        point['base_y'] = read_float(f)
-        point['base_z'] = read_float(f)
-        point['base_w'] = read_float(f)
-        point['speed_x'] = read_float(f)
-        point['speed_y'] = read_float(f)
-        point['speed_z'] = read_float(f)
-        point['speed_w'] = read_float(f)
-        keyframe_offset = read_int(f)
-        point['type'] = read_int(f)
-        keyframe_count = read_int(f)
-        read_int(f)
-        next = f.tell()
-        assert next - base == 0x30
-
-        point['keyframes'] = []
-        if keyframe_count > 1:
-            if point['type'] == 1:
-                point['keyframes'] = parse_keyframes(
-                    f,
-                    keyframe_count,
-                    base + keyframe_offset,
-                )
-            elif point['type'] == 3:
-                point['keyframes'] = parse_keyframes_quat(
-                    f,
-                    keyframe_count,
-                    base + keyframe_offset,
-                )
-            else:
-                print(
-                    f'Warning: CANM6 channel {i} has unexpected type '
-                    f'{point["type"]} with {keyframe_count} keyframes.'
-                )
 
-        f.seek(next)
-        anim_points.append(point)
-    return anim_points
-
-
-def parse_bone_names(f, anm_bone_count, anm_bone_offset):
-    bone_names = []
-    f.seek(anm_bone_offset)
-    for i in range(anm_bone_count):
-        base = f.tell()
-        name = read_int(f)
-        next = f.tell()
-        assert next - base == 0x4
-        f.seek(base+name)
-        bone = read_wide_str(f)
-        f.seek(next)
-        bone_names.append(bone)
-    return bone_names
-
-
-def parse_canm(f):
-    canm = {}
-    f.seek(0)
-    file_signature = f.read(4)
-    file_version = read_uint(f)
-    anm_data_count = read_uint(f)
-    anm_data_offset = read_uint(f)
-    anm_point_count = read_uint(f)
-    anm_point_offset = read_uint(f)
-    anm_bone_count = read_uint(f)
-    anm_bone_offset = read_uint(f)
-    
-    assert file_signature == b'CANM'
-
-    if override_version != 0:
-        file_version = override_version
-    else:
-        assert file_version in (512, 768)
-
-    canm['animations'] = parse_anm_data(f, anm_data_count, anm_data_offset)
-    if file_version == 768:
-        canm['anm_points'] = parse_anm_point6(
-            f,
-            anm_point_count,
-            anm_point_offset,
-        )
-    else:
-        canm['anm_points'] = parse_anm_point(
-            f,
-            anm_point_count,
-            anm_point_offset,
-        )
-    canm['bone_names'] = parse_bone_names(f, anm_bone_count, anm_bone_offset)
 
-    return canm
+# Rest transforms whose scale is this close to 1 are sampled in batch.
+RIGID_SCALE_TOLERANCE = 1e-5
+
+# Where imported Actions came from, for updating them when the file changes.
+SOURCE_PROPERTY = 'edf_canm_source'
+CLIP_PROPERTY = 'edf_canm_clip'
+DIGEST_PROPERTY = 'edf_canm_digest'
+REMOVED_PROPERTY = 'edf_canm_removed'
 
 
 def quaternion_rotation_matrix(x, y, z, w):
@@ -296,32 +92,30 @@ def get_bone_matrix_of_frame(canm, bone_anim, i):
     # If keyframes are present we override frame 0
     # Position
     if pos_anim and len(pos_anim['keyframes']) > i:
-        x = pos_anim['base_x'] + pos_anim['keyframes'][i]['x'] * pos_anim['speed_x']
-        y = pos_anim['base_y'] + pos_anim['keyframes'][i]['y'] * pos_anim['speed_y']
-        z = pos_anim['base_z'] + pos_anim['keyframes'][i]['z'] * pos_anim['speed_z']
+        offsets = pos_anim['keyframes'][i]
+        x = pos_anim['base_x'] + float(offsets[0]) * pos_anim['speed_x']
+        y = pos_anim['base_y'] + float(offsets[1]) * pos_anim['speed_y']
+        z = pos_anim['base_z'] + float(offsets[2]) * pos_anim['speed_z']
         pos_mat = mathutils.Matrix.Translation(Vector((x, y, z)))
         set_pos = True
     # Rotation
     if rot_anim and len(rot_anim['keyframes']) > i:
         if rot_anim['type'] in (2, 3):
-            keyframe = rot_anim['keyframes'][i]
-            rot_mat = quaternion_rotation_matrix(
-                keyframe['x'],
-                keyframe['y'],
-                keyframe['z'],
-                keyframe['w'],
-            )
+            x, y, z, w = (float(value) for value in rot_anim['keyframes'][i])
+            rot_mat = quaternion_rotation_matrix(x, y, z, w)
         else:
-            x = mathutils.Matrix.Rotation(rot_anim['base_x'] + rot_anim['keyframes'][i]['x'] * rot_anim['speed_x'], 4, 'X')
-            y = mathutils.Matrix.Rotation(rot_anim['base_y'] + rot_anim['keyframes'][i]['y'] * rot_anim['speed_y'], 4, 'Y')
-            z = mathutils.Matrix.Rotation(rot_anim['base_z'] + rot_anim['keyframes'][i]['z'] * rot_anim['speed_z'], 4, 'Z')
+            offsets = rot_anim['keyframes'][i]
+            x = mathutils.Matrix.Rotation(rot_anim['base_x'] + float(offsets[0]) * rot_anim['speed_x'], 4, 'X')
+            y = mathutils.Matrix.Rotation(rot_anim['base_y'] + float(offsets[1]) * rot_anim['speed_y'], 4, 'Y')
+            z = mathutils.Matrix.Rotation(rot_anim['base_z'] + float(offsets[2]) * rot_anim['speed_z'], 4, 'Z')
             rot_mat = z @ y @ x
         set_rot = True
     # Scale
     if scale_anim and len(scale_anim['keyframes']) > i:
-        x = scale_anim['base_x'] + scale_anim['keyframes'][i]['x'] * scale_anim['speed_x']
-        y = scale_anim['base_y'] + scale_anim['keyframes'][i]['y'] * scale_anim['speed_y']
-        z = scale_anim['base_z'] + scale_anim['keyframes'][i]['z'] * scale_anim['speed_z']
+        offsets = scale_anim['keyframes'][i]
+        x = scale_anim['base_x'] + float(offsets[0]) * scale_anim['speed_x']
+        y = scale_anim['base_y'] + float(offsets[1]) * scale_anim['speed_y']
+        z = scale_anim['base_z'] + float(offsets[2]) * scale_anim['speed_z']
         scale_mat = scale_matrix(x, y, z)
         set_scale = True
     # Final local offset matrix
@@ -348,24 +142,88 @@ def create_sampled_fcurves(
     curves,
     pose_bone,
     property_name,
-    component_count,
-    samples,
+    values,
+    thin_keyframes=False,
 ):
-    """Create a complete transform channel without live pose evaluation."""
+    """Create a complete transform channel without live pose evaluation.
+
+    ``values`` holds one row per frame, starting at frame 1. With
+    ``thin_keyframes`` each component only keeps the keys linear
+    interpolation cannot reproduce. Returns the number of keys written.
+    """
     data_path = f'pose.bones["{pose_bone.name}"].{property_name}'
-    for component_index in range(component_count):
-        curve = new_fcurve(
+    component_curves = [
+        new_fcurve(
             curves,
             data_path,
             index=component_index,
             action_group=pose_bone.name,
         )
-        curve.keyframe_points.add(len(samples))
-        coordinates = []
-        for frame, values in samples:
-            coordinates.extend((float(frame), float(values[component_index])))
-        curve.keyframe_points.foreach_set('co', coordinates)
-        curve.update()
+        for component_index in range(values.shape[1])
+    ]
+    if not thin_keyframes:
+        write_sampled_curves(component_curves, values)
+        return values.size
+    written = 0
+    for component_index, curve in enumerate(component_curves):
+        frames = linear_keyframe_indices(values[:, component_index])
+        write_curve_samples(
+            curve,
+            values[frames, component_index],
+            frames=frames,
+        )
+        written += len(frames)
+    return written
+
+
+def sample_bone_matrices(canm, bone_anim, rest_inverse, frame_count):
+    """Per-frame fallback of ``canm_sampling.sample_bone``.
+
+    Used when the rest transform or the sampled scale cannot be separated
+    into independent location, rotation and scale arrays.
+    """
+    samples = {name: [] for name in TRANSFORM_PROPERTIES}
+    previous_rotation = None
+    for i in range(frame_count):
+        matrix_result = get_bone_matrix_of_frame(canm, bone_anim, i)
+        basis_matrix = rest_inverse @ matrix_result['matrix']
+        position, rotation, scale = basis_matrix.decompose()
+        if previous_rotation is not None and rotation.dot(previous_rotation) < 0:
+            rotation.negate()
+        previous_rotation = rotation.copy()
+        if matrix_result['pos']:
+            samples['location'].append(tuple(position))
+        if matrix_result['rot']:
+            samples['rotation_quaternion'].append(
+                (rotation.w, rotation.x, rotation.y, rotation.z)
+            )
+        if matrix_result['scale']:
+            samples['scale'].append(tuple(scale))
+    return {
+        name: np.array(rows, dtype=np.float64) if rows else None
+        for name, rows in samples.items()
+    }
+
+
+def sample_pose_bone(canm, bone_anim, pose_bone, frame_count, cache=None):
+    rest_inverse = local_rest_matrix(pose_bone).inverted_safe()
+    rest_location, rest_rotation, rest_scale = rest_inverse.decompose()
+    if all(abs(value - 1.0) <= RIGID_SCALE_TOLERANCE for value in rest_scale):
+        samples = sample_bone(
+            canm,
+            bone_anim,
+            tuple(rest_location),
+            tuple(rest_rotation),
+            frame_count,
+            cache,
+        )
+        if positive_scales(samples):
+            return samples
+    elif cache is not None:
+        # The per-frame path bypasses the cache; let go of this record's
+        # references so shared entries are still freed after their last use.
+        cache.release(bone_anim)
+    return sample_bone_matrices(canm, bone_anim, rest_inverse, frame_count)
 
 
 def create_action_with_animation(
@@ -373,6 +231,10 @@ def create_action_with_animation(
     animation,
     canm,
     mapped_pose_bones,
+    cache=None,
+    thin_keyframes=False,
+    recorder=None,
+    track=None,
 ):
     # Construct F-curves directly. Assigning every sampled matrix to the live
     # pose and calling keyframe_insert forces Blender to repeatedly evaluate
@@ -396,97 +258,59 @@ def create_action_with_animation(
     ]
 
     for pose_bone, bone_anim in animated_pose_bones:
-        rest_inverse = local_rest_matrix(pose_bone).inverted_safe()
-        position_samples = []
-        rotation_samples = []
-        scale_samples = []
-        previous_rotation = None
-        for i in range(keyframes):
-            matrix_result = get_bone_matrix_of_frame(canm, bone_anim, i)
-            basis_matrix = rest_inverse @ matrix_result['matrix']
-            position, rotation, scale = basis_matrix.decompose()
-            if previous_rotation is not None and rotation.dot(previous_rotation) < 0:
-                rotation.negate()
-            previous_rotation = rotation.copy()
-            frame = i + 1
-            if matrix_result['pos']:
-                position_samples.append((frame, tuple(position)))
-            if matrix_result['rot']:
-                rotation_samples.append((
-                    frame,
-                    (rotation.w, rotation.x, rotation.y, rotation.z),
-                ))
-            if matrix_result['scale']:
-                scale_samples.append((frame, tuple(scale)))
-        if position_samples:
-            create_sampled_fcurves(
-                curves,
-                pose_bone,
-                'location',
-                3,
-                position_samples,
-            )
-        if rotation_samples:
-            create_sampled_fcurves(
-                curves,
-                pose_bone,
-                'rotation_quaternion',
-                4,
-                rotation_samples,
-            )
-        if scale_samples:
-            create_sampled_fcurves(
-                curves,
-                pose_bone,
-                'scale',
-                3,
-                scale_samples,
-            )
+        samples = sample_pose_bone(
+            canm,
+            bone_anim,
+            pose_bone,
+            keyframes,
+            cache,
+        )
+        for property_name, values in samples.items():
+            if values is not None:
+                written = create_sampled_fcurves(
+                    curves,
+                    pose_bone,
+                    property_name,
+                    values,
+                    thin_keyframes,
+                )
+                if recorder is not None:
+                    recorder.count('samples', values.size)
+                    recorder.count('keyframe_points', written)
 
-    track = armature_obj.animation_data.nla_tracks.new()
+    if track is None:
+        track = armature_obj.animation_data.nla_tracks.new()
+        track.name = animation['name']
     track.strips.new(action.name, 1, action)
-    track.name = animation['name']
+    return action
 
 
-def load(operator, context, filepath='', **kwargs):
-    global override_version
-    if bpy.app.version >= (5, 2, 0):
-        override_version = getattr(operator, 'option_override_version', 0)
-    else:
-        override_version = operator.option_override_version
-    # Parse CANM file
-    with open(filepath, 'rb') as f:
-        canm = parse_canm(f)
-    # Find existing armature to add animation to
-    armature = bpy.data.armatures[0]
-    if not armature:
-        return
-    armature_object = None
-    for obj in bpy.data.objects:
-        if obj.type == 'ARMATURE' and obj.data == armature:
-            armature_object = obj
-            break
+def source_key(filepath):
+    return os.path.normcase(os.path.abspath(filepath))
+
+
+def tag_action(action, filepath, animation, digest):
+    action[SOURCE_PROPERTY] = source_key(filepath)
+    action[CLIP_PROPERTY] = animation['name']
+    action[DIGEST_PROPERTY] = digest
+    if REMOVED_PROPERTY in action:
+        del action[REMOVED_PROPERTY]
 
+
+def map_pose_bones(canm, armature_object):
+    """Pair the pose bones of ``armature_object`` with CANM bone indices."""
     bone_index_by_name = {
         bone_name: index
         for index, bone_name in enumerate(canm['bone_names'])
     }
-    mapped_pose_bones = [
+    return [
         (bone_index_by_name[pose_bone.name], pose_bone)
         for pose_bone in armature_object.pose.bones
         if pose_bone.name in bone_index_by_name
     ]
 
-    # Create animation timelines for each animation
-    for animation in canm['animations']:
-        # Create action for animation
-        create_action_with_animation(
-            armature_object,
-            animation,
-            canm,
-            mapped_pose_bones,
-        )
 
+def store_missing_bones(canm, armature_object):
     # Warn missing bones and append to armature object
     # TODO will these ever have animations? If so we need to store those too.
     missing_bones = []
@@ -497,5 +321,128 @@ def load(operator, context, filepath='', **kwargs):
             print(f'Could not find bone: {bone_name}. Instead stored in Armature Object.')
             missing_bones.append(bone_name)
     armature_object['missing_bones'] = missing_bones
-    
+
+
+def load(operator, context, filepath='', **kwargs):
+    with Recorder('CANM import', filepath) as recorder:
+        return recorder.finish(import_file(operator, filepath, recorder))
+
+
+def list_canm_clips(filepath, override_version=0):
+    """List the clips of a CANM file from its header and animation table.
+
+    Each clip is a dict with ``index``, ``name``, ``loop``, ``duration``,
+    ``frame_duration``, ``keyframes`` and ``bone_count``. Channels are not
+    read, so this is cheap even for files with hundreds of clips.
+    """
+    with open(filepath, 'rb') as f:
+        return scan_canm(f, override_version)['animations']
+
+
+def default_armature_object():
+    # Find existing armature to add animation to
+    armature = bpy.data.armatures[0]
+    if not armature:
+        return None
+    for obj in bpy.data.objects:
+        if obj.type == 'ARMATURE' and obj.data == armature:
+            return obj
+    return None
+
+
+def import_canm_clips(
+    filepath,
+    clips=None,
+    armature_object=None,
+    override_version=0,
+    recorder=None,
+    thin_keyframes=False,
+):
+    """Import clips of a CANM file as Actions on ``armature_object``.
+
+    ``clips`` lists clip indices or names; ``None`` imports every clip. Only
+    the channels of the chosen clips are decoded, so clips can be added to
+    the same armature later with another call. Returns the new Actions in
+    file order. ``thin_keyframes`` drops keys that linear interpolation
+    reproduces; export samples the same values either way. Raises
+    ``OSError``, ``CanmFormatError``, or ``KeyError`` for an unknown clip.
+    """
+    if recorder is None:
+        recorder = Recorder('CANM import', filepath)
+    if armature_object is None:
+        armature_object = default_armature_object()
+    with recorder.span('parse'), open(filepath, 'rb') as f:
+        canm = parse_canm(f, override_version, clips)
+        recorder.count('bytes', f.seek(0, 2))
+        recorder.count('animations', len(canm['animations']))
+        recorder.count(
+            'channels',
+            sum(channel is not None for channel in canm['anm_points']),
+        )
+
+    mapped_pose_bones = map_pose_bones(canm, armature_object)
+
+    # Channels shared between animations are decoded once
+    cache = ChannelCache(
+        canm,
+        bone_ids=[bone_index for bone_index, _ in mapped_pose_bones],
+    )
+    # Create animation timelines for each animation
+    actions = []
+    for animation, digest in zip(canm['animations'], animation_digests(canm)):
+        # Create action for animation
+        with recorder.span('actions'):
+            action = create_action_with_animation(
+                armature_object,
+                animation,
+                canm,
+                mapped_pose_bones,
+                cache,
+                thin_keyframes,
+                recorder,
+            )
+        tag_action(action, filepath, animation, digest)
+        actions.append(action)
+    recorder.count('decoded_channels', cache.misses)
+    recorder.count('reused_channels', cache.hits)
+    armature_object[SOURCE_PROPERTY] = source_key(filepath)
+    store_missing_bones(canm, armature_object)
+    return actions
+
+
+def selected_clip_indices(operator, filepath):
+    """Clip indices ticked in the import dialog, or ``None`` for all clips.
+
+    The dialog only lists clips after scanning ``filepath``; scripted calls
+    and stale lists import everything.
+    """
+    # Scripted callers may pass operators without the dialog properties.
+    clips = getattr(operator, 'clips', None)
+    scanned_filepath = getattr(operator, 'scanned_filepath', '')
+    if not clips or scanned_filepath != filepath:
+        return None
+    return [clip.index for clip in clips if clip.selected]
+
+
+def import_file(operator, filepath, recorder):
+    if bpy.app.version >= (5, 2, 0):
+        override_version = getattr(operator, 'option_override_version', 0)
+    else:
+        override_version = operator.option_override_version
+    thin_keyframes = getattr(operator, 'option_thin_keyframes', False)
+    clips = selected_clip_indices(operator, filepath)
+    if clips == []:
+        operator.report({'WARNING'}, 'CANM import: no clips selected')
+        return {'CANCELLED'}
+    try:
+        import_canm_clips(
+            filepath,
+            clips,
+            override_version=override_version,
+            recorder=recorder,
+            thin_keyframes=thin_keyframes,
+        )
+    except (OSError, CanmFormatError) as error:
+        operator.report({'ERROR'}, f'CANM import: {error}')
+        return {'CANCELLED'}
     return {'FINISHED'}
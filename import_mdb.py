@@ -2,16 +2,26 @@
 
 import os
 import json
+import time
 import uuid
 import bpy
 import mathutils
 import numpy as np
 
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from .instrumentation import Recorder
 from .mdb_format import (
+    MERGED_MESHES_PROPERTY,
+    MERGED_UV_CHANNELS_PROPERTY,
+    MESH_INDEX_ATTRIBUTE,
     MdbFormatError,
+    SKIN_BONES_PROPERTY,
+    SKIN_INDICES_ATTRIBUTE,
+    SKIN_WEIGHTS_ATTRIBUTE,
     SOURCE_ID_PROPERTY,
     SOURCE_PATH_PROPERTY,
+    TEXTURE_TABLE_PROPERTY,
     read_uint,
 )
 from .mdb_parser import (
@@ -29,6 +39,7 @@ from .mdb_parser import (
     parse_vertices,
 )
 from .shader import (
+    PREVIEW_FULL,
     combine_rgb_input,
     combine_rgb_output,
     get_shader,
@@ -38,6 +49,17 @@ from .shader import (
     separate_rgb_input,
     separate_rgb_output,
 )
+from .texture_resolver import (
+    TEXTURE_MODE_DEFERRED,
+    TEXTURE_MODE_EAGER,
+    TEXTURE_MODE_PROXY,
+    configure_texture_image,
+    create_placeholder_image,
+    load_image,
+    load_proxy_image,
+    resolve_texture_path,
+    texture_directories,
+)
 
 MDB_EDITING_NOTES = """MDB material editing
 
@@ -68,10 +90,24 @@ NORMAL_UNSWIZZLE_GROUP_NAME = (
 )
 
 
+# What an MDB import creates. Armature-only and materials-only imports skip
+# geometry decoding entirely.
+IMPORT_CONTENT_ALL = 'ALL'
+IMPORT_CONTENT_ARMATURE = 'ARMATURE'
+IMPORT_CONTENT_MATERIALS = 'MATERIALS'
+
+
 @dataclass(frozen=True)
 class ImportSettings:
     ignore_errors: bool = False
     override_version: int = 0
+    share_meshes: bool = False
+    weld_seams: bool = False
+    texture_mode: str = TEXTURE_MODE_EAGER
+    preview_tier: str = PREVIEW_FULL
+    content: str = IMPORT_CONTENT_ALL
+    merge_meshes: bool = False
+    skin_attributes: bool = False
 
 def warnparam(socket, material, param):
     if socket is None:
@@ -79,11 +115,13 @@ def warnparam(socket, material, param):
     return socket
 
 
-def add_material_editing_note(node_tree, shader_node):
+def add_material_editing_note(node_tree, shader_node, created=None):
     text = bpy.data.texts.get('MDB Editing Notes')
     if text is None:
         text = bpy.data.texts.new('MDB Editing Notes')
         text.write(MDB_EDITING_NOTES)
+        if created is not None:
+            created.append(text)
 
     note = node_tree.nodes.new('NodeFrame')
     note.name = 'MDB Editing Notes'
@@ -244,32 +282,47 @@ def set_material_parameter_values(shader_node, mdb_material):
                     alpha_socket.default_value = parameter['val3']
 
 
-def load_texture_image(filepath, filename, slot_name, texture_cache):
+def load_texture_image(
+    filepath,
+    filename,
+    slot_name,
+    texture_cache,
+    texture_mode=TEXTURE_MODE_EAGER,
+    created=None,
+):
+    """Return the image for one texture binding.
+
+    Images this call adds to ``bpy.data`` are appended to ``created``; images
+    reused from an earlier import are not.
+    """
     if filename in texture_cache:
         return texture_cache[filename]
 
-    model_directory = os.path.dirname(filepath)
-    candidates = (
-        os.path.join(model_directory, '..', 'HD-TEXTURE', filename),
-        os.path.join(model_directory, '..', 'TEXTURE', filename),
-    )
-    image = None
-    last_error = None
-    for candidate in candidates:
-        try:
-            image = bpy.data.images.load(candidate)
-            break
-        except RuntimeError as error:
-            last_error = error
-
-    if image is None:
-        print(f"Failed to load texture '{filename}': {last_error}")
+    texture_path = resolve_texture_path(filepath, filename)
+    if texture_mode == TEXTURE_MODE_DEFERRED:
+        image = create_placeholder_image(filename, texture_path)
+        texture_cache[filename] = image
+        if created is not None:
+            created.append(image)
+        return image
+    if texture_path is None:
+        searched = ', '.join(texture_directories(filepath))
+        print(f"Failed to load texture '{filename}': not found in {searched}")
+        return None
+    image_count = len(bpy.data.images)
+    try:
+        if texture_mode == TEXTURE_MODE_PROXY:
+            image = load_proxy_image(texture_path)
+        else:
+            image = load_image(texture_path)
+    except (OSError, RuntimeError) as error:
+        print(f"Failed to load texture '{filename}': {error}")
         return None
 
     texture_cache[filename] = image
-    image.alpha_mode = 'CHANNEL_PACKED'
-    if 'albedo' not in slot_name and 'diffuse' not in slot_name:
-        image.colorspace_settings.name = 'Non-Color'
+    if created is not None and len(bpy.data.images) > image_count:
+        created.append(image)
+    configure_texture_image(image, slot_name)
     return image
 
 
@@ -333,6 +386,8 @@ def add_material_texture(
     binding_index,
     filepath,
     texture_cache,
+    texture_mode=TEXTURE_MODE_EAGER,
+    created=None,
 ):
     slot_name = texture['map']
     texture_record = mdb['textures'][texture['texture']]
@@ -359,6 +414,8 @@ def add_material_texture(
         filename,
         slot_name,
         texture_cache,
+        texture_mode,
+        created,
     )
     texture_node.location[0] = shader_node.location[0] - 700 + binding_index * 40
     texture_node.location[1] = shader_node.location[1] - binding_index * 40
@@ -384,7 +441,15 @@ def create_material(
     ignore_errors,
     source_id,
     source_path,
+    texture_mode=TEXTURE_MODE_EAGER,
+    preview_tier=PREVIEW_FULL,
+    created=None,
 ):
+    """Create one MDB material.
+
+    Untagged data-blocks it adds, like images and the editing notes text,
+    are appended to ``created``.
+    """
     material = bpy.data.materials.new(mdb_material['name'])
     tag_mdb_source(material, source_id, source_path)
     material['draw_priority'] = mdb_material['draw_priority']
@@ -395,7 +460,6 @@ def create_material(
     material['mdb_name'] = mdb_material['name']
     material['mdb_shader_name'] = mdb_material['shader']
     material['mdb_material_index'] = mdb_material['index']
-    material['mdb_texture_table'] = json.dumps(mdb['textures'])
 
     shader_name = mdb_material['shader']
     lower_shader_name = shader_name.lower()
@@ -413,7 +477,7 @@ def create_material(
     if default_bsdf is not None:
         node_tree.nodes.remove(default_bsdf)
 
-    shader = get_shader(shader_name, ignore_errors, mdb_material)
+    shader = get_shader(shader_name, ignore_errors, mdb_material, preview_tier)
     if shader.has_alpha and material.blend_method == 'OPAQUE':
         material.blend_method = 'HASHED'
 
@@ -432,7 +496,7 @@ def create_material(
         material_output.inputs['Surface'],
         shader_node.outputs['Surface'],
     )
-    add_material_editing_note(node_tree, shader_node)
+    add_material_editing_note(node_tree, shader_node, created)
     set_material_parameter_values(shader_node, mdb_material)
 
     for binding_index, texture in enumerate(mdb_material['textures']):
@@ -445,6 +509,8 @@ def create_material(
             binding_index,
             filepath,
             texture_cache,
+            texture_mode,
+            created,
         )
 
     for node in node_tree.nodes:
@@ -452,23 +518,74 @@ def create_material(
     return material
 
 
-def create_materials(mdb, filepath, ignore_errors, source_id, source_path):
-    texture_cache = {}
-    return [
-        create_material(
-            mdb,
-            mdb_material,
-            filepath,
-            texture_cache,
-            ignore_errors,
-            source_id,
-            source_path,
-        )
-        for mdb_material in mdb['materials']
+@contextmanager
+def armature_edit_mode(armature_objects, context=None):
+    """Put all ``armature_objects`` in Edit Mode with a single mode switch.
+
+    Multi-object Edit Mode follows the view layer's selection, not the
+    context, so the armatures are selected and made active for the duration.
+    A caller in another mode is switched to Object Mode first. The caller's
+    mode, selection and active object are restored afterwards. Objects that
+    are not in the view layer are linked to the scene collection meanwhile.
+    """
+    context = context or bpy.context
+    armature_objects = list(armature_objects)
+    if not armature_objects:
+        yield
+        return
+    view_layer = context.view_layer
+    previous_active = view_layer.objects.active
+    previous_mode = context.mode
+    previous_object_mode = (
+        previous_active.mode if previous_active is not None else 'OBJECT'
+    )
+    if previous_mode != 'OBJECT' and previous_active is not None:
+        with context.temp_override(
+            active_object=previous_active,
+            object=previous_active,
+        ):
+            bpy.ops.object.mode_set(mode='OBJECT')
+    temporary = [
+        armature_object for armature_object in armature_objects
+        if armature_object.name not in view_layer.objects
     ]
+    previous_selection = [obj for obj in view_layer.objects if obj.select_get()]
+    try:
+        for armature_object in temporary:
+            context.scene.collection.objects.link(armature_object)
+        for obj in previous_selection:
+            obj.select_set(False)
+        for armature_object in armature_objects:
+            armature_object.select_set(True)
+        view_layer.objects.active = armature_objects[0]
+        with context.temp_override(
+            active_object=armature_objects[0],
+            object=armature_objects[0],
+            selected_objects=armature_objects,
+            selected_editable_objects=armature_objects,
+        ):
+            bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+            try:
+                yield
+            finally:
+                bpy.ops.object.mode_set(mode='OBJECT')
+    finally:
+        for armature_object in armature_objects:
+            armature_object.select_set(False)
+        for obj in previous_selection:
+            obj.select_set(True)
+        view_layer.objects.active = previous_active
+        for armature_object in temporary:
+            context.scene.collection.objects.unlink(armature_object)
+        if previous_object_mode != 'OBJECT' and previous_active is not None:
+            with context.temp_override(
+                active_object=previous_active,
+                object=previous_active,
+            ):
+                bpy.ops.object.mode_set(mode=previous_object_mode)
 
 
-def create_armature(mdb, filepath, context, source_id, source_path):
+def create_armature_object(mdb, filepath, collection, source_id, source_path):
     armature = bpy.data.armatures.new('Armature')
     tag_mdb_source(armature, source_id, source_path)
     armature_object = bpy.data.objects.new(
@@ -476,13 +593,18 @@ def create_armature(mdb, filepath, context, source_id, source_path):
         armature,
     )
     tag_mdb_source(armature_object, source_id, source_path)
-    context.scene.collection.objects.link(armature_object)
-    context.view_layer.objects.active = armature_object
-    bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+    # Materials only keep their own bindings; the full table, including
+    # unused entries, is stored once here for export.
+    armature_object[TEXTURE_TABLE_PROPERTY] = json.dumps(mdb['textures'])
+    collection.objects.link(armature_object)
+    return armature_object
+
 
+def create_armature_bones(armature, mdb_bones):
+    """Create the MDB bones. The armature must be in Edit Mode."""
     edit_bones = armature.edit_bones
     created_bones = []
-    for mdb_bone in mdb['bones']:
+    for mdb_bone in mdb_bones:
         bone = edit_bones.new(mdb_bone['name'])
         bone.length = 0.25
         if mdb_bone['parent'] >= 0:
@@ -497,35 +619,102 @@ def create_armature(mdb, filepath, context, source_id, source_path):
         bone['bounds_center'] = mdb_bone['bounds_center']
         created_bones.append(bone)
 
-    bpy.ops.object.mode_set(mode='OBJECT')
+
+def create_armature(mdb, filepath, collection, source_id, source_path):
+    armature_object = create_armature_object(
+        mdb,
+        filepath,
+        collection,
+        source_id,
+        source_path,
+    )
+    with armature_edit_mode([armature_object]):
+        create_armature_bones(armature_object.data, mdb['bones'])
     return armature_object
 
 
-def create_mesh_geometry(mesh, mdb_mesh):
+WELD_ATTRIBUTES = ('position0', 'blendindices0', 'blendweight0')
+
+
+def vertex_weld_key(vertex):
+    return tuple(
+        tuple(vertex[attribute]) if attribute in vertex else None
+        for attribute in WELD_ATTRIBUTES
+    )
+
+
+def weld_mesh_vertices(vertices, indices):
+    """Merge seam-split vertices that share a position and skin weights.
+
+    Returns the MDB vertex behind each Blender vertex and the Blender vertex
+    used by each face corner. Faces that would collapse or duplicate another
+    face once welded keep unwelded copies of their corners instead.
+    """
+    welded = {}
+    sources = []
+    corners = []
+    welded_faces = set()
+    for start in range(0, len(indices) - len(indices) % 3, 3):
+        face = indices[start:start + 3]
+        keys = [vertex_weld_key(vertices[index]) for index in face]
+        face_key = frozenset(keys)
+        if len(face_key) < 3 or face_key in welded_faces:
+            for index in face:
+                corners.append(len(sources))
+                sources.append(index)
+            continue
+        welded_faces.add(face_key)
+        for index, key in zip(face, keys):
+            vertex_index = welded.get(key)
+            if vertex_index is None:
+                vertex_index = len(sources)
+                welded[key] = vertex_index
+                sources.append(index)
+            corners.append(vertex_index)
+    return sources, corners
+
+
+def create_mesh_geometry(mesh, mdb_mesh, weld_seams=False):
+    """Build the mesh and return the MDB vertex behind each Blender vertex."""
     vertices = mdb_mesh['vertices']
+    if weld_seams:
+        sources, corners = weld_mesh_vertices(vertices, mdb_mesh['indices'])
+    else:
+        sources, corners = range(len(vertices)), mdb_mesh['indices']
     faces = [
-        tuple(mdb_mesh['indices'][index:index + 3])
-        for index in range(0, len(mdb_mesh['indices']), 3)
+        tuple(corners[index:index + 3])
+        for index in range(0, len(corners), 3)
     ]
     positions = [
         (
-            vertex['position0'][0],
-            -vertex['position0'][2],
-            vertex['position0'][1],
+            vertices[source]['position0'][0],
+            -vertices[source]['position0'][2],
+            vertices[source]['position0'][1],
         )
-        for vertex in vertices
+        for source in sources
     ]
     mesh.from_pydata(positions, [], faces)
     mesh.polygons.foreach_set('use_smooth', (True,) * len(faces))
+    return sources
+
+
+# Face corners are created in MDB index order, so loop N always belongs to
+# MDB vertex indices[N], whether or not the seams were welded.
+def has_vertex_attribute(vertices, key):
+    # Merged meshes concatenate MDB meshes whose vertex layouts can differ.
+    return any(key in vertex for vertex in vertices)
 
 
-def apply_mesh_normals(mesh, vertices, object_name):
-    if not vertices or 'normal0' not in vertices[0]:
+def apply_mesh_normals(mesh, vertices, indices, object_name):
+    if not has_vertex_attribute(vertices, 'normal0'):
         print(f'No normals found for mesh {object_name}')
         return
 
     normals = []
     for vertex in vertices:
+        if 'normal0' not in vertex:
+            normals.append((0.0, 0.0, 0.0))
+            continue
         normal = vertex['normal0'].astype(float)
         magnitude = np.sqrt(sum(component * component for component in normal[:3]))
         if magnitude > 0:
@@ -533,41 +722,52 @@ def apply_mesh_normals(mesh, vertices, object_name):
             normals.append((normal[0], -normal[2], normal[1]))
         else:
             normals.append((0.0, 0.0, 0.0))
-    mesh.normals_split_custom_set_from_vertices(normals)
+    mesh.normals_split_custom_set([
+        normals[index] for index in indices[:len(mesh.loops)]
+    ])
     if bpy.app.version < (4, 1, 0):
         mesh.use_auto_smooth = True
 
 
-def apply_mesh_uv_maps(mesh, vertices):
+def apply_mesh_uv_maps(mesh, vertices, indices):
     if not vertices:
         return
+    loop_sources = indices[:len(mesh.loops)]
     for channel in range(4):
         coordinate_key = f'texcoord{channel}'
-        if coordinate_key not in vertices[0]:
+        if not has_vertex_attribute(vertices, coordinate_key):
             continue
         uv_map = mesh.uv_layers.new(
             name='UVMap' + ('' if channel == 0 else str(channel + 1)),
         )
-        for face in mesh.polygons:
-            for vertex_index, loop_index in zip(
-                face.vertices,
-                face.loop_indices,
-            ):
-                texcoord = vertices[vertex_index][coordinate_key]
-                uv_map.data[loop_index].uv[0] = texcoord[0]
-                uv_map.data[loop_index].uv[1] = 1.0 - texcoord[1]
+        coordinates = []
+        for index in loop_sources:
+            texcoord = vertices[index].get(coordinate_key, (0.0, 0.0))
+            coordinates.append(texcoord[0])
+            coordinates.append(1.0 - texcoord[1])
+        uv_map.data.foreach_set('uv', coordinates)
 
 
-def apply_vertex_groups(mesh_object, vertices, mdb_bones, object_name):
-    if not vertices or 'blendweight0' not in vertices[0]:
-        print(f'No blend weights found for mesh {object_name}')
-        return
+def has_blend_weights(vertices):
+    return has_vertex_attribute(vertices, 'blendweight0')
+
 
-    groups = [
+def create_bone_vertex_groups(mesh_object, mdb_bones):
+    return [
         mesh_object.vertex_groups.new(name=bone['name'])
         for bone in mdb_bones
     ]
+
+
+def apply_vertex_groups(mesh_object, vertices, mdb_bones, object_name):
+    if not has_blend_weights(vertices):
+        print(f'No blend weights found for mesh {object_name}')
+        return
+
+    groups = create_bone_vertex_groups(mesh_object, mdb_bones)
     for vertex_index, vertex in enumerate(vertices):
+        if 'blendweight0' not in vertex:
+            continue
         for influence_index in range(4):
             weight = vertex['blendweight0'][influence_index]
             if weight == 0:
@@ -576,65 +776,161 @@ def apply_vertex_groups(mesh_object, vertices, mdb_bones, object_name):
             groups[bone_index].add([vertex_index], weight, 'ADD')
 
 
+def apply_skin_attributes(mesh, vertices, mdb_bones, object_name):
+    """Store the raw MDB skin on ``mesh`` instead of creating vertex groups.
+
+    Much cheaper than one vertex group per bone, but the mesh does not deform
+    until ``mdb_tools.convert_skin_attributes`` turns it into vertex groups.
+    """
+    if not has_blend_weights(vertices):
+        print(f'No blend weights found for mesh {object_name}')
+        return
+
+    indices = np.zeros((len(vertices), 4), dtype=np.uint8)
+    weights = np.zeros((len(vertices), 4), dtype=np.float32)
+    for vertex_index, vertex in enumerate(vertices):
+        if 'blendweight0' not in vertex:
+            continue
+        indices[vertex_index] = vertex['blendindices0'][:4]
+        weights[vertex_index] = vertex['blendweight0'][:4]
+    # Keep the four index bytes bit for bit in one 32-bit integer per point.
+    mesh.attributes.new(SKIN_INDICES_ATTRIBUTE, 'INT', 'POINT').data.foreach_set(
+        'value',
+        indices.view(np.int32).ravel(),
+    )
+    mesh.attributes.new(
+        SKIN_WEIGHTS_ATTRIBUTE,
+        'FLOAT_COLOR',
+        'POINT',
+    ).data.foreach_set('color', weights.ravel())
+    mesh[SKIN_BONES_PROPERTY] = json.dumps([bone['name'] for bone in mdb_bones])
+
+
+def merge_mdb_meshes(mdb_meshes):
+    """Concatenate MDB meshes into one record with a material slot per mesh."""
+    vertices = []
+    indices = []
+    face_slots = []
+    for slot, mdb_mesh in enumerate(mdb_meshes):
+        offset = len(vertices)
+        mesh_indices = mdb_mesh['indices']
+        face_count = len(mesh_indices) // 3
+        vertices.extend(mdb_mesh['vertices'])
+        indices.extend(index + offset for index in mesh_indices[:face_count * 3])
+        face_slots.extend([slot] * face_count)
+    return {'vertices': vertices, 'indices': indices, 'face_slots': face_slots}
+
+
+def texcoord_channel_count(vertices):
+    if not vertices:
+        return 0
+    return sum(f'texcoord{channel}' in vertices[0] for channel in range(4))
+
+
+def apply_merged_mesh_slots(mesh, mdb_meshes, face_slots):
+    face_slots = face_slots[:len(mesh.polygons)]
+    mesh.polygons.foreach_set('material_index', face_slots)
+    mesh_index = mesh.attributes.new(MESH_INDEX_ATTRIBUTE, 'INT', 'FACE')
+    mesh_index.data.foreach_set(
+        'value',
+        [mdb_meshes[slot]['mesh_index'] for slot in face_slots],
+    )
+    # Export writes every UV layer; remember how many each MDB mesh had.
+    mesh[MERGED_UV_CHANNELS_PROPERTY] = [
+        texcoord_channel_count(mdb_mesh['vertices']) for mdb_mesh in mdb_meshes
+    ]
+
+
 def create_mesh_object(
-    context,
+    collection,
     mdb,
     mdb_object,
-    mdb_mesh,
+    mdb_meshes,
     materials,
     armature_object,
     container,
     source_id,
     source_path,
+    shared_meshes=None,
+    weld_seams=False,
+    skin_attributes=False,
 ):
+    """Create one mesh object, reusing an identical mesh when possible.
+
+    ``mdb_meshes`` holds one MDB mesh, or several to merge into one Blender
+    mesh with a material slot per MDB mesh. ``shared_meshes`` maps a
+    geometry/material key to an already imported mesh; passing ``None`` gives
+    every object its own mesh data-block. ``weld_seams`` merges seam-split
+    vertices and keeps their per-corner normals and UVs on the face corners.
+    ``skin_attributes`` stores the skin as mesh attributes, not vertex groups.
+    """
     object_name = mdb_object['name']
+    merged = len(mdb_meshes) > 1
+    mdb_mesh = merge_mdb_meshes(mdb_meshes) if merged else mdb_meshes[0]
     vertices = mdb_mesh['vertices']
-    mesh = bpy.data.meshes.new(f'{object_name}_Data')
-    tag_mdb_source(mesh, source_id, source_path)
-    mesh_object = bpy.data.objects.new(object_name, mesh)
-    tag_mdb_source(mesh_object, source_id, source_path)
-    create_mesh_geometry(mesh, mdb_mesh)
-    apply_mesh_normals(mesh, vertices, object_name)
-    apply_mesh_uv_maps(mesh, vertices)
-    apply_vertex_groups(mesh_object, vertices, mdb['bones'], object_name)
-
+    mesh_key = None
+    mesh = None
+    if shared_meshes is not None:
+        mesh_key = tuple(
+            (source['payload_digest'], source['material_index'])
+            for source in mdb_meshes
+        )
+        mesh = shared_meshes.get(mesh_key)
+    if mesh is not None:
+        mesh_object = bpy.data.objects.new(object_name, mesh)
+        tag_mdb_source(mesh_object, source_id, source_path)
+        # The weights live in the shared mesh, but vertex groups belong to the
+        # object. Recreate them in the same order so the weights resolve.
+        if has_blend_weights(vertices) and not skin_attributes:
+            create_bone_vertex_groups(mesh_object, mdb['bones'])
+    else:
+        mesh = bpy.data.meshes.new(f'{object_name}_Data')
+        tag_mdb_source(mesh, source_id, source_path)
+        mesh_object = bpy.data.objects.new(object_name, mesh)
+        tag_mdb_source(mesh_object, source_id, source_path)
+        sources = create_mesh_geometry(mesh, mdb_mesh, weld_seams)
+        indices = mdb_mesh['indices']
+        apply_mesh_normals(mesh, vertices, indices, object_name)
+        apply_mesh_uv_maps(mesh, vertices, indices)
+        skin_vertices = [vertices[source] for source in sources]
+        if skin_attributes:
+            apply_skin_attributes(mesh, skin_vertices, mdb['bones'], object_name)
+        else:
+            apply_vertex_groups(
+                mesh_object,
+                skin_vertices,
+                mdb['bones'],
+                object_name,
+            )
+        if merged:
+            for source in mdb_meshes:
+                material_index = source['material_index']
+                mesh.materials.append(
+                    materials[material_index] if material_index != -1 else None,
+                )
+            apply_merged_mesh_slots(mesh, mdb_meshes, mdb_mesh['face_slots'])
+        elif mdb_mesh['material_index'] != -1:
+            mesh.materials.append(materials[mdb_mesh['material_index']])
+        mesh.update()
+        if shared_meshes is not None:
+            shared_meshes[mesh_key] = mesh
+
+    if merged:
+        mesh_object[MERGED_MESHES_PROPERTY] = True
     armature_modifier = mesh_object.modifiers.new('Armature', 'ARMATURE')
     armature_modifier.object = armature_object
-    if mdb_mesh['material_index'] != -1:
-        mesh.materials.append(materials[mdb_mesh['material_index']])
-
-    mesh.update()
-    context.scene.collection.objects.link(mesh_object)
+    collection.objects.link(mesh_object)
     mesh_object.parent = container
     return mesh_object
 
 
-def create_mesh_objects(
-    context,
-    mdb,
-    materials,
-    armature_object,
-    source_id,
-    source_path,
-):
-    for mdb_object in mdb['objects']:
-        object_name = mdb_object['name']
-        container = bpy.data.objects.new(object_name, None)
-        tag_mdb_source(container, source_id, source_path)
-        container['mdb_name'] = object_name
-        context.scene.collection.objects.link(container)
-        for mdb_mesh in mdb_object['meshes']:
-            create_mesh_object(
-                context,
-                mdb,
-                mdb_object,
-                mdb_mesh,
-                materials,
-                armature_object,
-                container,
-                source_id,
-                source_path,
-            )
+def create_container(collection, mdb_object, source_id, source_path):
+    object_name = mdb_object['name']
+    container = bpy.data.objects.new(object_name, None)
+    tag_mdb_source(container, source_id, source_path)
+    container['mdb_name'] = object_name
+    collection.objects.link(container)
+    return container
 
 
 def find_triangle_strip_meshes(mdb):
@@ -646,9 +942,220 @@ def find_triangle_strip_meshes(mdb):
     ]
 
 
-# Main function
-def load(operator, context, filepath='', **kwargs):
-    del kwargs
+# Tagged data an import creates, in a safe removal order for rolling back an
+# interrupted import (users before the data they reference).
+ROLLBACK_COLLECTIONS = (
+    'objects',
+    'meshes',
+    'armatures',
+    'materials',
+)
+
+
+def remove_import_data_blocks(source_ids, created):
+    """Remove the data-blocks created by the imports with ``source_ids``.
+
+    Objects, meshes, armatures and materials are found by their source tag;
+    ``created`` lists the untagged images and texts the imports added. Data
+    created by anyone else in the meantime is left alone. Node groups stay:
+    the shader cache reuses them across imports.
+    """
+    source_ids = set(source_ids)
+    for name in ROLLBACK_COLLECTIONS:
+        tagged = [
+            data_block for data_block in getattr(bpy.data, name)
+            if data_block.get(SOURCE_ID_PROPERTY) in source_ids
+        ]
+        if tagged:
+            bpy.data.batch_remove(tagged)
+    pointers = {data_block.as_pointer() for data_block in created}
+    remaining = [
+        data_block
+        for name in ('images', 'texts')
+        for data_block in getattr(bpy.data, name)
+        if data_block.as_pointer() in pointers
+    ]
+    if remaining:
+        bpy.data.batch_remove(remaining)
+    created.clear()
+
+
+class ImportJob:
+    """Build the Blender data for one parsed MDB in small resumable steps.
+
+    Each step creates one material, the armature, or one mesh object, so a
+    modal operator can interleave a long import with UI event handling and
+    roll it back if the user cancels.
+    """
+
+    def __init__(
+        self,
+        mdb,
+        filepath,
+        settings,
+        collection,
+        view_layer,
+        recorder=None,
+    ):
+        self.mdb = mdb
+        self.filepath = filepath
+        self.settings = settings
+        self.collection = collection
+        self.view_layer = view_layer
+        self.source_id = uuid.uuid4().hex
+        self.source_path = os.path.abspath(filepath)
+        self.recorder = recorder or Recorder('MDB import', filepath)
+        self.materials = []
+        self.armature_object = None
+        self.containers = []
+        self.mesh_objects = []
+        self.completed = 0
+        self.build_materials = settings.content != IMPORT_CONTENT_ARMATURE
+        self.build_armature = settings.content != IMPORT_CONTENT_MATERIALS
+        self.build_meshes = settings.content == IMPORT_CONTENT_ALL
+        self.total = 0
+        if self.build_materials:
+            self.total += len(mdb['materials'])
+        if self.build_armature:
+            self.total += 1
+        if self.build_meshes:
+            self.total += sum(
+                len(self.mesh_batches(mdb_object))
+                for mdb_object in mdb['objects']
+            )
+        # Untagged images and texts this job added, for rollback
+        self.created = []
+        self.steps = self.iter_steps()
+
+    def iter_steps(self):
+        if self.build_materials:
+            yield from self.iter_material_steps()
+        if not self.build_armature:
+            # Without an armature the table has no shared home, so keep the
+            # legacy per-material copy. Nothing uses these materials yet, so
+            # a fake user keeps them when the .blend is saved.
+            encoded_table = json.dumps(self.mdb['textures'])
+            for material in self.materials:
+                material[TEXTURE_TABLE_PROPERTY] = encoded_table
+                material.use_fake_user = True
+            return
+
+        # A batch import may already have built the armature, sharing one
+        # Edit Mode switch between all files.
+        if self.armature_object is None:
+            with self.recorder.span('armature'):
+                self.armature_object = create_armature(
+                    self.mdb,
+                    self.filepath,
+                    self.collection,
+                    self.source_id,
+                    self.source_path,
+                )
+                self.recorder.count('bones', len(self.mdb['bones']))
+        yield
+
+        if self.build_meshes:
+            yield from self.iter_mesh_steps()
+
+    def iter_material_steps(self):
+        with self.recorder.span('materials'):
+            ensure_normal_unswizzle_group()
+        texture_cache = {}
+        for mdb_material in self.mdb['materials']:
+            with self.recorder.span('materials'):
+                self.materials.append(create_material(
+                    self.mdb,
+                    mdb_material,
+                    self.filepath,
+                    texture_cache,
+                    self.settings.ignore_errors,
+                    self.source_id,
+                    self.source_path,
+                    self.settings.texture_mode,
+                    self.settings.preview_tier,
+                    self.created,
+                ))
+                self.recorder.count('materials')
+            yield
+
+    def mesh_batches(self, mdb_object):
+        """Group an MDB object's meshes into the Blender meshes to create."""
+        meshes = mdb_object['meshes']
+        if self.settings.merge_meshes and len(meshes) > 1:
+            return [meshes]
+        return [[mdb_mesh] for mdb_mesh in meshes]
+
+    def iter_mesh_steps(self):
+        shared_meshes = {} if self.settings.share_meshes else None
+        for mdb_object in self.mdb['objects']:
+            with self.recorder.span('meshes'):
+                container = create_container(
+                    self.collection,
+                    mdb_object,
+                    self.source_id,
+                    self.source_path,
+                )
+            self.containers.append(container)
+            for mdb_meshes in self.mesh_batches(mdb_object):
+                with self.recorder.span('meshes'):
+                    mesh_object = create_mesh_object(
+                        self.collection,
+                        self.mdb,
+                        mdb_object,
+                        mdb_meshes,
+                        self.materials,
+                        self.armature_object,
+                        container,
+                        self.source_id,
+                        self.source_path,
+                        shared_meshes,
+                        self.settings.weld_seams,
+                        self.settings.skin_attributes,
+                    )
+                    mesh = mesh_object.data
+                    self.recorder.count('objects')
+                    self.recorder.count('vertices', len(mesh.vertices))
+                    self.recorder.count('loops', len(mesh.loops))
+                self.mesh_objects.append(mesh_object)
+                yield
+
+    def step(self):
+        """Perform one unit of work. Return True once nothing is left."""
+        try:
+            next(self.steps)
+        except StopIteration:
+            return True
+        self.completed += 1
+        return False
+
+    def run_for(self, seconds):
+        """Work until the time slice is used up. Return True when done."""
+        deadline = time.perf_counter() + seconds
+        while not self.step():
+            if time.perf_counter() >= deadline:
+                return False
+        return True
+
+    def run(self):
+        while not self.step():
+            pass
+
+    def finish(self):
+        if self.armature_object is None:
+            return
+        self.view_layer.objects.active = self.armature_object
+        self.armature_object.select_set(True)
+
+    def rollback(self):
+        """Remove the data-blocks this job created."""
+        self.steps.close()
+        # A failure while building bones can leave the armature in Edit Mode.
+        if bpy.context.mode != 'OBJECT' and bpy.ops.object.mode_set.poll():
+            bpy.ops.object.mode_set(mode='OBJECT')
+        remove_import_data_blocks([self.source_id], self.created)
+
+
+def read_import_settings(operator):
     # Blender 5.2 can invoke file-import operators without materializing
     # optional RNA properties.  Preserve their normal defaults in that case.
     if bpy.app.version >= (5, 2, 0):
@@ -657,66 +1164,188 @@ def load(operator, context, filepath='', **kwargs):
     else:
         ignore_errors = operator.option_ignore_errors
         override_version = operator.option_override_version
-    settings = ImportSettings(
+    return ImportSettings(
         ignore_errors=ignore_errors,
         override_version=override_version,
+        share_meshes=getattr(operator, 'option_share_meshes', False),
+        weld_seams=getattr(operator, 'option_weld_seams', False),
+        texture_mode=getattr(
+            operator,
+            'option_texture_mode',
+            TEXTURE_MODE_EAGER,
+        ),
+        preview_tier=getattr(operator, 'option_shader_preview', PREVIEW_FULL),
+        content=getattr(operator, 'option_import_content', IMPORT_CONTENT_ALL),
+        merge_meshes=getattr(operator, 'option_merge_meshes', False),
+        skin_attributes=getattr(operator, 'option_skin_attributes', False),
     )
-    try:
-        with open(filepath, 'rb') as stream:
-            mdb = parse_mdb(
-                stream,
-                override_version=settings.override_version,
-            )
-    except (OSError, MdbFormatError) as error:
-        if hasattr(operator, 'report'):
-            operator.report({'ERROR'}, str(error))
-        print(f'ERROR: {error}')
-        return {'CANCELLED'}
 
-    triangle_strips = find_triangle_strip_meshes(mdb)
+
+def report_import_error(operator, message):
+    if hasattr(operator, 'report'):
+        operator.report({'ERROR'}, message)
+    print(f'ERROR: {message}')
+
+
+def read_mdb_for_import(filepath, settings, recorder=None):
+    """Parse ``filepath`` for import with ``settings``.
+
+    Raises ``OSError`` or ``MdbFormatError`` when the file cannot be imported,
+    before any Blender data is created.
+    """
+    recorder = recorder or Recorder('MDB parse', filepath)
+    with recorder.span('parse'), open(filepath, 'rb') as stream:
+        mdb = parse_mdb(
+            stream,
+            override_version=settings.override_version,
+            include_geometry=settings.content == IMPORT_CONTENT_ALL,
+            payload_digests=settings.share_meshes,
+        )
+        recorder.count('bytes', os.fstat(stream.fileno()).st_size)
+
+    triangle_strips = (
+        find_triangle_strip_meshes(mdb)
+        if settings.content == IMPORT_CONTENT_ALL
+        else []
+    )
     if triangle_strips:
-        message = (
+        raise MdbFormatError(
             'Triangle-strip MDB meshes are recognized but not currently '
             'supported. Import was cancelled before creating Blender data to '
             'avoid producing incorrect geometry. A verified source file is '
             'needed before enabling strip conversion. Found: '
             + '; '.join(triangle_strips[:8])
         )
-        if hasattr(operator, 'report'):
-            operator.report({'ERROR'}, message)
-        print(f'ERROR: {message}')
-        return {'CANCELLED'}
+    return mdb
+
+
+def begin_import(operator, context, filepath='', **kwargs):
+    """Parse and validate an MDB, returning an ``ImportJob`` or ``None``."""
+    del kwargs
+    settings = read_import_settings(operator)
+    recorder = Recorder('MDB import', filepath)
+    try:
+        mdb = read_mdb_for_import(filepath, settings, recorder)
+    except (OSError, MdbFormatError) as error:
+        report_import_error(operator, str(error))
+        return None
 
     if bpy.ops.object.mode_set.poll():
         bpy.ops.object.mode_set(mode="OBJECT")
 
-    source_id = uuid.uuid4().hex
-    source_path = os.path.abspath(filepath)
-    ensure_normal_unswizzle_group()
-    materials = create_materials(
+    return ImportJob(
         mdb,
         filepath,
-        settings.ignore_errors,
-        source_id,
-        source_path,
+        settings,
+        context.scene.collection,
+        context.view_layer,
+        recorder,
     )
 
-    armature_obj = create_armature(
-        mdb,
-        filepath,
-        context,
-        source_id,
-        source_path,
-    )
 
-    create_mesh_objects(
-        context,
-        mdb,
-        materials,
-        armature_obj,
-        source_id,
-        source_path,
-    )
-    context.view_layer.objects.active = armature_obj
-    armature_obj.select_set(True)
+@dataclass
+class ImportResult:
+    """The data-blocks created by one scripted MDB import."""
+
+    source_id: str
+    armature_object: object = None
+    materials: list = field(default_factory=list)
+    containers: list = field(default_factory=list)
+    mesh_objects: list = field(default_factory=list)
+    timings: dict = field(default_factory=dict)
+
+
+def import_settings_from(options):
+    if options is None:
+        return ImportSettings()
+    if isinstance(options, ImportSettings):
+        return options
+    return replace(ImportSettings(), **options)
+
+
+def import_mdb_files(filepaths, collection=None, options=None):
+    """Import several MDB files without operators or UI context changes.
+
+    ``options`` is an ``ImportSettings``, a mapping of its field names, or
+    ``None`` for the defaults. Every file is parsed before any data is created
+    and all armatures share one Edit Mode switch. The active object, selection
+    and mode of the caller are left alone. Returns one ``ImportResult`` per
+    file, in order. Raises ``OSError`` or ``MdbFormatError`` if a file cannot
+    be imported; data created by a failed call is removed again.
+    """
+    settings = import_settings_from(options)
+    context = bpy.context
+    if collection is None:
+        collection = context.scene.collection
+    parsed = []
+    for filepath in filepaths:
+        recorder = Recorder('MDB import', filepath)
+        parsed.append(
+            (filepath, read_mdb_for_import(filepath, settings, recorder), recorder),
+        )
+
+    jobs = []
+    try:
+        jobs += [
+            ImportJob(
+                mdb,
+                filepath,
+                settings,
+                collection,
+                context.view_layer,
+                recorder,
+            )
+            for filepath, mdb, recorder in parsed
+        ]
+        for job in jobs:
+            if job.build_armature:
+                job.armature_object = create_armature_object(
+                    job.mdb,
+                    job.filepath,
+                    collection,
+                    job.source_id,
+                    job.source_path,
+                )
+        built = [job for job in jobs if job.armature_object is not None]
+        with armature_edit_mode(
+            [job.armature_object for job in built],
+            context,
+        ):
+            for job in built:
+                create_armature_bones(job.armature_object.data, job.mdb['bones'])
+        for job in jobs:
+            job.run()
+    except BaseException:
+        remove_import_data_blocks(
+            [job.source_id for job in jobs],
+            [data_block for job in jobs for data_block in job.created],
+        )
+        raise
+
+    return [
+        ImportResult(
+            source_id=job.source_id,
+            armature_object=job.armature_object,
+            materials=list(job.materials),
+            containers=list(job.containers),
+            mesh_objects=list(job.mesh_objects),
+            timings=job.recorder.as_dict(),
+        )
+        for job in jobs
+    ]
+
+
+def import_mdb_file(filepath, collection=None, options=None):
+    """Import one MDB file from a script. See ``import_mdb_files``."""
+    return import_mdb_files([filepath], collection, options)[0]
+
+
+# Main function
+def load(operator, context, filepath='', **kwargs):
+    job = begin_import(operator, context, filepath, **kwargs)
+    if job is None:
+        return {'CANCELLED'}
+    job.run()
+    job.finish()
+    job.recorder.report()
     return {'FINISHED'}
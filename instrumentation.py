@@ -0,0 +1,137 @@
+"""Stage timings and counts for the import and export operators.
+
+Operators record nested spans such as parse, materials or serialization on a
+``Recorder`` and report the tree when they finish. Spans with the same name
+under the same parent are merged, so a stage that runs once per mesh shows its
+total time and call count. Counts such as vertices or bytes written belong to
+the span that is open when they are added.
+
+Used as a context manager, the recorder prints the tree to the console when
+the operation finishes; runs that raise or are cancelled print nothing. Set
+the environment variable ``EDF_TIMING_JSON`` to a directory to also write
+every report there as JSON. This module does not import bpy.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+TIMING_JSON_ENVIRONMENT = 'EDF_TIMING_JSON'
+
+
+class Span:
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.counts = {}
+        self.children = {}
+
+    def child(self, name):
+        span = self.children.get(name)
+        if span is None:
+            span = self.children[name] = Span(name)
+        return span
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'seconds': self.seconds,
+            'calls': self.calls,
+            'counts': dict(self.counts),
+            'children': [child.as_dict() for child in self.children.values()],
+        }
+
+
+class Recorder:
+    """Collect a timing tree for one operator run."""
+
+    def __init__(self, operation, filepath=''):
+        self.operation = operation
+        self.filepath = filepath
+        self.root = Span(operation)
+        self.root.calls = 1
+        self.started = time.perf_counter()
+        self.stack = [self.root]
+        self.cancelled = False
+
+    @contextmanager
+    def span(self, name):
+        span = self.stack[-1].child(name)
+        self.stack.append(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds += time.perf_counter() - started
+            span.calls += 1
+            self.stack.pop()
+
+    def count(self, name, amount=1):
+        counts = self.stack[-1].counts
+        counts[name] = counts.get(name, 0) + amount
+
+    def as_dict(self):
+        self.root.seconds = time.perf_counter() - self.started
+        return {
+            'operation': self.operation,
+            'filepath': self.filepath,
+            'timings': self.root.as_dict(),
+        }
+
+    def format_lines(self):
+        report = self.as_dict()['timings']
+        lines = []
+
+        def add(span, depth):
+            counts = ''.join(
+                f', {name}={value}' for name, value in span['counts'].items()
+            )
+            calls = f' x{span["calls"]}' if span['calls'] > 1 else ''
+            lines.append(
+                f"{'  ' * depth}{span['name']}: {span['seconds']:.3f}s"
+                f'{calls}{counts}'
+            )
+            for child in span['children']:
+                add(child, depth + 1)
+
+        add(report, 0)
+        return lines
+
+    def write_json(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(self.filepath))[0] or 'untitled'
+        operation = self.operation.lower().replace(' ', '_')
+        path = os.path.join(
+            directory,
+            f'{operation}_{stem}_{time.strftime("%Y%m%d-%H%M%S")}.json',
+        )
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(self.as_dict(), stream, indent=2)
+        return path
+
+    def report(self):
+        """Print the timing tree and write it as JSON when requested."""
+        for line in self.format_lines():
+            print(f'TIMING: {line}')
+        directory = os.environ.get(TIMING_JSON_ENVIRONMENT)
+        if directory:
+            path = self.write_json(directory)
+            print(f'TIMING: written to {path}')
+            return path
+        return None
+
+    def finish(self, result):
+        """Return the operator ``result``, noting whether it was cancelled."""
+        self.cancelled = result == {'CANCELLED'}
+        return result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and not self.cancelled:
+            self.report()
+        return False
@@ -15,6 +15,20 @@ SUPPORTED_VERSIONS = (EDF5_VERSION, EDF6_VERSION)
 
 SOURCE_ID_PROPERTY = 'mdb_source_id'
 SOURCE_PATH_PROPERTY = 'mdb_source_path'
+# JSON copy of the complete MDB texture table, stored once per import on the
+# armature object. Imports made before that stored it on every material.
+TEXTURE_TABLE_PROPERTY = 'mdb_texture_table'
+# Merged imports keep all MDB meshes of one object in a single Blender mesh
+# with one material slot each. The face attribute keeps the MDB mesh order.
+MERGED_MESHES_PROPERTY = 'mdb_merged_meshes'
+MERGED_UV_CHANNELS_PROPERTY = 'mdb_merged_uv_channels'
+MESH_INDEX_ATTRIBUTE = 'mdb_mesh_index'
+# Skin-attribute imports keep BLENDINDICES/BLENDWEIGHT as point attributes
+# instead of vertex groups. The four 8-bit indices are packed into one INT and
+# refer to the bone names stored on the mesh.
+SKIN_INDICES_ATTRIBUTE = 'mdb_blend_indices'
+SKIN_WEIGHTS_ATTRIBUTE = 'mdb_blend_weights'
+SKIN_BONES_PROPERTY = 'mdb_blend_bone_names'
 
 NAME_RECORD_SIZE = 0x04
 BONE_RECORD_SIZE = 0xC0
@@ -52,7 +66,6 @@ MATERIAL_METADATA_PROPERTIES = (
     'mdb_material_index',
     'mdb_name',
     'mdb_shader_name',
-    'mdb_texture_table',
     'draw_priority',
     'render_queue_class',
     'render_participation_flags',
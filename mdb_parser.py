@@ -4,6 +4,8 @@ The parser produces plain dictionaries and has no ``bpy`` dependency. Blender
 scene construction belongs in ``import_mdb``.
 """
 
+import hashlib
+
 import mathutils
 import numpy as np
 
@@ -313,7 +315,34 @@ def parse_vertices(stream, count, offset, layout, vertex_stride):
     return vertices
 
 
-def parse_meshes(stream, count, offset):
+def mesh_payload_digest(stream, layout, vertex_stride, blocks):
+    """Fingerprint a mesh's vertex layout and raw vertex/index bytes.
+
+    Meshes with equal digests decode to identical geometry, which lets the
+    importer share one Blender mesh between repeated props and parts.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for element in layout:
+        digest.update(repr((
+            element['type'],
+            element['offset'],
+            element['channel'],
+            element['name'],
+        )).encode('ascii', 'backslashreplace'))
+    digest.update(vertex_stride.to_bytes(2, 'little'))
+    for block_offset, block_size in blocks:
+        stream.seek(block_offset)
+        digest.update(read_exact(stream, block_size, 'mesh payload'))
+    return digest.hexdigest()
+
+
+def parse_meshes(
+    stream,
+    count,
+    offset,
+    include_geometry=True,
+    payload_digests=False,
+):
     meshes = []
     stream.seek(offset)
     for _ in range(count):
@@ -354,6 +383,10 @@ def parse_meshes(stream, count, offset):
             layout_count,
             record_start + layout_offset,
         )
+        if not include_geometry:
+            stream.seek(next_record)
+            meshes.append(mesh)
+            continue
         mesh['indices'] = parse_indices(
             stream,
             index_count,
@@ -366,12 +399,32 @@ def parse_meshes(stream, count, offset):
             mesh['layout'],
             mesh['vertex_stride'],
         )
+        if payload_digests:
+            mesh['payload_digest'] = mesh_payload_digest(
+                stream,
+                mesh['layout'],
+                mesh['vertex_stride'],
+                (
+                    (
+                        record_start + vertex_offset,
+                        vertex_count * mesh['vertex_stride'],
+                    ),
+                    (record_start + index_offset, index_count * 2),
+                ),
+            )
         stream.seek(next_record)
         meshes.append(mesh)
     return meshes
 
 
-def parse_objects(stream, count, offset, name_table):
+def parse_objects(
+    stream,
+    count,
+    offset,
+    name_table,
+    include_geometry=True,
+    payload_digests=False,
+):
     objects = []
     stream.seek(offset)
     for _ in range(count):
@@ -392,13 +445,27 @@ def parse_objects(stream, count, offset, name_table):
             stream,
             mesh_count,
             record_start + mesh_offset,
+            include_geometry,
+            payload_digests,
         )
         stream.seek(next_record)
         objects.append(object_data)
     return objects
 
 
-def parse_mdb(stream, override_version=0):
+def parse_mdb(
+    stream,
+    override_version=0,
+    include_geometry=True,
+    payload_digests=False,
+):
+    """Parse a complete MDB file into plain records.
+
+    With ``include_geometry`` false, mesh records keep their header fields
+    and vertex layout but their vertices and indices are not decoded. With
+    ``payload_digests`` true, decoded meshes also get a ``payload_digest``
+    of their raw vertex and index bytes.
+    """
     stream.seek(0)
     magic = read_exact(stream, 4, 'MDB magic')
     file_version = read_uint(stream)
@@ -441,5 +508,7 @@ def parse_mdb(stream, override_version=0):
             object_count,
             object_offset,
             names,
+            include_geometry,
+            payload_digests,
         ),
     }
@@ -0,0 +1,323 @@
+"""Blender tools for working with imported MDB models after import."""
+
+import json
+import os
+
+import bpy
+
+from .export_mdb import find_mdb_shader_node, read_skin_attributes, source_id_of
+from .mdb_format import (
+    SKIN_BONES_PROPERTY,
+    SKIN_INDICES_ATTRIBUTE,
+    SKIN_WEIGHTS_ATTRIBUTE,
+    SOURCE_PATH_PROPERTY,
+)
+from .shader import PREVIEW_FULL, PREVIEW_TIER_PROPERTY, get_shader
+from .texture_resolver import (
+    TEXTURE_SOURCE_PROPERTY,
+    configure_texture_image,
+    is_stand_in_image,
+    load_image,
+    resolve_texture_path,
+)
+
+
+def selected_source_ids(context):
+    return {
+        source_id
+        for source_id in (
+            source_id_of(obj)
+            for obj in getattr(context, 'selected_objects', ())
+        )
+        if source_id
+    }
+
+
+def iter_source_materials(source_ids):
+    for material in bpy.data.materials:
+        if source_id_of(material) in source_ids:
+            yield material
+
+
+def selected_mdb_materials(context):
+    """Materials of the selected meshes, or of every selected model."""
+    materials = []
+    for obj in getattr(context, 'selected_objects', ()):
+        if obj.type == 'MESH':
+            candidates = [slot.material for slot in obj.material_slots]
+        else:
+            source_id = source_id_of(obj)
+            candidates = iter_source_materials({source_id}) if source_id else ()
+        for material in candidates:
+            if (
+                material is not None
+                and material not in materials
+                and 'mdb_shader_name' in material
+            ):
+                materials.append(material)
+    return materials
+
+
+def iter_mdb_texture_nodes(material):
+    if material.node_tree is None:
+        return
+    for node in material.node_tree.nodes:
+        if node.type == 'TEX_IMAGE' and 'mdb_texture_filename' in node:
+            yield node
+
+
+def full_resolution_path(material, texture_node):
+    image = texture_node.image
+    if image is not None:
+        source_path = image.get(TEXTURE_SOURCE_PROPERTY)
+        if source_path and os.path.isfile(source_path):
+            return source_path
+    model_path = material.get(SOURCE_PATH_PROPERTY)
+    if not model_path:
+        return None
+    return resolve_texture_path(model_path, texture_node['mdb_texture_filename'])
+
+
+def load_full_resolution_textures(source_ids):
+    """Swap placeholders, proxies and missing images for the real textures.
+
+    Returns the number of texture nodes updated and the filenames that could
+    not be found or loaded.
+    """
+    updated = 0
+    missing = set()
+    replaced = set()
+    for material in iter_source_materials(source_ids):
+        for texture_node in iter_mdb_texture_nodes(material):
+            image = texture_node.image
+            if image is not None and not is_stand_in_image(image):
+                continue
+            filename = texture_node['mdb_texture_filename']
+            texture_path = full_resolution_path(material, texture_node)
+            if texture_path is None:
+                missing.add(filename)
+                continue
+            try:
+                full_image = load_image(texture_path)
+            except RuntimeError:
+                missing.add(filename)
+                continue
+            configure_texture_image(full_image, texture_node['mdb_texture_slot'])
+            texture_node.image = full_image
+            if image is not None:
+                replaced.add(image.name)
+            updated += 1
+
+    for image_name in replaced:
+        image = bpy.data.images.get(image_name)
+        if image is not None and image.users == 0:
+            bpy.data.images.remove(image)
+    return updated, missing
+
+
+def shader_material_record(material, shader_node):
+    """Rebuild the parsed MDB material fields that a Shader is built from."""
+    texture_nodes = sorted(
+        iter_mdb_texture_nodes(material),
+        key=lambda node: node['mdb_texture_binding'],
+    )
+    return {
+        'params': json.loads(shader_node['mdb_parameters']),
+        'textures': [{'map': node['mdb_texture_slot']} for node in texture_nodes],
+        'render_queue_class': material.get('render_queue_class', 0),
+    }
+
+
+def upgrade_shader_preview(material, tier=PREVIEW_FULL):
+    """Rebuild the material's shader group at ``tier``.
+
+    Group input values are carried over by socket name, so the exported MDB
+    parameters do not change. Returns whether the material was rebuilt.
+    """
+    if material.node_tree is None:
+        return False
+    shader_node = find_mdb_shader_node(material)
+    if shader_node is None or shader_node.node_tree is None:
+        return False
+    old_tree = shader_node.node_tree
+    if old_tree.get(PREVIEW_TIER_PROPERTY, PREVIEW_FULL) == tier:
+        return False
+
+    shader = get_shader(
+        shader_node['mdb_shader_name'],
+        False,
+        shader_material_record(material, shader_node),
+        tier,
+    )
+    values = {
+        socket.name: (
+            tuple(socket.default_value)
+            if hasattr(socket.default_value, '__len__')
+            else socket.default_value
+        )
+        for socket in shader_node.inputs
+        if hasattr(socket, 'default_value')
+    }
+    shader_node.node_tree = shader.shader_tree
+    for socket in shader_node.inputs:
+        if socket.name in values and hasattr(socket, 'default_value'):
+            socket.default_value = values[socket.name]
+
+    if shader.has_alpha and material.blend_method == 'OPAQUE':
+        material.blend_method = 'HASHED'
+    if old_tree.users == 0:
+        bpy.data.node_groups.remove(old_tree)
+    return True
+
+
+def selected_skin_attribute_meshes(context):
+    meshes = []
+    for obj in getattr(context, 'selected_objects', ()):
+        if obj.type == 'MESH':
+            candidates = [obj]
+        else:
+            source_id = source_id_of(obj)
+            candidates = [
+                candidate for candidate in bpy.data.objects
+                if candidate.type == 'MESH' and source_id
+                and source_id_of(candidate) == source_id
+            ]
+        for candidate in candidates:
+            mesh = candidate.data
+            if SKIN_BONES_PROPERTY in mesh and mesh not in meshes:
+                meshes.append(mesh)
+    return meshes
+
+
+def convert_skin_attributes(mesh):
+    """Turn a skin-attribute mesh into vertex groups on every object using it.
+
+    The bone groups are created in MDB bone order, the same as a normal import,
+    and the raw attributes are removed afterwards. Returns whether the mesh was
+    converted.
+    """
+    skin = read_skin_attributes(mesh)
+    if skin is None:
+        return False
+    bone_names, indices, weights = skin
+    users = [obj for obj in bpy.data.objects if obj.data == mesh]
+    for obj in users:
+        for bone_name in bone_names:
+            if obj.vertex_groups.get(bone_name) is None:
+                obj.vertex_groups.new(name=bone_name)
+
+    # Weights live on the mesh, so adding them through one user is enough.
+    if users:
+        groups = users[0].vertex_groups
+        for vertex_index, bone_index in zip(*(weights > 0.0).nonzero()):
+            groups[bone_names[indices[vertex_index, bone_index]]].add(
+                [int(vertex_index)],
+                float(weights[vertex_index, bone_index]),
+                'ADD',
+            )
+
+    for name in (SKIN_INDICES_ATTRIBUTE, SKIN_WEIGHTS_ATTRIBUTE):
+        attribute = mesh.attributes.get(name)
+        if attribute is not None:
+            mesh.attributes.remove(attribute)
+    del mesh[SKIN_BONES_PROPERTY]
+    return True
+
+
+class EDF_OT_load_full_resolution_textures(bpy.types.Operator):
+    """Replace deferred placeholders and proxies of the selected MDB models with their full-resolution textures"""
+
+    bl_idname = "edf.load_full_resolution_textures"
+    bl_label = "Load Full-Resolution Textures"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(selected_source_ids(context))
+
+    def execute(self, context):
+        updated, missing = load_full_resolution_textures(
+            selected_source_ids(context),
+        )
+        if missing:
+            names = ", ".join(sorted(missing))
+            self.report(
+                {"WARNING"},
+                f"Loaded {updated} textures; could not find: {names}",
+            )
+        else:
+            self.report({"INFO"}, f"Loaded {updated} full-resolution textures")
+        return {"FINISHED"}
+
+
+class EDF_OT_build_full_shader_previews(bpy.types.Operator):
+    """Rebuild the shader previews of the selected MDB materials at full detail"""
+
+    bl_idname = "edf.build_full_shader_previews"
+    bl_label = "Build Full Shader Previews"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(selected_source_ids(context))
+
+    def execute(self, context):
+        upgraded = sum(
+            upgrade_shader_preview(material)
+            for material in selected_mdb_materials(context)
+        )
+        self.report({"INFO"}, f"Built full shader previews for {upgraded} materials")
+        return {"FINISHED"}
+
+
+class EDF_OT_convert_skin_attributes(bpy.types.Operator):
+    """Convert the raw skin attributes of the selected MDB meshes to vertex groups for weight painting and deformation"""
+
+    bl_idname = "edf.convert_skin_attributes"
+    bl_label = "Convert Skin to Vertex Groups"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(selected_skin_attribute_meshes(context))
+
+    def execute(self, context):
+        converted = sum(
+            convert_skin_attributes(mesh)
+            for mesh in selected_skin_attribute_meshes(context)
+        )
+        self.report({"INFO"}, f"Converted the skin of {converted} meshes")
+        return {"FINISHED"}
+
+
+class EDF_PT_mdb_tools(bpy.types.Panel):
+    bl_label = "EDF MDB"
+    bl_idname = "EDF_PT_mdb_tools"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "EDF"
+
+    def draw(self, context):
+        layout = self.layout
+        if not selected_source_ids(context):
+            layout.label(text="Select an imported MDB model.", icon="INFO")
+        layout.operator(
+            EDF_OT_load_full_resolution_textures.bl_idname,
+            icon="TEXTURE",
+        )
+        layout.operator(
+            EDF_OT_build_full_shader_previews.bl_idname,
+            icon="NODE_MATERIAL",
+        )
+        layout.operator(
+            EDF_OT_convert_skin_attributes.bl_idname,
+            icon="GROUP_VERTEX",
+        )
+
+
+CLASSES = (
+    EDF_OT_load_full_resolution_textures,
+    EDF_OT_build_full_shader_previews,
+    EDF_OT_convert_skin_attributes,
+    EDF_PT_mdb_tools,
+)
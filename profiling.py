@@ -0,0 +1,100 @@
+"""Opt-in cProfile and tracemalloc capture for the import and export operators.
+
+Enable **Profile Imports and Exports** in the add-on preferences, or set the
+environment variable ``EDF_PROFILE=1`` before starting Blender. Each operator
+run then writes a ``.prof`` file for ``pstats``/snakeviz and a text summary
+with the slowest functions, the peak traced memory and the largest
+allocations, next to the file that was imported or exported. When neither is
+set the operators run untouched.
+
+This module does not import bpy.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+PROFILE_ENVIRONMENT = 'EDF_PROFILE'
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+TRACEBACK_FRAMES = 1
+
+
+def profiling_requested(preference=False):
+    if preference:
+        return True
+    return os.environ.get(PROFILE_ENVIRONMENT, '').strip().lower() not in (
+        '',
+        '0',
+        'false',
+        'no',
+        'off',
+    )
+
+
+def profile_base_path(filepath, name):
+    """Name the outputs after ``filepath``, falling back to the temp folder."""
+    stem = os.path.basename(filepath) or 'untitled'
+    label = f'{stem}.{name.lower().replace(" ", "_")}.{time.strftime("%Y%m%d-%H%M%S")}'
+    directory = os.path.dirname(os.path.abspath(filepath)) if filepath else ''
+    if not directory or not os.access(directory, os.W_OK):
+        directory = tempfile.gettempdir()
+    return os.path.join(directory, label)
+
+
+def format_summary(name, profile, snapshot, peak, seconds):
+    lines = [
+        f'{name}: {seconds:.3f}s',
+        f'Peak traced memory: {peak / (1024 * 1024):.1f} MiB',
+        '',
+        f'Top {TOP_ALLOCATIONS} allocations still alive at the end:',
+    ]
+    statistics = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    )).statistics('lineno')
+    for statistic in statistics[:TOP_ALLOCATIONS]:
+        frame = statistic.traceback[0]
+        lines.append(
+            f'  {statistic.size / 1024:10.1f} KiB {statistic.count:8d} blocks  '
+            f'{frame.filename}:{frame.lineno}'
+        )
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).sort_stats('cumulative').print_stats(
+        TOP_FUNCTIONS,
+    )
+    lines.extend(('', f'Top {TOP_FUNCTIONS} functions by cumulative time:'))
+    lines.append(output.getvalue())
+    return '\n'.join(lines)
+
+
+@contextmanager
+def profiled(name, filepath):
+    """Profile the enclosed block and write the results beside ``filepath``."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(TRACEBACK_FRAMES)
+    tracemalloc.reset_peak()
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if not was_tracing:
+            tracemalloc.stop()
+        base_path = profile_base_path(filepath, name)
+        profile.dump_stats(base_path + '.prof')
+        with open(base_path + '.txt', 'w', encoding='utf-8') as stream:
+            stream.write(format_summary(name, profile, snapshot, peak, seconds))
+        print(f'PROFILE: {name} written to {base_path}.prof and .txt')
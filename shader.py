@@ -1,4 +1,6 @@
+import hashlib
 import re
+from collections import OrderedDict
 
 import bpy
 
@@ -54,7 +56,25 @@ UV_EXCEPTIONS = {
     ('snd_e616_Venus_Shield', 'light1_tex'): 1,
 }
 
-shader_cache = {}
+# How much of the preview network a Shader builds. Every tier creates the
+# same group sockets, so MDB parameters and texture bindings export the same
+# way; the tiers only differ in the Blender preview behind those sockets.
+PREVIEW_NONE = 'NONE'
+PREVIEW_BASIC = 'BASIC'
+PREVIEW_FULL = 'FULL'
+PREVIEW_TIER_PROPERTY = 'mdb_preview_tier'
+
+# Generated node groups are tagged with a hash of everything they are built
+# from, so later imports (and later sessions of the same .blend) can reuse a
+# group instead of regenerating it. Bump the version whenever the generated
+# preview network changes so stale groups are no longer matched.
+SHADER_GROUP_VERSION = 1
+SHADER_SIGNATURE_PROPERTY = 'mdb_shader_signature'
+HAS_ALPHA_PROPERTY = 'mdb_has_alpha'
+SHADER_CACHE_SIZE = 128
+
+# Signature -> Shader, least recently used first.
+shader_cache = OrderedDict()
 
 
 def new_socket(node_tree, name, in_out, socket_type):
@@ -179,9 +199,32 @@ def material_signature(material):
     return parameters, textures, material.get('render_queue_class', 0)
 
 
+def shader_signature(shader_name, material, tier):
+    key = repr((
+        SHADER_GROUP_VERSION,
+        shader_name,
+        material_signature(material),
+        tier,
+    ))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def texture_param_map(shader_name, material):
+    param_map = {}
+    for texture in material['textures']:
+        name = texture['map']
+        uv_channel = infer_uv_channel(shader_name, name)
+        if uv_channel:
+            param_map[name] = (name, 'texture', uv_channel)
+        else:
+            param_map[name] = (name, 'texture')
+    return param_map
+
+
 class Shader:
-    def __init__(self, shader_name, material):
+    def __init__(self, shader_name, material, tier=PREVIEW_FULL, shader_tree=None):
         self.name = shader_name
+        self.tier = tier
         self.material = material or {'params': [], 'textures': [], 'render_queue_class': 0}
         self.parameters = {
             parameter['name']: parameter
@@ -191,12 +234,19 @@ class Shader:
             texture['map']
             for texture in self.material['textures']
         }
-        self.param_map = {}
+        self.param_map = texture_param_map(shader_name, self.material)
         self.split_map = {}
         self.packed_components = {}
         self.has_alpha = False
         self.facing = None
 
+        if shader_tree is not None:
+            # A group with a matching signature was built from the same
+            # schema, so only the Python-side mappings need recomputing.
+            self.shader_tree = shader_tree
+            self.has_alpha = bool(shader_tree.get(HAS_ALPHA_PROPERTY, False))
+            return
+
         shader_tree = bpy.data.node_groups.new(shader_name, 'ShaderNodeTree')
         self.shader_tree = shader_tree
         self.group_inputs = shader_tree.nodes.new('NodeGroupInput')
@@ -204,10 +254,20 @@ class Shader:
         self.group_outputs = shader_tree.nodes.new('NodeGroupOutput')
         self.group_outputs.location[0] = 500
         new_socket(shader_tree, 'Surface', 'OUTPUT', 'NodeSocketShader')
+        shader_tree[PREVIEW_TIER_PROPERTY] = tier
 
         self.ensure_material_schema()
-        self.map_packed_textures()
-        self.build_preview()
+        if tier == PREVIEW_FULL:
+            self.map_packed_textures()
+            self.build_preview()
+        elif tier == PREVIEW_BASIC:
+            self.build_basic_preview()
+        shader_tree[SHADER_SIGNATURE_PROPERTY] = shader_signature(
+            shader_name,
+            material,
+            tier,
+        )
+        shader_tree[HAS_ALPHA_PROPERTY] = self.has_alpha
 
         for node in shader_tree.nodes:
             node.select = False
@@ -232,11 +292,6 @@ class Shader:
             socket_type = 'NodeSocketVector' if 'normal' in name.lower() else 'NodeSocketColor'
             self.ensure_input(name, socket_type)
             self.ensure_input(name + '_alpha', 'NodeSocketFloat')
-            uv_channel = infer_uv_channel(self.name, name)
-            if uv_channel:
-                self.param_map[name] = (name, 'texture', uv_channel)
-            else:
-                self.param_map[name] = (name, 'texture')
 
     def ensure_input(self, name, socket_type):
         if self.group_inputs.outputs.get(name) is None:
@@ -286,6 +341,19 @@ class Shader:
             specular_input = 'Specular' if IS_BPY_V3 else 'Specular IOR Level'
             self.shader_tree.links.new(bsdf.inputs[specular_input], specular)
 
+    def build_basic_preview(self):
+        bsdf = self.shader_tree.nodes.new('ShaderNodeBsdfPrincipled')
+        bsdf.location[0] = 250
+        self.shader_tree.links.new(self.group_outputs.inputs['Surface'], bsdf.outputs['BSDF'])
+
+        normal = self.input('normal') or self.input('damage_normal')
+        if normal is not None:
+            self.shader_tree.links.new(bsdf.inputs['Normal'], normal)
+
+        color = self.multiply_color(self.input('diffuse'), self.input('albedo'))
+        if color is not None:
+            self.shader_tree.links.new(bsdf.inputs['Base Color'], color)
+
     def build_base_color(self):
         diffuse = self.input('diffuse')
         albedo = self.input('albedo')
@@ -480,12 +548,23 @@ class Shader:
         return offset.outputs['Value']
 
 
-def get_shader(shader_name, option_ignore_errors, material=None):
+def find_shader_group(signature):
+    for node_group in bpy.data.node_groups:
+        if node_group.get(SHADER_SIGNATURE_PROPERTY) == signature:
+            return node_group
+    return None
+
+
+def get_shader(shader_name, option_ignore_errors, material=None, tier=PREVIEW_FULL):
     del option_ignore_errors  # Unknown shaders are safe now; all schemas come from MDB.
-    cache_key = (shader_name, material_signature(material))
-    shader = shader_cache.get(cache_key)
+    signature = shader_signature(shader_name, material, tier)
+    shader = shader_cache.get(signature)
     if shader is not None and not str(shader.shader_tree).endswith(' invalid>'):
+        shader_cache.move_to_end(signature)
         return shader
-    shader = Shader(shader_name, material)
-    shader_cache[cache_key] = shader
+    shader = Shader(shader_name, material, tier, find_shader_group(signature))
+    shader_cache[signature] = shader
+    shader_cache.move_to_end(signature)
+    while len(shader_cache) > SHADER_CACHE_SIZE:
+        shader_cache.popitem(last=False)
     return shader
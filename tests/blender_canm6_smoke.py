@@ -52,8 +52,8 @@ def assert_scale_action_round_trip(export_canm, import_canm):
         "speed_y": (1.00 - 0.98) / 65535.0,
         "speed_z": (1.06 - 0.56) / 65535.0,
         "keyframes": [
-            {"x": 0.0, "y": 0.0, "z": 0.0},
-            {"x": 65535.0, "y": 65535.0, "z": 65535.0},
+            (0.0, 0.0, 0.0),
+            (65535.0, 65535.0, 65535.0),
         ],
     }
     bone_animation = {
@@ -144,9 +144,9 @@ def assert_direct_curve_construction_matches_pose_insertion(
     ]
 
     vector_frames = [
-        {"x": 0.0, "y": 0.0, "z": 0.0},
-        {"x": 1.0, "y": 2.0, "z": 3.0},
-        {"x": 2.0, "y": 4.0, "z": 6.0},
+        (0.0, 0.0, 0.0),
+        (1.0, 2.0, 3.0),
+        (2.0, 4.0, 6.0),
     ]
     quaternion_frames = []
     for angle in (5.0, 25.0, 55.0):
@@ -154,12 +154,7 @@ def assert_direct_curve_construction_matches_pose_insertion(
             (0.2, 0.8, 0.4),
             math.radians(angle),
         )
-        quaternion_frames.append({
-            "x": value.x,
-            "y": value.y,
-            "z": value.z,
-            "w": value.w,
-        })
+        quaternion_frames.append((value.x, value.y, value.z, value.w))
     canm = {
         "anm_points": [
             {
@@ -421,31 +416,37 @@ def main():
     addon_root = Path(__file__).resolve().parents[1]
     load_addon(addon_root)
 
-    from _canm6_smoke import action_compat, export_canm, import_canm
+    from _canm6_smoke import (
+        action_compat,
+        canm_parser,
+        canm_writer,
+        export_canm,
+        import_canm,
+    )
 
     assert export_canm.calculate_frame_interval(12.0, 1) == 12.0
     assert export_canm.calculate_frame_interval(12.0, 4) == 4.0
-    assert export_canm.encode_channel_index(-1) == 0xFFFF
-    assert export_canm.encode_channel_index(0x8000) == 0x8000
-    assert export_canm.encode_channel_index(0xFFFE) == 0xFFFE
+    assert canm_writer.encode_channel_index(-1) == 0xFFFF
+    assert canm_writer.encode_channel_index(0x8000) == 0x8000
+    assert canm_writer.encode_channel_index(0xFFFE) == 0xFFFE
     for invalid_index in (-2, 0xFFFF):
         try:
-            export_canm.encode_channel_index(invalid_index)
+            canm_writer.encode_channel_index(invalid_index)
         except ValueError:
             pass
         else:
             raise AssertionError(
                 f"Invalid channel index {invalid_index} was accepted"
             )
-    export_canm.validate_channel_count([None] * 0xFFFF)
+    canm_writer.validate_channel_count([None] * 0xFFFF)
     try:
-        export_canm.validate_channel_count([None] * 0x10000)
+        canm_writer.validate_channel_count([None] * 0x10000)
     except ValueError:
         pass
     else:
         raise AssertionError("65,536 CANM channels were accepted")
     animation_bytes = io.BytesIO()
-    export_canm.write_animations(animation_bytes, [{
+    canm_writer.write_animations(animation_bytes, [{
         "loop": False,
         "duration": 4.0,
         "between_keyframes": 4.0,
@@ -475,7 +476,7 @@ def main():
                 "speed_x": 0.5,
                 "speed_y": 0.5,
                 "speed_z": 0.5,
-                "keyframes": [{"x": 2.0, "y": 4.0, "z": 6.0}],
+                "keyframes": [(2.0, 4.0, 6.0)],
             }],
         },
         {
@@ -530,9 +531,9 @@ def main():
         animated_rotation,
     )
     encoded = io.BytesIO()
-    export_canm.write_channels6(encoded, channels)
+    canm_writer.write_channels6(encoded, channels)
 
-    parsed = import_canm.parse_anm_point6(encoded, len(channels), 0)
+    parsed = canm_parser.parse_channels6(encoded.getvalue(), len(channels), 0)
     assert [channel["type"] for channel in parsed] == [0, 1, 2, 3]
     assert len(parsed[1]["keyframes"]) == 2
     assert len(parsed[3]["keyframes"]) == 2
@@ -545,8 +546,8 @@ def main():
     expected = animated_rotation["frames"][1]
     actual = parsed[3]["keyframes"][1]
     assert all(
-        math.isclose(actual[axis], expected[index], abs_tol=1e-7)
-        for index, axis in enumerate("xyzw")
+        math.isclose(actual[index], expected[index], abs_tol=1e-7)
+        for index in range(4)
     )
 
     print("EDF6 CANM channel round trip and quaternion alignment passed.")
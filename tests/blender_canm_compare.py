@@ -19,7 +19,6 @@ def load_addon(addon_root):
 
 
 def parse(import_canm, path):
-    import_canm.override_version = 0
     with path.open("rb") as stream:
         return import_canm.parse_canm(stream)
 
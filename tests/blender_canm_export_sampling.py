@@ -0,0 +1,102 @@
+"""Check the bulk CANM export sampler against FCurve.evaluate."""
+
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+
+def load_addon(addon_root):
+    package_name = "_canm_export_sampling"
+    spec = importlib.util.spec_from_file_location(
+        package_name,
+        addon_root / "__init__.py",
+        submodule_search_locations=[str(addon_root)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[package_name] = package
+    spec.loader.exec_module(package)
+    package.register()
+    return package
+
+
+def add_curve(action_compat, curves, index, keys):
+    curve = action_compat.new_fcurve(curves, "location", index=index)
+    for frame, value, interpolation in keys:
+        point = curve.keyframe_points.insert(frame, value)
+        point.interpolation = interpolation
+    curve.update()
+    return curve
+
+
+def main():
+    addon_root = Path(__file__).resolve().parents[1]
+    package = load_addon(addon_root)
+    export_canm = sys.modules[f"{package.__name__}.export_canm"]
+    action_compat = sys.modules[f"{package.__name__}.action_compat"]
+
+    try:
+        target = bpy.data.objects.new("CANM export sampling", None)
+        bpy.context.collection.objects.link(target)
+        target.animation_data_create()
+        action = bpy.data.actions.new("CANM export sampling")
+        target.animation_data.action = action
+        curves = action_compat.initialize_action_fcurves(action, target)
+
+        rng = random.Random(7)
+        frames = np.concatenate((
+            np.arange(-3, 140),
+            np.arange(-3, 140) + 0.005,
+            np.arange(-3, 140) + 0.37,
+        ))
+        keys = []
+        frame = 1.0
+        while frame < 120.0:
+            keys.append((
+                frame,
+                rng.uniform(-5.0, 5.0),
+                rng.choice(("LINEAR", "LINEAR", "CONSTANT")),
+            ))
+            frame += rng.choice((1.0, 1.0, 2.0, 3.5, 0.25))
+        mixed = add_curve(action_compat, curves, 0, keys)
+        single = add_curve(action_compat, curves, 1, [(4.0, 2.5, "LINEAR")])
+        for curve in (mixed, single):
+            expected = np.array(
+                [curve.evaluate(value) for value in frames.tolist()],
+                dtype=np.float32,
+            )
+            actual = export_canm.sample_keyframed_curve(curve, frames)
+            assert actual is not None
+            mismatched = np.flatnonzero(actual != expected)
+            assert not len(mismatched), [
+                (frames[index], actual[index], expected[index])
+                for index in mismatched[:10]
+            ]
+
+        bezier = add_curve(
+            action_compat,
+            curves,
+            2,
+            [(1.0, 0.0, "BEZIER"), (10.0, 1.0, "BEZIER")],
+        )
+        assert export_canm.sample_keyframed_curve(bezier, frames) is None
+        mixed.modifiers.new("NOISE")
+        assert export_canm.sample_keyframed_curve(mixed, frames) is None
+        single.extrapolation = "LINEAR"
+        assert export_canm.sample_keyframed_curve(single, frames) is None
+        samples = export_canm.sample_transform_curves(
+            [mixed, single, bezier],
+            120,
+            True,
+        )
+        assert len(samples) == 120
+        assert samples[9][2] == bezier.evaluate(10.0)
+    finally:
+        package.unregister()
+
+
+if __name__ == "__main__":
+    main()
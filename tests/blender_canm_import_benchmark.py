@@ -47,7 +47,6 @@ def main():
         filepath=str(mdb_path),
     ) == {"FINISHED"}
     mdb_imported = time.perf_counter()
-    import_canm.override_version = 0
     with canm_path.open("rb") as stream:
         canm = import_canm.parse_canm(stream)
     parsed = time.perf_counter()
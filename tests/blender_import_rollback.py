@@ -0,0 +1,87 @@
+"""Verify that a partially completed MDB import job rolls back cleanly."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import bpy
+
+
+def load_addon(addon_root):
+    package_name = "_mdb_import_rollback"
+    spec = importlib.util.spec_from_file_location(
+        package_name,
+        addon_root / "__init__.py",
+        submodule_search_locations=[str(addon_root)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[package_name] = package
+    spec.loader.exec_module(package)
+
+
+class ImportOptions:
+    option_ignore_errors = False
+    option_override_version = 0
+
+
+def data_block_counts():
+    return {
+        name: len(getattr(bpy.data, name))
+        for name in ("objects", "meshes", "armatures", "materials", "images")
+    }
+
+
+def main():
+    separator = sys.argv.index("--")
+    input_path = Path(sys.argv[separator + 1]).resolve()
+    addon_root = Path(__file__).resolve().parents[1]
+
+    load_addon(addon_root)
+    from _mdb_import_rollback import import_mdb
+
+    before = data_block_counts()
+    job = import_mdb.begin_import(
+        ImportOptions(),
+        bpy.context,
+        filepath=str(input_path),
+    )
+    assert job is not None
+    steps = min(job.total - 1, len(job.mdb["materials"]) + 2)
+    for _ in range(steps):
+        assert not job.step()
+    assert job.armature_object is not None
+    assert data_block_counts() != before
+    # The modal import keeps the UI responsive; data the user creates
+    # meanwhile must survive a cancel.
+    user_material = bpy.data.materials.new("created during import")
+    user_image = bpy.data.images.new("created during import", 4, 4)
+    user_object = bpy.data.objects.new("created during import", None)
+
+    job.rollback()
+    assert bpy.data.materials.get(user_material.name) == user_material
+    assert bpy.data.images.get(user_image.name) == user_image
+    assert bpy.data.objects.get(user_object.name) == user_object
+    bpy.data.objects.remove(user_object)
+    bpy.data.images.remove(user_image)
+    bpy.data.materials.remove(user_material)
+    assert data_block_counts() == before
+    assert bpy.context.mode == "OBJECT"
+
+    job = import_mdb.begin_import(
+        ImportOptions(),
+        bpy.context,
+        filepath=str(input_path),
+    )
+    while not job.run_for(0.01):
+        pass
+    job.finish()
+    assert job.completed == job.total
+    assert bpy.context.active_object == job.armature_object
+    print(
+        f"Rolled back a partial import after {steps} of {job.total} steps; "
+        "a complete time-sliced import finished normally."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Verify that merged imports re-split into the same MDB mesh records."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import bpy
+
+
+def load_addon(addon_root):
+    package_name = "_mdb_merged_meshes"
+    spec = importlib.util.spec_from_file_location(
+        package_name,
+        addon_root / "__init__.py",
+        submodule_search_locations=[str(addon_root)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[package_name] = package
+    spec.loader.exec_module(package)
+
+
+class ImportOptions:
+    option_ignore_errors = False
+    option_override_version = 0
+
+    def __init__(self, merge_meshes):
+        self.option_merge_meshes = merge_meshes
+
+
+def import_and_export(import_mdb, export_mdb, input_path, output_path, merge_meshes):
+    import_mdb.load(
+        ImportOptions(merge_meshes),
+        bpy.context,
+        filepath=str(input_path),
+    )
+    armature_object = bpy.context.active_object
+    mesh_objects = sum(
+        obj.type == "MESH" and obj.find_armature() == armature_object
+        for obj in bpy.data.objects
+    )
+    result = export_mdb.save(object(), bpy.context, filepath=str(output_path))
+    assert result == {"FINISHED"}
+    with output_path.open("rb") as exported:
+        reparsed = import_mdb.parse_mdb(exported)
+    exported_meshes = {
+        mdb_object["name"]: [
+            (mesh["material_index"], len(mesh["vertices"]), len(mesh["indices"]))
+            for mesh in mdb_object["meshes"]
+        ]
+        for mdb_object in reparsed["objects"]
+    }
+    return mesh_objects, exported_meshes
+
+
+def main():
+    separator = sys.argv.index("--")
+    input_path = Path(sys.argv[separator + 1]).resolve()
+    output_dir = Path(sys.argv[separator + 2]).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    addon_root = Path(__file__).resolve().parents[1]
+
+    load_addon(addon_root)
+    from _mdb_merged_meshes import export_mdb, import_mdb
+
+    separate_count, separate_export = import_and_export(
+        import_mdb,
+        export_mdb,
+        input_path,
+        output_dir / "separate.mdb",
+        False,
+    )
+    merged_count, merged_export = import_and_export(
+        import_mdb,
+        export_mdb,
+        input_path,
+        output_dir / "merged.mdb",
+        True,
+    )
+
+    assert merged_count <= separate_count
+    assert len(merged_export) == len(separate_export)
+    for name, meshes in separate_export.items():
+        assert sorted(merged_export[name]) == sorted(meshes), name
+    print(
+        f"Merged {separate_count} mesh objects into {merged_count}; "
+        "export wrote the same MDB mesh records."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Verify the scripted MDB import API without operator context changes."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import bpy
+
+
+def load_addon(addon_root):
+    package_name = "_mdb_scripted_import"
+    spec = importlib.util.spec_from_file_location(
+        package_name,
+        addon_root / "__init__.py",
+        submodule_search_locations=[str(addon_root)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[package_name] = package
+    spec.loader.exec_module(package)
+
+
+def main():
+    separator = sys.argv.index("--")
+    input_path = Path(sys.argv[separator + 1]).resolve()
+    addon_root = Path(__file__).resolve().parents[1]
+
+    load_addon(addon_root)
+    from _mdb_scripted_import import import_mdb
+
+    bystander = bpy.data.objects.new("Selected Bystander", None)
+    bpy.context.scene.collection.objects.link(bystander)
+    bystander.select_set(True)
+    bpy.context.view_layer.objects.active = bystander
+    active_before = bpy.context.view_layer.objects.active
+    selected_before = set(bpy.context.selected_objects)
+    expected_bones = len(
+        import_mdb.read_mdb_for_import(
+            str(input_path),
+            import_mdb.ImportSettings(),
+        )["bones"]
+    )
+    collection = bpy.data.collections.new("Scripted Import")
+    bpy.context.scene.collection.children.link(collection)
+
+    results = import_mdb.import_mdb_files(
+        [str(input_path), str(input_path)],
+        collection,
+        {"share_meshes": True},
+    )
+    assert len(results) == 2
+    assert results[0].source_id != results[1].source_id
+    for result in results:
+        armature_object = result.armature_object
+        assert armature_object.name in collection.objects
+        # Every armature of the batch must have entered Edit Mode.
+        assert len(armature_object.data.bones) == expected_bones, (
+            armature_object.name,
+            len(armature_object.data.bones),
+            expected_bones,
+        )
+        assert result.mesh_objects
+        for mesh_object in result.mesh_objects:
+            assert mesh_object.find_armature() == armature_object
+    assert bpy.context.mode == "OBJECT"
+    assert bpy.context.view_layer.objects.active == active_before
+    assert set(bpy.context.selected_objects) == selected_before
+
+    object_count = len(bpy.data.objects)
+    try:
+        import_mdb.import_mdb_file(str(input_path) + ".missing", collection)
+    except OSError:
+        pass
+    else:
+        raise AssertionError("missing file was imported")
+    assert len(bpy.data.objects) == object_count
+
+    edited_mesh = bpy.data.meshes.new("Edited Bystander")
+    edited_mesh.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+    edited = bpy.data.objects.new("Edited Bystander", edited_mesh)
+    bpy.context.scene.collection.objects.link(edited)
+    for obj in bpy.context.selected_objects:
+        obj.select_set(False)
+    edited.select_set(True)
+    bpy.context.view_layer.objects.active = edited
+    bpy.ops.object.mode_set(mode="EDIT")
+    assert bpy.context.mode == "EDIT_MESH"
+    edit_result = import_mdb.import_mdb_file(str(input_path), collection)
+    assert len(edit_result.armature_object.data.bones) == expected_bones
+    assert bpy.context.mode == "EDIT_MESH"
+    assert bpy.context.view_layer.objects.active == edited
+    assert set(bpy.context.selected_objects) == {edited}
+    bpy.ops.object.mode_set(mode="OBJECT")
+    object_count = len(bpy.data.objects)
+    print(f"Scripted import created {object_count} objects for three files.")
+
+
+if __name__ == "__main__":
+    main()
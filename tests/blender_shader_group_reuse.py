@@ -0,0 +1,57 @@
+"""Verify that re-imports reuse tagged shader node groups from bpy.data."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import bpy
+
+
+def load_addon(addon_root):
+    package_name = "_mdb_shader_reuse"
+    spec = importlib.util.spec_from_file_location(
+        package_name,
+        addon_root / "__init__.py",
+        submodule_search_locations=[str(addon_root)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[package_name] = package
+    spec.loader.exec_module(package)
+
+
+class ImportOptions:
+    option_ignore_errors = False
+    option_override_version = 0
+
+
+def main():
+    separator = sys.argv.index("--")
+    input_path = Path(sys.argv[separator + 1]).resolve()
+    addon_root = Path(__file__).resolve().parents[1]
+
+    load_addon(addon_root)
+    from _mdb_shader_reuse import import_mdb, shader
+
+    import_mdb.load(ImportOptions(), bpy.context, filepath=str(input_path))
+    tagged_groups = {
+        node_group.name
+        for node_group in bpy.data.node_groups
+        if node_group.get(shader.SHADER_SIGNATURE_PROPERTY)
+    }
+    assert tagged_groups
+
+    # Simulate a fresh session: only the signatures saved on the groups remain.
+    shader.shader_cache.clear()
+    group_count = len(bpy.data.node_groups)
+    import_mdb.load(ImportOptions(), bpy.context, filepath=str(input_path))
+    assert len(bpy.data.node_groups) == group_count
+
+    for material in bpy.data.materials:
+        for node in material.node_tree.nodes if material.node_tree else ():
+            if node.type == "GROUP" and "mdb_shader_name" in node:
+                assert node.node_tree.name in tagged_groups
+    print(f"Reused {len(tagged_groups)} shader node groups on re-import.")
+
+
+if __name__ == "__main__":
+    main()
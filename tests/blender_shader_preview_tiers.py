@@ -0,0 +1,64 @@
+"""Verify that reduced shader previews upgrade without changing the export."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import bpy
+
+
+def load_addon(addon_root):
+    package_name = "_mdb_preview_tiers"
+    spec = importlib.util.spec_from_file_location(
+        package_name,
+        addon_root / "__init__.py",
+        submodule_search_locations=[str(addon_root)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[package_name] = package
+    spec.loader.exec_module(package)
+
+
+class ImportOptions:
+    option_ignore_errors = False
+    option_override_version = 0
+    option_shader_preview = "NONE"
+
+
+def main():
+    separator = sys.argv.index("--")
+    input_path = Path(sys.argv[separator + 1]).resolve()
+    output_dir = Path(sys.argv[separator + 2]).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    addon_root = Path(__file__).resolve().parents[1]
+
+    load_addon(addon_root)
+    from _mdb_preview_tiers import export_mdb, import_mdb, mdb_tools, shader
+
+    import_mdb.load(ImportOptions(), bpy.context, filepath=str(input_path))
+    materials = [
+        material for material in bpy.data.materials
+        if material.get("mdb_shader_name")
+    ]
+    assert materials
+    for material in materials:
+        shader_node = export_mdb.find_mdb_shader_node(material)
+        assert shader_node.node_tree[shader.PREVIEW_TIER_PROPERTY] == "NONE"
+
+    before_path = output_dir / "preview_none.mdb"
+    after_path = output_dir / "preview_full.mdb"
+    assert export_mdb.save(object(), bpy.context, filepath=str(before_path)) == {"FINISHED"}
+
+    upgraded = sum(mdb_tools.upgrade_shader_preview(material) for material in materials)
+    assert upgraded == len(materials)
+    for material in materials:
+        shader_node = export_mdb.find_mdb_shader_node(material)
+        assert shader_node.node_tree[shader.PREVIEW_TIER_PROPERTY] == "FULL"
+
+    assert export_mdb.save(object(), bpy.context, filepath=str(after_path)) == {"FINISHED"}
+    assert before_path.read_bytes() == after_path.read_bytes()
+    print(f"Upgraded {upgraded} shader previews; export bytes are unchanged.")
+
+
+if __name__ == "__main__":
+    main()
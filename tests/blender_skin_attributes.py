@@ -0,0 +1,69 @@
+"""Verify that skin-attribute imports export the same bytes as vertex groups."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import bpy
+
+
+def load_addon(addon_root):
+    package_name = "_mdb_skin_attributes"
+    spec = importlib.util.spec_from_file_location(
+        package_name,
+        addon_root / "__init__.py",
+        submodule_search_locations=[str(addon_root)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[package_name] = package
+    spec.loader.exec_module(package)
+
+
+class ImportOptions:
+    option_ignore_errors = False
+    option_override_version = 0
+
+    def __init__(self, skin_attributes):
+        self.option_skin_attributes = skin_attributes
+
+
+def clear_scene():
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+
+
+def main():
+    separator = sys.argv.index("--")
+    input_path = Path(sys.argv[separator + 1]).resolve()
+    output_dir = Path(sys.argv[separator + 2]).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    addon_root = Path(__file__).resolve().parents[1]
+
+    load_addon(addon_root)
+    from _mdb_skin_attributes import export_mdb, import_mdb, mdb_tools
+
+    groups_path = output_dir / "vertex_groups.mdb"
+    import_mdb.load(ImportOptions(False), bpy.context, filepath=str(input_path))
+    assert export_mdb.save(object(), bpy.context, filepath=str(groups_path)) == {"FINISHED"}
+    clear_scene()
+
+    attributes_path = output_dir / "skin_attributes.mdb"
+    import_mdb.load(ImportOptions(True), bpy.context, filepath=str(input_path))
+    mesh_objects = [obj for obj in bpy.data.objects if obj.type == "MESH"]
+    assert all(not obj.vertex_groups for obj in mesh_objects)
+    assert export_mdb.save(object(), bpy.context, filepath=str(attributes_path)) == {"FINISHED"}
+    assert attributes_path.read_bytes() == groups_path.read_bytes()
+
+    converted_path = output_dir / "converted.mdb"
+    converted = sum(
+        mdb_tools.convert_skin_attributes(mesh)
+        for mesh in {obj.data for obj in mesh_objects}
+    )
+    assert converted
+    assert export_mdb.save(object(), bpy.context, filepath=str(converted_path)) == {"FINISHED"}
+    assert converted_path.read_bytes() == groups_path.read_bytes()
+    print(f"Converted {converted} skin-attribute meshes; export bytes are unchanged.")
+
+
+if __name__ == "__main__":
+    main()
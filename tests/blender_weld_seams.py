@@ -0,0 +1,88 @@
+"""Verify that welded imports export the same vertex counts as split imports."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import bpy
+
+
+def load_addon(addon_root):
+    package_name = "_mdb_weld_seams"
+    spec = importlib.util.spec_from_file_location(
+        package_name,
+        addon_root / "__init__.py",
+        submodule_search_locations=[str(addon_root)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[package_name] = package
+    spec.loader.exec_module(package)
+
+
+class ImportOptions:
+    option_ignore_errors = False
+    option_override_version = 0
+
+    def __init__(self, weld_seams):
+        self.option_weld_seams = weld_seams
+
+
+def import_and_export(import_mdb, export_mdb, input_path, output_path, weld_seams):
+    import_mdb.load(
+        ImportOptions(weld_seams),
+        bpy.context,
+        filepath=str(input_path),
+    )
+    armature_object = bpy.context.active_object
+    blender_vertices = sum(
+        len(obj.data.vertices)
+        for obj in bpy.data.objects
+        if obj.type == "MESH" and obj.find_armature() == armature_object
+    )
+    result = export_mdb.save(object(), bpy.context, filepath=str(output_path))
+    assert result == {"FINISHED"}
+    with output_path.open("rb") as exported:
+        reparsed = import_mdb.parse_mdb(exported)
+    exported_vertices = [
+        len(mesh["vertices"])
+        for mdb_object in reparsed["objects"]
+        for mesh in mdb_object["meshes"]
+    ]
+    return blender_vertices, exported_vertices
+
+
+def main():
+    separator = sys.argv.index("--")
+    input_path = Path(sys.argv[separator + 1]).resolve()
+    output_dir = Path(sys.argv[separator + 2]).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    addon_root = Path(__file__).resolve().parents[1]
+
+    load_addon(addon_root)
+    from _mdb_weld_seams import export_mdb, import_mdb
+
+    split_count, split_export = import_and_export(
+        import_mdb,
+        export_mdb,
+        input_path,
+        output_dir / "split.mdb",
+        False,
+    )
+    welded_count, welded_export = import_and_export(
+        import_mdb,
+        export_mdb,
+        input_path,
+        output_dir / "welded.mdb",
+        True,
+    )
+
+    assert welded_count <= split_count
+    assert welded_export == split_export, (split_export, welded_export)
+    print(
+        f"Welded {split_count} Blender vertices down to {welded_count}; "
+        f"export wrote {sum(welded_export)} vertices either way."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
+import contextlib
+import dataclasses
 import io
 import importlib.util
+import json
 import struct
+import os
 import sys
+import tempfile
 import types
 import unittest
 from pathlib import Path
@@ -34,9 +39,12 @@ def load_material_modules():
     ] if values is not None else [[0.0] * 4 for _ in range(4)]
     sys.modules.setdefault("mathutils", mathutils)
 
-    numpy = types.ModuleType("numpy")
-    numpy.half = object()
-    sys.modules.setdefault("numpy", numpy)
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        numpy = types.ModuleType("numpy")
+        numpy.half = object()
+        sys.modules["numpy"] = numpy
 
     package = types.ModuleType("_mdb_test_addon")
     package.__path__ = [str(ADDON_ROOT)]
@@ -47,6 +55,16 @@ def load_material_modules():
 
 
 IMPORT_MDB, EXPORT_MDB = load_material_modules()
+TEXTURE_RESOLVER = sys.modules["_mdb_test_addon.texture_resolver"]
+INSTRUMENTATION = sys.modules["_mdb_test_addon.instrumentation"]
+PROFILING = load_addon_module("profiling")
+NUMPY_AVAILABLE = hasattr(sys.modules["numpy"], "frombuffer")
+CANM_FORMAT = load_addon_module("canm_format")
+CANM_PARSER = load_addon_module("canm_parser") if NUMPY_AVAILABLE else None
+CANM_SAMPLING = load_addon_module("canm_sampling") if NUMPY_AVAILABLE else None
+
+sys.path.insert(0, str(ADDON_ROOT / "benchmarks"))
+import synthetic as SYNTHETIC  # noqa: E402
 
 
 def export_material(parsed_material):
@@ -91,6 +109,31 @@ def float_bits(values):
     return struct.pack(f"<{len(values)}f", *values)
 
 
+def rotation_matrix(axis, angle):
+    import numpy as np
+
+    cosine, sine = np.cos(angle), np.sin(angle)
+    first, second = [index for index in range(3) if index != axis]
+    matrix = np.identity(4)
+    matrix[first, first] = matrix[second, second] = cosine
+    matrix[first, second] = -sine
+    matrix[second, first] = sine
+    if axis == 1:
+        matrix[:3, :3] = matrix[:3, :3].T
+    return matrix
+
+
+def quaternion_matrix(quaternion):
+    import numpy as np
+
+    w, x, y, z = quaternion
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+        [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+        [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)],
+    ])
+
+
 def parse_fixture_materials(source):
     source.seek(8)
     name_count = IMPORT_MDB.read_uint(source)
@@ -265,6 +308,702 @@ class MdbRoundTripTests(unittest.TestCase):
         self.assertEqual(reparsed["vertex_stride"], 0)
         self.assertEqual(reparsed["mesh_index"], 3)
 
+    def test_identical_mesh_payloads_share_a_digest(self):
+        def mesh(mesh_index, positions):
+            return {
+                "is_skinned": 0,
+                "bone_influence_count": 0,
+                "material_index": mesh_index,
+                "vertex_stride": 12,
+                "layout_count": 1,
+                "vertex_count": len(positions),
+                "mesh_index": mesh_index,
+                "index_count": 3,
+                "indices": [0, 1, 2],
+                "vertex_layouts": [{
+                    "type": EXPORT_MDB.VERTEX_TYPE_FLOAT3,
+                    "offset": 0,
+                    "channel": 0,
+                    "name": "position",
+                    "data": positions,
+                }],
+            }
+
+        triangle = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)]
+        moved = [(0.0, 0.0, 0.0), (2.0, 0.0, 0.0), (0.0, 1.0, 0.0)]
+        object_data = {
+            "mesh_data": [mesh(0, triangle), mesh(1, triangle), mesh(2, moved)],
+        }
+        ascii_strings = []
+        encoded = io.BytesIO()
+        EXPORT_MDB.write_mesh_data(encoded, object_data, ascii_strings)
+        EXPORT_MDB.write_vertex_data(encoded, object_data)
+        EXPORT_MDB.write_ascii_string(encoded, ascii_strings)
+        encoded.seek(0)
+        first, second, third = IMPORT_MDB.parse_meshes(
+            encoded,
+            3,
+            0,
+            payload_digests=True,
+        )
+
+        self.assertEqual(first["payload_digest"], second["payload_digest"])
+        self.assertNotEqual(first["payload_digest"], third["payload_digest"])
+
+        encoded.seek(0)
+        headers = IMPORT_MDB.parse_meshes(encoded, 3, 0, include_geometry=False)
+        self.assertEqual([mesh["mesh_index"] for mesh in headers], [0, 1, 2])
+        self.assertEqual(len(headers[0]["layout"]), 1)
+        self.assertNotIn("vertices", headers[0])
+        self.assertNotIn("indices", headers[0])
+        self.assertNotIn("payload_digest", headers[0])
+
+        encoded.seek(0)
+        unshared = IMPORT_MDB.parse_meshes(encoded, 3, 0)
+        self.assertIn("vertices", unshared[0])
+        self.assertNotIn("payload_digest", unshared[0])
+
+    def test_merged_meshes_skip_empty_slots_and_keep_unassigned_ones(self):
+        class FakeData(dict):
+            pass
+
+        material = object()
+        mesh = FakeData({EXPORT_MDB.MERGED_UV_CHANNELS_PROPERTY: [1, 2, 0]})
+        mesh.materials = [material, None, material]
+        mesh.polygons = [
+            types.SimpleNamespace(index=0, material_index=1),
+            types.SimpleNamespace(index=1, material_index=0),
+        ]
+        mesh.attributes = {}
+
+        submeshes = list(EXPORT_MDB.iter_merged_submeshes(mesh))
+        self.assertEqual(
+            [(slot, [polygon.index for polygon in polygons], uv_channels)
+             for slot, polygons, uv_channels in submeshes],
+            [(0, [1], 1), (1, [0], 2)],
+        )
+
+        mesh_object = FakeData({EXPORT_MDB.MERGED_MESHES_PROPERTY: True})
+        mesh_object.name = "Merged"
+        mesh_object.data = mesh
+        iter_exported_mesh_objects = EXPORT_MDB.iter_exported_mesh_objects
+        EXPORT_MDB.iter_exported_mesh_objects = lambda source_id: [mesh_object]
+        try:
+            self.assertEqual(EXPORT_MDB.find_material_slot_issues("source"), [])
+            mesh.materials = []
+            self.assertEqual(
+                EXPORT_MDB.find_material_slot_issues("source"),
+                ["mesh 'Merged': no material assigned"],
+            )
+        finally:
+            EXPORT_MDB.iter_exported_mesh_objects = iter_exported_mesh_objects
+
+    def test_missing_texture_table_only_blocks_models_with_materials(self):
+        class FakeData(dict):
+            __hash__ = object.__hash__
+
+        material = FakeData({EXPORT_MDB.SOURCE_ID_PROPERTY: "source"})
+        material.name = "Material"
+        material.use_nodes = False
+        armature = types.SimpleNamespace(bones=[])
+        patched = {
+            "iter_assigned_materials": lambda source_id: [],
+            "find_texture_table": lambda source_id: None,
+            "iter_mdb_containers": lambda source_id: [],
+        }
+        originals = {name: getattr(EXPORT_MDB, name) for name in patched}
+        original_data = getattr(EXPORT_MDB.bpy, "data", None)
+        for name, replacement in patched.items():
+            setattr(EXPORT_MDB, name, replacement)
+        EXPORT_MDB.bpy.data = types.SimpleNamespace(materials=[])
+        table_issue = f"texture table: {EXPORT_MDB.TEXTURE_TABLE_PROPERTY}"
+        try:
+            self.assertEqual(
+                EXPORT_MDB.find_incomplete_mdb_metadata("source", armature),
+                [],
+            )
+            EXPORT_MDB.iter_assigned_materials = lambda source_id: [material]
+            self.assertIn(
+                table_issue,
+                EXPORT_MDB.find_incomplete_mdb_metadata("source", armature),
+            )
+            EXPORT_MDB.find_texture_table = lambda source_id: []
+            self.assertNotIn(
+                table_issue,
+                EXPORT_MDB.find_incomplete_mdb_metadata("source", armature),
+            )
+        finally:
+            for name, original in originals.items():
+                setattr(EXPORT_MDB, name, original)
+            EXPORT_MDB.bpy.data = original_data
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_tied_bone_influences_keep_ascending_bone_order(self):
+        import numpy as np
+
+        vertex = types.SimpleNamespace(
+            index=0,
+            groups=[
+                types.SimpleNamespace(group=group, weight=weight)
+                for group, weight in ((3, 0.25), (1, 0.25), (2, 0.5), (0, 0.0))
+            ],
+        )
+        self.assertEqual(
+            EXPORT_MDB.strongest_vertex_influences(vertex),
+            [(0.5, 2), (0.25, 1), (0.25, 3)],
+        )
+        skin = (
+            ["a", "b", "c", "d"],
+            np.array([[3, 1, 2, 0]], dtype=np.uint8),
+            np.array([[0.25, 0.25, 0.5, 0.0]], dtype=np.float32),
+        )
+        self.assertEqual(
+            EXPORT_MDB.vertex_bone_influences(None, vertex, skin),
+            [(0.5, "c"), (0.25, "b"), (0.25, "d")],
+        )
+
+    def test_timing_spans_merge_by_name_and_write_json(self):
+        recorder = INSTRUMENTATION.Recorder("MDB export EDF5", "model.mdb")
+        for vertex_count in (3, 4):
+            with recorder.span("gathering"):
+                recorder.count("vertices", vertex_count)
+                with recorder.span("bounds"):
+                    pass
+        recorder.count("bytes", 10)
+
+        timings = recorder.as_dict()["timings"]
+        self.assertEqual(timings["counts"], {"bytes": 10})
+        self.assertEqual(len(timings["children"]), 1)
+        gathering = timings["children"][0]
+        self.assertEqual(gathering["calls"], 2)
+        self.assertEqual(gathering["counts"], {"vertices": 7})
+        self.assertEqual(gathering["children"][0]["calls"], 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = recorder.write_json(directory)
+            self.assertTrue(os.path.basename(path).startswith("mdb_export_edf5_model_"))
+            with open(path, encoding="utf-8") as stream:
+                self.assertEqual(json.load(stream)["timings"]["name"], "MDB export EDF5")
+
+    def test_timing_report_is_printed_only_for_finished_runs(self):
+        def printed(result=None, error=None):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                try:
+                    with INSTRUMENTATION.Recorder("CANM import") as recorder:
+                        if error is not None:
+                            raise error
+                        recorder.finish(result)
+                except ValueError:
+                    pass
+            return output.getvalue()
+
+        self.assertIn("TIMING: CANM import", printed({"FINISHED"}))
+        self.assertEqual(printed({"CANCELLED"}), "")
+        self.assertEqual(printed(error=ValueError("broken")), "")
+
+    def test_profiling_writes_stats_and_memory_summary_beside_the_file(self):
+        previous = os.environ.pop(PROFILING.PROFILE_ENVIRONMENT, None)
+        try:
+            self.assertFalse(PROFILING.profiling_requested(False))
+            self.assertTrue(PROFILING.profiling_requested(True))
+            os.environ[PROFILING.PROFILE_ENVIRONMENT] = "0"
+            self.assertFalse(PROFILING.profiling_requested(False))
+            os.environ[PROFILING.PROFILE_ENVIRONMENT] = "1"
+            self.assertTrue(PROFILING.profiling_requested(False))
+        finally:
+            os.environ.pop(PROFILING.PROFILE_ENVIRONMENT, None)
+            if previous is not None:
+                os.environ[PROFILING.PROFILE_ENVIRONMENT] = previous
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = Path(directory) / "model.mdb"
+            with PROFILING.profiled("MDB export EDF5", str(output_path)):
+                payload = [bytes(64) for _ in range(100)]
+            del payload
+            written = sorted(path.name for path in Path(directory).iterdir())
+            self.assertEqual(len(written), 2)
+            self.assertTrue(written[0].startswith("model.mdb.mdb_export_edf5."))
+            self.assertTrue(written[0].endswith(".prof"))
+            summary = (Path(directory) / written[1]).read_text(encoding="utf-8")
+            self.assertIn("Peak traced memory", summary)
+
+    def test_synthetic_fixtures_are_deterministic_and_parse(self):
+        model = SYNTHETIC.SyntheticConfig(
+            objects=2,
+            meshes_per_object=2,
+            vertices_per_mesh=12,
+            bones=1200,
+            materials=3,
+            uv_channels=3,
+        )
+        encoded = SYNTHETIC.synthetic_mdb_bytes(model)
+        self.assertEqual(encoded, SYNTHETIC.synthetic_mdb_bytes(model))
+        self.assertNotEqual(
+            encoded,
+            SYNTHETIC.synthetic_mdb_bytes(dataclasses.replace(model, seed=2)),
+        )
+
+        mdb = IMPORT_MDB.parse_mdb(io.BytesIO(encoded), include_geometry=False)
+        self.assertEqual(len(mdb["bones"]), 1200)
+        self.assertEqual(len(mdb["materials"]), 3)
+        self.assertEqual(
+            [len(mdb_object["meshes"]) for mdb_object in mdb["objects"]],
+            [2, 2],
+        )
+        layout_names = [
+            element["name"] for element in mdb["objects"][0]["meshes"][0]["layout"]
+        ]
+        self.assertEqual(layout_names.count("texcoord"), 3)
+
+        animation = SYNTHETIC.SyntheticAnimationConfig(
+            bones=40,
+            animations=3,
+            keyframes=5,
+            animated_bones=10,
+            game_version=6,
+        )
+        canm = SYNTHETIC.synthetic_canm_bytes(animation)
+        self.assertEqual(canm, SYNTHETIC.synthetic_canm_bytes(animation))
+        magic, version, animation_count, _, channel_count, _, bone_count, _ = (
+            struct.unpack_from("<4s7I", canm)
+        )
+        self.assertEqual(magic, b"CANM")
+        self.assertEqual(version, 768)
+        self.assertEqual(
+            (animation_count, channel_count, bone_count),
+            (3, animation.channel_count, 40),
+        )
+
+        too_many = SYNTHETIC.SyntheticAnimationConfig(
+            bones=300,
+            animations=100,
+            animated_bones=300,
+        )
+        self.assertGreater(too_many.channel_count, 0xFFFF)
+        with self.assertRaises(ValueError):
+            SYNTHETIC.synthetic_animation_data(too_many)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_canm_parser_reads_channels_as_arrays(self):
+        for game_version in (5, 6):
+            config = SYNTHETIC.SyntheticAnimationConfig(
+                bones=12,
+                animations=3,
+                keyframes=7,
+                animated_bones=4,
+                game_version=game_version,
+            )
+            bone_names, animations, channels = (
+                SYNTHETIC.synthetic_animation_data(config)
+            )
+            encoded = SYNTHETIC.synthetic_canm_bytes(config)
+            canm = CANM_PARSER.parse_canm(io.BytesIO(encoded))
+
+            self.assertEqual(canm["version"], {5: 512, 6: 768}[game_version])
+            self.assertEqual(canm["bone_names"], bone_names)
+            self.assertEqual(len(canm["anm_points"]), len(channels))
+            for expected, parsed in zip(animations, canm["animations"]):
+                self.assertEqual(parsed["name"], expected["name"])
+                self.assertEqual(parsed["loop"], expected["loop"])
+                self.assertEqual(parsed["keyframes"], expected["keyframes"])
+                self.assertEqual(parsed["duration"], expected["duration"])
+                self.assertEqual(
+                    parsed["bone_data"].tolist(),
+                    [
+                        (
+                            bone["index"],
+                            bone["channel_index_pos"],
+                            bone["channel_index_rot"],
+                            bone["channel_index_scale"],
+                        )
+                        for bone in expected["bone_data"]
+                    ],
+                )
+            for expected, parsed in zip(channels, canm["anm_points"]):
+                self.assertEqual(
+                    float_bits([parsed["base_x"], parsed["speed_z"]]),
+                    float_bits([expected["base_x"], expected["speed_z"]]),
+                )
+                keyframes = parsed["keyframes"]
+                if not expected["has_frames"]:
+                    self.assertEqual(len(keyframes), 0)
+                    continue
+                # Keyframes are views of the file bytes, not copies.
+                self.assertFalse(keyframes.flags.writeable)
+                if "frames" in expected:
+                    self.assertEqual(keyframes.shape, (7, 4))
+                    self.assertEqual(
+                        keyframes.tobytes(),
+                        float_bits([
+                            value
+                            for frame in expected["frames"]
+                            for value in frame
+                        ]),
+                    )
+                else:
+                    self.assertEqual(keyframes.shape, (7, 3))
+                    self.assertEqual(
+                        keyframes.tolist(),
+                        [
+                            list(offsets)
+                            for offsets in zip(
+                                expected["offsets_x"],
+                                expected["offsets_y"],
+                                expected["offsets_z"],
+                            )
+                        ],
+                    )
+
+        with self.assertRaises(CANM_FORMAT.CanmFormatError):
+            CANM_PARSER.parse_canm(io.BytesIO(b"MDB0" + encoded[4:]))
+        with self.assertRaises(CANM_FORMAT.CanmFormatError):
+            CANM_PARSER.parse_canm(io.BytesIO(encoded[:len(encoded) // 2]))
+        unknown_version = encoded[:4] + struct.pack("<I", 0) + encoded[8:]
+        with self.assertRaises(CANM_FORMAT.CanmFormatError):
+            CANM_PARSER.parse_canm(io.BytesIO(unknown_version))
+        forced = CANM_PARSER.parse_canm(
+            io.BytesIO(unknown_version),
+            override_version=768,
+        )
+        self.assertEqual(forced["version"], 768)
+        self.assertEqual(len(forced["anm_points"]), len(channels))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_batched_canm_sampling_matches_per_frame_matrices(self):
+        import numpy as np
+
+        rest_rotation = np.array([0.8, 0.2, -0.4, 0.4])
+        rest_rotation /= np.linalg.norm(rest_rotation)
+        rest_inverse = np.identity(4)
+        rest_inverse[:3, :3] = quaternion_matrix(rest_rotation)
+        rest_inverse[:3, 3] = (0.5, -1.0, 2.0)
+        for game_version in (5, 6):
+            config = SYNTHETIC.SyntheticAnimationConfig(
+                bones=3,
+                animations=1,
+                keyframes=9,
+                animated_bones=2,
+                game_version=game_version,
+            )
+            canm = CANM_PARSER.parse_canm(
+                io.BytesIO(SYNTHETIC.synthetic_canm_bytes(config))
+            )
+            for bone_anim in canm["animations"][0]["bone_data"]:
+                samples = CANM_SAMPLING.sample_bone(
+                    canm,
+                    bone_anim,
+                    rest_inverse[:3, 3],
+                    rest_rotation,
+                    8,
+                )
+                channels = [
+                    canm["anm_points"][bone_anim[name]]
+                    for name in ("point_trans_id", "point_rot_id")
+                ]
+                frame_count = 8 if len(channels[0]["keyframes"]) else 1
+                self.assertEqual(len(samples["location"]), frame_count)
+                self.assertEqual(
+                    len(samples["rotation_quaternion"]),
+                    frame_count,
+                )
+                self.assertEqual(
+                    samples["scale"] is None,
+                    bone_anim["point_scale_id"] == -1,
+                )
+                rotations = samples["rotation_quaternion"]
+                self.assertGreaterEqual(rotations[0, 0], 0.0)
+                self.assertTrue(np.all(
+                    np.einsum("ij,ij->i", rotations[1:], rotations[:-1]) >= 0.0
+                ))
+                for frame in range(frame_count):
+                    position = CANM_SAMPLING.channel_vectors(channels[0])[frame]
+                    rotation = channels[1]
+                    if game_version == 6:
+                        x, y, z, w = (
+                            rotation["keyframes"][frame].tolist()
+                            if len(rotation["keyframes"])
+                            else [rotation[f"base_{axis}"] for axis in "xyzw"]
+                        )
+                        quaternion = np.array((w, x, y, z))
+                        channel_rotation = np.identity(4)
+                        channel_rotation[:3, :3] = quaternion_matrix(
+                            quaternion / np.linalg.norm(quaternion)
+                        )
+                    else:
+                        angles = CANM_SAMPLING.channel_vectors(rotation)[frame]
+                        channel_rotation = (
+                            rotation_matrix(2, angles[2])
+                            @ rotation_matrix(1, angles[1])
+                            @ rotation_matrix(0, angles[0])
+                        )
+                    translation = np.identity(4)
+                    translation[:3, 3] = position
+                    basis = rest_inverse @ translation @ channel_rotation
+                    np.testing.assert_allclose(
+                        samples["location"][frame],
+                        basis[:3, 3],
+                        atol=1e-9,
+                    )
+                    np.testing.assert_allclose(
+                        quaternion_matrix(rotations[frame]),
+                        basis[:3, :3],
+                        atol=1e-9,
+                    )
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_channel_cache_reuses_shared_channels_until_last_use(self):
+        import numpy as np
+
+        config = SYNTHETIC.SyntheticAnimationConfig(
+            bones=6,
+            animations=4,
+            keyframes=5,
+            animated_bones=2,
+            game_version=6,
+        )
+        canm = CANM_PARSER.parse_canm(
+            io.BytesIO(SYNTHETIC.synthetic_canm_bytes(config))
+        )
+        rests = {
+            bone_id: ((0.1 * bone_id, 0.0, 1.0), (1.0, 0.0, 0.0, 0.0))
+            for bone_id in range(6)
+        }
+        cache = CANM_SAMPLING.ChannelCache(canm)
+        for animation in canm["animations"]:
+            for bone_anim in animation["bone_data"]:
+                rest_location, rest_rotation = rests[int(bone_anim["bone_id"])]
+                cached = CANM_SAMPLING.sample_bone(
+                    canm,
+                    bone_anim,
+                    rest_location,
+                    rest_rotation,
+                    5,
+                    cache,
+                )
+                direct = CANM_SAMPLING.sample_bone(
+                    canm,
+                    bone_anim,
+                    rest_location,
+                    rest_rotation,
+                    5,
+                )
+                for name, values in direct.items():
+                    if values is None:
+                        self.assertIsNone(cached[name])
+                    else:
+                        np.testing.assert_array_equal(cached[name], values)
+
+        # Four unanimated bones per animation share one static rotation; each
+        # rest transform decodes it once and reuses it in later animations.
+        self.assertEqual(cache.misses, 4 * 2 + 4 * 2 * 3)
+        self.assertEqual(cache.hits, 3 * 4 * 2)
+        self.assertEqual(cache.samples, {})
+        self.assertFalse(np.any(cache.remaining))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_channel_cache_releases_records_sampled_without_it(self):
+        import numpy as np
+
+        config = SYNTHETIC.SyntheticAnimationConfig(
+            bones=6,
+            animations=3,
+            keyframes=4,
+            animated_bones=2,
+            game_version=6,
+        )
+        canm = CANM_PARSER.parse_canm(
+            io.BytesIO(SYNTHETIC.synthetic_canm_bytes(config))
+        )
+        cache = CANM_SAMPLING.ChannelCache(canm)
+        rest = ((0.0, 0.0, 0.0), (1.0, 0.0, 0.0, 0.0))
+        for animation in canm["animations"]:
+            for bone_anim in animation["bone_data"]:
+                # Odd bones stand in for non-rigid rests sampled per frame.
+                if int(bone_anim["bone_id"]) % 2:
+                    cache.release(bone_anim)
+                else:
+                    CANM_SAMPLING.sample_bone(canm, bone_anim, *rest, 4, cache)
+        self.assertEqual(cache.samples, {})
+        self.assertFalse(np.any(cache.remaining))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_linear_keyframe_thinning_reproduces_every_sample(self):
+        import numpy as np
+
+        thin = CANM_SAMPLING.linear_keyframe_indices
+        np.testing.assert_array_equal(thin(np.full(40, 0.25)), [0, 39])
+        np.testing.assert_array_equal(thin([1.0, 2.0]), [0, 1])
+        piecewise = np.concatenate((
+            np.linspace(0.0, 3.0, 31),
+            np.linspace(3.0, -1.0, 21)[1:],
+            np.full(10, -1.0),
+        )).astype(np.float32)
+        np.testing.assert_array_equal(thin(piecewise), [0, 30, 50, 60])
+
+        rng = np.random.default_rng(4)
+        values = np.concatenate((
+            np.linspace(-200.0, 200.0, 500),
+            rng.normal(size=50),
+            np.full(30, 1e-3),
+            np.cumsum(rng.choice([0.0, 0.5], size=200)),
+        )).astype(np.float32)
+        kept = thin(values)
+        self.assertEqual((kept[0], kept[-1]), (0, len(values) - 1))
+        self.assertLess(len(kept), len(values) // 2)
+        rebuilt = np.interp(
+            np.arange(len(values)),
+            kept,
+            values[kept].astype(np.float64),
+        )
+        tolerance = np.finfo(np.float32).eps * np.maximum(np.abs(values), 1.0)
+        self.assertTrue(np.all(np.abs(rebuilt - values) <= tolerance))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_canm_animation_digests_follow_channel_content_not_indices(self):
+        config = SYNTHETIC.SyntheticAnimationConfig(
+            bones=4,
+            animations=4,
+            keyframes=6,
+            animated_bones=2,
+            game_version=5,
+        )
+
+        def digests(bone_names, animations, channels):
+            stream = io.BytesIO()
+            SYNTHETIC.CANM_WRITER.write_canm(
+                stream,
+                CANM_FORMAT.CANM5_VERSION,
+                bone_names,
+                animations,
+                channels,
+            )
+            return CANM_PARSER.animation_digests(
+                CANM_PARSER.parse_canm(stream)
+            )
+
+        original = digests(*SYNTHETIC.synthetic_animation_data(config))
+        self.assertEqual(len(set(original)), 4)
+
+        bone_names, animations, channels = SYNTHETIC.synthetic_animation_data(
+            config
+        )
+        edited = animations[1]["bone_data"][0]["channel_index_pos"]
+        channels[edited]["offsets_x"][2] ^= 1
+        # Moving clip 3 onto copies of its channels changes only indices.
+        for bone_anim in animations[3]["bone_data"][:2]:
+            for key in (
+                "channel_index_pos",
+                "channel_index_rot",
+                "channel_index_scale",
+            ):
+                channels.append(dict(channels[bone_anim[key]]))
+                bone_anim[key] = len(channels) - 1
+        animations[2]["loop"] = not animations[2]["loop"]
+        updated = digests(bone_names, animations, channels)
+
+        self.assertEqual(updated[0], original[0])
+        self.assertNotEqual(updated[1], original[1])
+        self.assertNotEqual(updated[2], original[2])
+        self.assertEqual(updated[3], original[3])
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_canm_scan_lists_clips_and_selected_parse_decodes_their_channels(self):
+        import numpy as np
+
+        config = SYNTHETIC.SyntheticAnimationConfig(
+            bones=6,
+            animations=4,
+            keyframes=5,
+            animated_bones=2,
+            game_version=5,
+        )
+        encoded = SYNTHETIC.synthetic_canm_bytes(config)
+        full = CANM_PARSER.parse_canm(io.BytesIO(encoded))
+
+        scan = CANM_PARSER.scan_canm(io.BytesIO(encoded))
+        self.assertEqual(scan["version"], full["version"])
+        self.assertEqual(scan["channel_count"], len(full["anm_points"]))
+        self.assertEqual(scan["bone_count"], 6)
+        for clip, animation in zip(scan["animations"], full["animations"]):
+            self.assertNotIn("bone_data", clip)
+            for key in ("index", "name", "loop", "duration", "keyframes"):
+                self.assertEqual(clip[key], animation[key])
+            self.assertEqual(clip["bone_count"], len(animation["bone_data"]))
+
+        selected = CANM_PARSER.parse_canm(
+            io.BytesIO(encoded),
+            animations=["animation003", 1],
+        )
+        self.assertEqual(
+            [animation["index"] for animation in selected["animations"]],
+            [1, 3],
+        )
+        referenced = {
+            int(index)
+            for animation in selected["animations"]
+            for field in ("point_trans_id", "point_rot_id", "point_scale_id")
+            for index in animation["bone_data"][field]
+            if index >= 0
+        }
+        self.assertEqual(len(selected["anm_points"]), len(full["anm_points"]))
+        for index, channel in enumerate(selected["anm_points"]):
+            if index not in referenced:
+                self.assertIsNone(channel)
+                continue
+            expected = full["anm_points"][index]
+            self.assertEqual(channel.keys(), expected.keys())
+            np.testing.assert_array_equal(
+                channel["keyframes"],
+                expected["keyframes"],
+            )
+        self.assertLess(len(referenced), len(full["anm_points"]))
+
+        with self.assertRaises(KeyError):
+            CANM_PARSER.parse_canm(io.BytesIO(encoded), animations=["missing"])
+
+        # Claim a single channel so the clips reference channels past the end.
+        truncated = bytearray(encoded)
+        count_offset = CANM_PARSER.HEADER_DTYPE.fields["channel_count"][1]
+        struct.pack_into("<I", truncated, count_offset, 1)
+        for selection in (None, [1]):
+            with self.assertRaises(CANM_PARSER.CanmFormatError):
+                CANM_PARSER.parse_canm(
+                    io.BytesIO(bytes(truncated)),
+                    animations=selection,
+                )
+
+    def test_texture_resolver_prefers_hd_textures_and_tracks_new_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            root = Path(root)
+            for directory in ("MODEL", "HD-TEXTURE", "TEXTURE"):
+                (root / directory).mkdir()
+            model_path = root / "MODEL" / "model.mdb"
+            (root / "TEXTURE" / "Body_Albedo.dds").write_bytes(b"")
+            (root / "HD-TEXTURE" / "body_albedo.dds").write_bytes(b"")
+
+            resolved = TEXTURE_RESOLVER.resolve_texture_path(
+                model_path,
+                "body_albedo.dds",
+            )
+            self.assertEqual(Path(resolved), root / "HD-TEXTURE" / "body_albedo.dds")
+            self.assertIsNone(
+                TEXTURE_RESOLVER.resolve_texture_path(model_path, "body_normal.dds")
+            )
+
+            added = root / "TEXTURE" / "body_normal.dds"
+            added.write_bytes(b"")
+            directory = root / "TEXTURE"
+            stat = directory.stat()
+            os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            self.assertEqual(
+                Path(TEXTURE_RESOLVER.resolve_texture_path(
+                    model_path,
+                    "Body_Normal.dds",
+                )),
+                added,
+            )
+
     def test_editing_a_visible_value_preserves_unrepresented_slots(self):
         parameter = {
             "name": "roughness",
@@ -310,6 +1049,21 @@ class MdbRoundTripTests(unittest.TestCase):
             "original_albedo.dds",
         )
 
+    def test_proxy_texture_image_preserves_imported_filename(self):
+        class ProxyImage(dict):
+            filepath_raw = "/tmp/edf_mdb_texture_proxies/original_albedo_1f2e.png"
+            filepath = ""
+
+        class ImageNode(dict):
+            image = ProxyImage(mdb_texture_role="PROXY")
+
+        node = ImageNode(mdb_texture_filename="original_albedo.dds")
+
+        self.assertEqual(
+            EXPORT_MDB.get_export_texture_filename(node),
+            "original_albedo.dds",
+        )
+
     def test_rgba_uses_the_separate_editable_alpha_socket(self):
         parameter = {
             "name": "diffuse",
@@ -0,0 +1,189 @@
+"""Texture lookup shared by every MDB import in a Blender session.
+
+Texture folders are listed once and indexed by lower-cased file name, so
+resolving a filename is a dictionary lookup rather than one failed image load
+per candidate folder. Loaded images are remembered by absolute path, which lets
+models that share textures reuse one image data-block across imports.
+
+Imports can also skip the full-resolution DDS files. Deferred imports use a
+small generated placeholder and proxy imports use a downscaled PNG copy cached
+on disk. Both stand-ins are tagged so export keeps the MDB texture filename and
+the full-resolution image can be swapped in later.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import bpy
+
+
+TEXTURE_DIRECTORY_NAMES = ('HD-TEXTURE', 'TEXTURE')
+
+TEXTURE_MODE_EAGER = 'EAGER'
+TEXTURE_MODE_DEFERRED = 'DEFERRED'
+TEXTURE_MODE_PROXY = 'PROXY'
+
+# Set on placeholder and proxy images, never on full-resolution textures.
+TEXTURE_ROLE_PROPERTY = 'mdb_texture_role'
+TEXTURE_SOURCE_PROPERTY = 'mdb_texture_source'
+PROXY_MAX_SIZE = 512
+PROXY_DIRECTORY = os.path.join(tempfile.gettempdir(), 'edf_mdb_texture_proxies')
+
+# Absolute directory -> (directory mtime, {lower-cased file name: path}).
+_directory_indexes = {}
+# Normalized absolute texture path -> name of the image that loaded it.
+_loaded_images = {}
+
+
+def normalize_path(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def texture_directories(model_path):
+    model_directory = os.path.dirname(os.path.abspath(model_path))
+    return [
+        os.path.normpath(os.path.join(model_directory, '..', name))
+        for name in TEXTURE_DIRECTORY_NAMES
+    ]
+
+
+def index_directory(directory):
+    """Return the file index of ``directory``, rebuilding it if it changed."""
+    try:
+        modified = os.stat(directory).st_mtime_ns
+    except OSError:
+        _directory_indexes.pop(directory, None)
+        return {}
+    cached = _directory_indexes.get(directory)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+
+    index = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    index.setdefault(entry.name.lower(), entry.path)
+    except OSError:
+        return {}
+    _directory_indexes[directory] = (modified, index)
+    return index
+
+
+def resolve_texture_path(model_path, filename):
+    """Find ``filename`` in the texture folders next to ``model_path``.
+
+    ``HD-TEXTURE`` wins over ``TEXTURE``. Returns ``None`` when neither folder
+    holds the file.
+    """
+    for directory in texture_directories(model_path):
+        if os.path.basename(filename) != filename:
+            candidate = os.path.join(directory, filename)
+            if os.path.isfile(candidate):
+                return candidate
+            continue
+        path = index_directory(directory).get(filename.lower())
+        if path is not None:
+            return path
+    return None
+
+
+def load_image(path):
+    """Return the image for ``path``, reusing one loaded by an earlier import.
+
+    Raises ``RuntimeError`` like ``bpy.data.images.load`` when the file cannot
+    be opened.
+    """
+    key = normalize_path(path)
+    image_name = _loaded_images.get(key)
+    if image_name is not None:
+        image = bpy.data.images.get(image_name)
+        if (
+            image is not None
+            and normalize_path(bpy.path.abspath(image.filepath)) == key
+        ):
+            return image
+        del _loaded_images[key]
+
+    image = bpy.data.images.load(path, check_existing=True)
+    _loaded_images[key] = image.name
+    return image
+
+
+def configure_texture_image(image, slot_name):
+    image.alpha_mode = 'CHANNEL_PACKED'
+    if 'albedo' not in slot_name and 'diffuse' not in slot_name:
+        image.colorspace_settings.name = 'Non-Color'
+
+
+def is_stand_in_image(image):
+    # Test doubles and other non-ID objects have no custom properties.
+    get_property = getattr(image, 'get', None)
+    return get_property is not None and bool(get_property(TEXTURE_ROLE_PROPERTY))
+
+
+def create_placeholder_image(filename, texture_path):
+    image = bpy.data.images.new(f'{filename} (deferred)', 8, 8)
+    image.generated_color = (0.5, 0.5, 0.5, 1.0)
+    image[TEXTURE_ROLE_PROPERTY] = TEXTURE_MODE_DEFERRED
+    if texture_path is not None:
+        image[TEXTURE_SOURCE_PROPERTY] = texture_path
+    return image
+
+
+def proxy_path_for(texture_path, max_size):
+    """Name the proxy after the source path, size, mtime and size cap."""
+    stat = os.stat(texture_path)
+    key = repr((
+        normalize_path(texture_path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        max_size,
+    ))
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+    stem = os.path.splitext(os.path.basename(texture_path))[0]
+    return os.path.join(PROXY_DIRECTORY, f'{stem}_{digest}.png')
+
+
+def write_proxy_file(texture_path, proxy_path, max_size):
+    image = bpy.data.images.load(texture_path)
+    try:
+        width, height = image.size
+        if not width or not height:
+            raise RuntimeError(f"Could not decode '{texture_path}'")
+        scale = max_size / max(width, height)
+        if scale < 1.0:
+            image.scale(
+                max(1, round(width * scale)),
+                max(1, round(height * scale)),
+            )
+        os.makedirs(PROXY_DIRECTORY, exist_ok=True)
+        # Write beside the final name first so an interrupted save never
+        # leaves a truncated proxy that later imports would trust.
+        partial_path = proxy_path + '.partial.png'
+        image.filepath_raw = partial_path
+        image.file_format = 'PNG'
+        image.save()
+        os.replace(partial_path, proxy_path)
+    finally:
+        bpy.data.images.remove(image)
+
+
+def load_proxy_image(texture_path, max_size=PROXY_MAX_SIZE):
+    """Return a downscaled copy of ``texture_path``, creating it if needed.
+
+    Raises ``RuntimeError`` when the source texture cannot be decoded.
+    """
+    proxy_path = proxy_path_for(texture_path, max_size)
+    if not os.path.isfile(proxy_path):
+        write_proxy_file(texture_path, proxy_path, max_size)
+    image = load_image(proxy_path)
+    image[TEXTURE_ROLE_PROPERTY] = TEXTURE_MODE_PROXY
+    image[TEXTURE_SOURCE_PROPERTY] = texture_path
+    return image
+
+
+def clear_texture_caches():
+    _directory_indexes.clear()
+    _loaded_images.clear()